@@ -14,3 +14,16 @@ class IAISubmissionService(ABC):
             list: List of response messages
         """
         pass
+
+    @abstractmethod
+    async def aprocess_message(self, input_message):
+        """
+        Process a message through the graph asynchronously.
+
+        Args:
+            input_message (str): User input message
+
+        Returns:
+            list: List of response messages
+        """
+        pass
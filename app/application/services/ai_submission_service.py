@@ -36,3 +36,26 @@ class AISubmissionService(IAISubmissionService):
             responses.append(step["messages"][-1])
 
         return responses
+
+    async def aprocess_message(self, input_message):
+        """
+        Process a message through the graph with astream, so retrieval and LLM calls
+        are awaited instead of blocking the event loop.
+
+        Args:
+            input_message (str): User input message
+
+        Returns:
+            list: List of response messages
+        """
+        human_message = HumanMessage(content=input_message)
+
+        responses = []
+        async for step in self.graph.astream(
+            {"messages": [human_message]},
+            stream_mode="values",
+            config=self.graph_builder.config,
+        ):
+            responses.append(step["messages"][-1])
+
+        return responses
@@ -0,0 +1,85 @@
+from typing import Dict, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.domain.entities.chunk import Chunk
+from app.infrastructure.embeddings.embeddings_factory import create_store_embeddings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class DerivedEmbeddingEvaluationService:
+    """
+    Service that measures how far chunk vectors derived from sentence embeddings
+    (single-pass ingestion) are from the embeddings of the chunk texts themselves.
+    """
+
+    def __init__(self, embeddings: Embeddings = None):
+        """
+        Args:
+            embeddings (Embeddings, optional): Embedding function producing the reference
+                chunk and query vectors. Defaults to the vector store embeddings.
+        """
+        self.embeddings = embeddings or create_store_embeddings()
+
+    def evaluate(
+        self, chunks: List[Chunk], queries: List[str], k: int = 6
+    ) -> Dict[str, float]:
+        """
+        Compares the derived vectors of the chunks with their true embeddings, and the top-k
+        chunks each query retrieves with either set of vectors.
+
+        Args:
+            chunks (List[Chunk]): Chunks carrying a derived vector.
+            queries (List[str]): Query texts.
+            k (int): Number of chunks retrieved per query.
+
+        Returns:
+            Dict[str, float]: mean_cosine and min_cosine between derived and true vectors,
+                and topk_overlap, the mean fraction of the true top-k also in the derived top-k.
+        """
+        chunks = [chunk for chunk in chunks if chunk.vector is not None]
+        if not chunks:
+            return {"mean_cosine": 0.0, "min_cosine": 0.0, "topk_overlap": 0.0}
+
+        derived = _normalize(
+            np.asarray([chunk.vector for chunk in chunks], dtype=np.float32)
+        )
+        true = _normalize(
+            np.asarray(
+                self.embeddings.embed_documents([chunk.text for chunk in chunks]),
+                dtype=np.float32,
+            )
+        )
+        cosines = np.einsum("ij,ij->i", derived, true)
+
+        overlap = 0.0
+        if queries:
+            query_matrix = _normalize(
+                np.asarray(self.embeddings.embed_documents(queries), dtype=np.float32)
+            )
+            k = min(k, len(chunks))
+            derived_top = np.argsort(-(query_matrix @ derived.T), axis=1)[:, :k]
+            true_top = np.argsort(-(query_matrix @ true.T), axis=1)[:, :k]
+            overlap = float(
+                np.mean(
+                    [
+                        len(set(d).intersection(t)) / k
+                        for d, t in zip(derived_top, true_top)
+                    ]
+                )
+            )
+
+        report = {
+            "mean_cosine": float(cosines.mean()),
+            "min_cosine": float(cosines.min()),
+            "topk_overlap": overlap,
+        }
+        logger.info(f"Derived embedding evaluation @{k}: {report}")
+        return report
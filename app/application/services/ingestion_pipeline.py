@@ -0,0 +1,383 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.search.bm25_index import BM25Index
+from app.retry import call_with_retries
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+Record = Tuple[str, str, Dict[str, Any], Optional[List[float]]]
+
+CommitCallback = Callable[[int, List[str]], None]
+FailureCallback = Callable[[int, List[str], BaseException], None]
+
+
+def embed_missing(embeddings: Embeddings, records: List[Record]) -> List[List[float]]:
+    """
+    Returns the vectors of the records, embedding only the ones without a precomputed vector.
+
+    Args:
+        embeddings (Embeddings): Embedding function for the records without vector.
+        records (List[Record]): Records of one batch.
+
+    Returns:
+        List[List[float]]: One vector per record, in order.
+    """
+    missing = [i for i, record in enumerate(records) if record[3] is None]
+    vectors = [record[3] for record in records]
+    if missing:
+        embedded = embeddings.embed_documents([records[i][1] for i in missing])
+        for i, vector in zip(missing, embedded):
+            vectors[i] = vector
+    return vectors
+
+
+class _StageStats:
+    """
+    Counters of one pipeline stage, shared by its worker threads.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items: int, busy: float, blocked: float = 0.0) -> None:
+        with self._lock:
+            self.items += items
+            self.batches += 1
+            self.busy_seconds += busy
+            self.blocked_seconds += blocked
+
+    def report(self) -> Dict[str, float]:
+        busy_per_worker = self.busy_seconds / self.workers
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "batches": self.batches,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": (
+                round(self.items / busy_per_worker, 1) if busy_per_worker else 0.0
+            ),
+        }
+
+
+class IngestionPipeline:
+    """
+    Overlapped chunk -> embed -> write ingestion.
+
+    A producer thread consumes the chunk records and groups them in embedding batches,
+    several embedding workers call the embeddings API concurrently, and a single writer
+    commits the embedded batches in large write transactions. Stages are connected by
+    bounded queues, so a slow stage blocks the ones before it instead of buffering the book.
+    """
+
+    def __init__(
+        self,
+        vector_store: IVectorStore,
+        lexical_index: BM25Index = None,
+        batch_size: int = 500,
+        embed_workers: int = None,
+        queue_size: int = None,
+        write_batch_size: int = None,
+        embeddings: Embeddings = None,
+        max_attempts: int = None,
+    ):
+        """
+        Args:
+            vector_store (IVectorStore): Store that receives the embedded texts.
+            lexical_index (BM25Index, optional): BM25 index updated by the writer.
+            batch_size (int): Texts per embeddings request.
+            embed_workers (int, optional): Concurrent embedding requests.
+                Defaults to settings.INGESTION_EMBED_WORKERS.
+            queue_size (int, optional): Batches buffered between two stages.
+                Defaults to settings.INGESTION_QUEUE_SIZE.
+            write_batch_size (int, optional): Texts per write transaction.
+                Defaults to settings.INGESTION_WRITE_BATCH_SIZE.
+            embeddings (Embeddings, optional): Embedding function of the embed stage.
+                Defaults to the embedding function of the vector store.
+            max_attempts (int, optional): Attempts to embed or write a batch before it fails.
+                Defaults to settings.INGESTION_MAX_BATCH_ATTEMPTS.
+        """
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.batch_size = batch_size
+        self.embed_workers = embed_workers or settings.INGESTION_EMBED_WORKERS
+        self.queue_size = queue_size or settings.INGESTION_QUEUE_SIZE
+        self.write_batch_size = write_batch_size or settings.INGESTION_WRITE_BATCH_SIZE
+        self.embeddings = embeddings or self.vector_store
+        self.max_attempts = max_attempts or settings.INGESTION_MAX_BATCH_ATTEMPTS
+        self._on_commit: Optional[CommitCallback] = None
+        self._on_failure: Optional[FailureCallback] = None
+        self._failed = 0
+        self._failed_lock = threading.Lock()
+
+    def run(
+        self,
+        records: Iterable[Record],
+        on_commit: CommitCallback = None,
+        on_failure: FailureCallback = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingests (id, text, metadata, vector) records, overlapping chunking, embedding and writing.
+        Records that already carry a vector are not embedded again.
+
+        Args:
+            records (Iterable[Record]): Records to ingest, usually produced lazily by a chunk generator.
+            on_commit (CommitCallback, optional): Called by the writer with the position of the first
+                record of each batch and the IDs of the batch, once the batch is written.
+            on_failure (FailureCallback, optional): Called with the position, IDs and error of each batch
+                that failed all its attempts. When given, failed batches are skipped and the
+                ingestion goes on; otherwise the first failure stops the pipeline.
+
+        Returns:
+            Dict[str, Any]: Number of ingested and failed texts, wall-clock seconds and per-stage statistics.
+
+        Raises:
+            Exception: The first error raised by any stage, after all stages stopped.
+        """
+        self._on_commit = on_commit
+        self._on_failure = on_failure
+        self._failed = 0
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        write_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stats = {
+            "chunk": _StageStats(),
+            "embed": _StageStats(self.embed_workers),
+            "write": _StageStats(),
+        }
+        errors: List[BaseException] = []
+        stop = threading.Event()
+
+        threads = [
+            threading.Thread(
+                target=self._produce,
+                args=(records, embed_queue, stats["chunk"], errors, stop),
+                name="ingest-chunk",
+                daemon=True,
+            )
+        ]
+        threads += [
+            threading.Thread(
+                target=self._embed,
+                args=(embed_queue, write_queue, stats["embed"], errors, stop),
+                name=f"ingest-embed-{i}",
+                daemon=True,
+            )
+            for i in range(self.embed_workers)
+        ]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        ingested = self._write(write_queue, stats["write"], errors, stop)
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        report = {
+            "ingested": ingested,
+            "failed": self._failed,
+            "wall_seconds": round(elapsed, 3),
+            "items_per_second": round(ingested / elapsed, 1) if elapsed else 0.0,
+            "stages": {
+                stage: stage_stats.report() for stage, stage_stats in stats.items()
+            },
+        }
+        logger.info(f"Ingestion pipeline report: {report}")
+
+        if errors:
+            raise errors[0]
+        return report
+
+    def _produce(
+        self,
+        records: Iterable[Record],
+        embed_queue: queue.Queue,
+        stats: _StageStats,
+        errors: List[BaseException],
+        stop: threading.Event,
+    ) -> None:
+        try:
+            batch: List[Record] = []
+            batch_start = 0
+            busy_start = time.perf_counter()
+            for position, record in enumerate(records):
+                if stop.is_set():
+                    break
+                if not batch:
+                    batch_start = position
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self._put(embed_queue, batch_start, batch, stats, busy_start)
+                    batch = []
+                    busy_start = time.perf_counter()
+            if batch and not stop.is_set():
+                self._put(embed_queue, batch_start, batch, stats, busy_start)
+        except BaseException as e:
+            logger.error(f"Chunking stage failed: {str(e)}")
+            errors.append(e)
+            stop.set()
+        finally:
+            for _ in range(self.embed_workers):
+                embed_queue.put(_DONE)
+
+    def _put(
+        self,
+        target: queue.Queue,
+        batch_start: int,
+        batch: List[Record],
+        stats: _StageStats,
+        busy_start: float,
+    ) -> None:
+        busy = time.perf_counter() - busy_start
+        blocked_start = time.perf_counter()
+        target.put((batch_start, batch))
+        stats.record(len(batch), busy, time.perf_counter() - blocked_start)
+
+    def _embed(
+        self,
+        embed_queue: queue.Queue,
+        write_queue: queue.Queue,
+        stats: _StageStats,
+        errors: List[BaseException],
+        stop: threading.Event,
+    ) -> None:
+        try:
+            while True:
+                item = embed_queue.get()
+                if item is _DONE:
+                    break
+                if stop.is_set():
+                    continue
+                batch_start, batch = item
+                try:
+                    start = time.perf_counter()
+                    vectors = call_with_retries(
+                        embed_missing,
+                        self.max_attempts,
+                        f"Embedding batch at {batch_start}",
+                        self.embeddings,
+                        batch,
+                    )
+                    busy = time.perf_counter() - start
+
+                    blocked_start = time.perf_counter()
+                    write_queue.put((batch_start, batch, vectors))
+                    stats.record(len(batch), busy, time.perf_counter() - blocked_start)
+                except BaseException as e:
+                    logger.error(f"Embedding stage failed: {str(e)}")
+                    self._fail(batch_start, batch, e, errors, stop)
+        finally:
+            write_queue.put(_DONE)
+
+    def _write(
+        self,
+        write_queue: queue.Queue,
+        stats: _StageStats,
+        errors: List[BaseException],
+        stop: threading.Event,
+    ) -> int:
+        ingested = 0
+        pending: List[Tuple[int, List[Record], List[List[float]]]] = []
+        pending_count = 0
+        finished_workers = 0
+
+        while finished_workers < self.embed_workers:
+            item = write_queue.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            if stop.is_set():
+                continue
+
+            pending.append(item)
+            pending_count += len(item[1])
+            if pending_count >= self.write_batch_size:
+                ingested += self._flush(pending, stats, errors, stop)
+                pending = []
+                pending_count = 0
+
+        if pending and not stop.is_set():
+            ingested += self._flush(pending, stats, errors, stop)
+        return ingested
+
+    def _commit(
+        self,
+        ids: List[str],
+        texts: List[str],
+        vectors: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        self.vector_store.add_embeddings_directly(texts, vectors, metadatas, ids)
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, texts, metadatas)
+
+    def _flush(
+        self,
+        pending: List[Tuple[int, List[Record], List[List[float]]]],
+        stats: _StageStats,
+        errors: List[BaseException],
+        stop: threading.Event,
+    ) -> int:
+        records = [record for _, batch, _ in pending for record in batch]
+        ids = [record[0] for record in records]
+        texts = [record[1] for record in records]
+        metadatas = [record[2] for record in records]
+        vectors = [
+            vector for _, _, batch_vectors in pending for vector in batch_vectors
+        ]
+
+        try:
+            start = time.perf_counter()
+            call_with_retries(
+                self._commit,
+                self.max_attempts,
+                f"Writing {len(records)} records",
+                ids,
+                texts,
+                vectors,
+                metadatas,
+            )
+            stats.record(len(records), time.perf_counter() - start)
+        except BaseException as e:
+            logger.error(f"Write stage failed: {str(e)}")
+            for batch_start, batch, _ in pending:
+                self._fail(batch_start, batch, e, errors, stop)
+            return 0
+
+        if self._on_commit is not None:
+            for batch_start, batch, _ in pending:
+                self._on_commit(batch_start, [record[0] for record in batch])
+        return len(records)
+
+    def _fail(
+        self,
+        batch_start: int,
+        batch: List[Record],
+        error: BaseException,
+        errors: List[BaseException],
+        stop: threading.Event,
+    ) -> None:
+        """
+        Reports a batch that failed all its attempts, or stops the pipeline when
+        there is no failure callback or the error is not a regular exception.
+        """
+        if self._on_failure is None or not isinstance(error, Exception):
+            errors.append(error)
+            stop.set()
+            return
+        with self._failed_lock:
+            self._failed += len(batch)
+            self._on_failure(batch_start, [record[0] for record in batch], error)
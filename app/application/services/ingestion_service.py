@@ -1,10 +1,33 @@
 import logging
 import os
-from langchain_core.documents import Document
+import threading
+import traceback
+from typing import Iterable, Iterator, List, Set
+from langchain_core.embeddings import Embeddings
+from app.application.services.ingestion_pipeline import (
+    IngestionPipeline,
+    Record,
+    embed_missing,
+)
+from app.domain.entities.chunk import Chunk
 from app.logs import get_logger
+from app.retry import call_with_retries
 
 from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.embeddings.embeddings_factory import (
+    create_ingestion_embeddings,
+)
+from app.infrastructure.ingestion.checkpoint_journal import CheckpointJournal
+from app.infrastructure.ingestion.ingestion_manifest import (
+    IngestionManifest,
+    content_hash_id,
+)
 from app.infrastructure.processors.text_document_processor import DocumentProcessor
+from app.infrastructure.search.bm25_index import BM25Index
+from app.infrastructure.vector_store.vector_store_registry import (
+    vector_store_registry,
+)
+from app.settings import settings
 
 
 logger = get_logger(__name__)
@@ -14,80 +37,359 @@ class IngestorService:
     """
     Service for processing documents, generating embeddings, and ingesting them directly into the vector store,
     without the need for intermediate storage.
+
+    Chunk IDs are content hashes of the normalized text and its source. A manifest per source keeps
+    the IDs of the last run, so a re-run only embeds new or changed chunks and deletes vanished ones.
+    During a run, a checkpoint journal records every committed and failed batch, so an interrupted
+    run can be resumed without writing the committed chunks again.
     """
 
-    def __init__(self, vector_store: IVectorStore, batch_size: int = 500):
+    def __init__(
+        self,
+        vector_store: IVectorStore = None,
+        batch_size: int = 500,
+        lexical_index: BM25Index = None,
+        pipelined: bool = None,
+        embeddings: Embeddings = None,
+        single_pass: bool = None,
+        resume: bool = None,
+    ):
         """
         Initializes the ingestion service.
 
         Args:
-            vector_store (IVectorStore): Instance of the vector store to use for ingestion.
+            vector_store (IVectorStore, optional): Instance of the vector store to use for ingestion.
+                Defaults to the shared store from the vector store registry.
             batch_size (int): Size of the batches for processing and ingestion.
+            lexical_index (BM25Index, optional): BM25 index updated alongside the vector writes.
+                Defaults to the registry index of the vector store's collection.
+            pipelined (bool, optional): Overlaps chunking, embedding and writing with an
+                IngestionPipeline. Overrides settings.INGESTION_PIPELINED.
+            embeddings (Embeddings, optional): Embedding function used for the chunks, whose
+                vectors are then written to the store. Defaults to an EmbeddingExecutor, created
+                on first use and released by close().
+            single_pass (bool, optional): Writes chunk vectors derived from the sentence embeddings
+                of the semantic chunker instead of embedding every chunk again. Chunkers that
+                compute no embeddings fall back to embedding the chunks.
+                Overrides settings.INGESTION_SINGLE_PASS.
+            resume (bool, optional): Skips the chunks committed by an interrupted run of the same
+                source, according to its checkpoint journal. Overrides settings.INGESTION_RESUME.
         """
-        self.vector_store = vector_store
+        self.vector_store = vector_store or vector_store_registry.get_store()
+        self.lexical_index = lexical_index
+        if self.lexical_index is None:
+            self.lexical_index = vector_store_registry.get_lexical_index(
+                self.vector_store.collection_name, self.vector_store.persist_directory
+            )
         self.batch_size = batch_size
+        self.pipelined = (
+            settings.INGESTION_PIPELINED if pipelined is None else pipelined
+        )
+        self._embeddings = embeddings
+        self._owns_embeddings = embeddings is None
+        self._embeddings_lock = threading.Lock()
+        self.single_pass = (
+            settings.INGESTION_SINGLE_PASS if single_pass is None else single_pass
+        )
+        self.resume = settings.INGESTION_RESUME if resume is None else resume
         self.document_processor = DocumentProcessor()
+        self.last_report = None
 
-    def process_and_ingest_text(self, text: str) -> int:
+    @property
+    def embeddings(self) -> Embeddings:
+        with self._embeddings_lock:
+            if self._embeddings is None:
+                self._embeddings = create_ingestion_embeddings()
+            return self._embeddings
+
+    def close(self) -> None:
         """
-        Processes a simple text, generates chunks, creates embeddings, and ingests them directly
-        into the vector store in a single flow.
+        Releases the embedding executor created by the service, with its worker threads.
+        Embedding functions passed to the constructor are left to their owner.
+        """
+        if not self._owns_embeddings:
+            return
+        with self._embeddings_lock:
+            embeddings, self._embeddings = self._embeddings, None
+        if embeddings is not None:
+            embeddings.close()
+
+    def __enter__(self) -> "IngestorService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _manifest(self, source: str) -> IngestionManifest:
+        return IngestionManifest(
+            os.path.join(
+                self.vector_store.persist_directory,
+                "manifests",
+                self.vector_store.collection_name,
+            ),
+            source,
+        )
 
-        Args:
-            text (str): Text to be processed.
+    def _journal(self, source: str) -> CheckpointJournal:
+        return CheckpointJournal(
+            os.path.join(
+                self.vector_store.persist_directory,
+                "journals",
+                self.vector_store.collection_name,
+            ),
+            source,
+            resume=self.resume,
+        )
+
+    def _committed_ids(self, journal: CheckpointJournal) -> Set[str]:
+        """
+        Returns the IDs the journal records as committed that are in the vector store; stores
+        that persist on demand may have lost the others in a crash. The lexical index is only
+        saved at the end of a run, so _new_records re-indexes the ones it lacks.
+        """
+        ids = sorted(journal.committed_ids)
+        committed = set()
+        for i in range(0, len(ids), self.batch_size):
+            batch = ids[i : i + self.batch_size]
+            vectors = self.vector_store.get_embeddings(batch)
+            committed.update(
+                doc_id for doc_id, vector in zip(batch, vectors) if len(vector)
+            )
+        return committed
+
+    def _text_records(
+        self,
+        chunks: Iterable[Chunk],
+        source: str,
+        title: str = None,
+    ) -> Iterator[Record]:
+        # Metadata holds no chunk position: unchanged chunks are not rewritten when an edit
+        # shifts them, so a stored position would go stale.
+        for chunk in chunks:
+            doc_id = content_hash_id(chunk.text, source)
+            yield (
+                doc_id,
+                chunk.text,
+                {
+                    "chunk_id": doc_id,
+                    "source": title or "Darwin's Origin of Species",
+                    "source_type": "book_content",
+                    "category": "MAIN_BOOK_CONTENT",
+                },
+                chunk.vector,
+            )
+
+    def _json_records(
+        self, chunks: Iterable[Chunk], metadata_fields: dict = None
+    ) -> Iterator[Record]:
+        for chunk in chunks:
+            metadata = chunk.metadata
+            doc_id = content_hash_id(
+                chunk.text, f"{metadata.get('source')}:{metadata.get('source_type')}"
+            )
+            if metadata_fields:
+                for field_name, field_path in metadata_fields.items():
+                    metadata[field_name] = field_path  # Simplified for now
+            yield doc_id, chunk.text, metadata, chunk.vector
+
+    def _new_records(
+        self,
+        records: Iterable[Record],
+        manifest: IngestionManifest,
+        committed_ids: Set[str] = frozenset(),
+    ) -> Iterator[Record]:
+        """
+        Passes on only the records the manifest has not seen, dropping unchanged and duplicate chunks
+        and the chunks an interrupted run already committed. Committed chunks missing from the
+        lexical index are added to it from their records, which have the same content as their IDs.
+        """
+        reindex: List[Record] = []
+        for record in records:
+            if manifest.observe(record[0]) != "added":
+                continue
+            if record[0] not in committed_ids:
+                yield record
+            elif record[0] not in self.lexical_index:
+                reindex.append(record)
+                if len(reindex) >= self.batch_size:
+                    self._index_lexically(reindex)
+                    reindex = []
+        if reindex:
+            self._index_lexically(reindex)
+
+    def _index_lexically(self, batch: List[Record]) -> None:
+        self.lexical_index.add(
+            [record[0] for record in batch],
+            [record[1] for record in batch],
+            [record[2] for record in batch],
+        )
+
+    def _ingest(self, records: Iterable[Record], manifest: IngestionManifest) -> int:
+        """
+        Ingests the new records, deletes the vanished ones and saves the manifest.
+        Batches that fail all their attempts are journaled, left out of the manifest so the
+        next run retries them, and reported in last_report["missing_ids"].
 
         Returns:
             int: Total number of embeddings ingested.
         """
-        logging.info("Starting text processing and direct ingestion")
-
-        chunks = self.document_processor.chunk_text(text)
-        logging.info(f"Generated {len(chunks)} chunks from the text")
+        journal = self._journal(manifest.source)
+        try:
+            committed_ids = self._committed_ids(journal) if self.resume else set()
+            records = self._new_records(records, manifest, committed_ids)
+            with self.vector_store.bulk_load():
+                if self.pipelined:
+                    pipeline = IngestionPipeline(
+                        self.vector_store,
+                        self.lexical_index,
+                        batch_size=self.batch_size,
+                        embeddings=self.embeddings,
+                    )
+                    self.last_report = pipeline.run(
+                        records, on_commit=journal.commit, on_failure=journal.fail
+                    )
+                    total_ingested = self.last_report["ingested"]
+                else:
+                    total_ingested = self._ingest_batches(list(records), journal)
+                    self.last_report = {"ingested": total_ingested}
+        except BaseException:
+            journal.close()
+            raise
+
+        missing_ids = journal.missing_ids()
+        if missing_ids:
+            logging.warning(
+                f"{len(missing_ids)} chunks of '{manifest.source}' failed to ingest "
+                f"and will be retried by the next run"
+            )
+            manifest.discard(missing_ids)
+
+        removed_ids = manifest.removed_ids()
+        if removed_ids:
+            logging.info(f"Removing {len(removed_ids)} vanished chunks")
+            self.vector_store.delete(removed_ids)
+            self.lexical_index.remove(removed_ids)
+
+        self.vector_store.persist()
+        self.lexical_index.save()
+        manifest.save()
+        journal.close(remove=True)
+
+        self.last_report.update(manifest.report())
+        self.last_report["resumed"] = len(committed_ids)
+        self.last_report["missing_ids"] = missing_ids
+        logging.info(f"Ingestion report for '{manifest.source}': {manifest.report()}")
+        return total_ingested
 
+    def _ingest_batches(self, records: List[Record], journal: CheckpointJournal) -> int:
+        """
+        Embeds and writes the records batch by batch, retrying each batch up to
+        settings.INGESTION_MAX_BATCH_ATTEMPTS times, and journals the outcome of every batch.
+        """
         total_ingested = 0
-        total_batches = (len(chunks) + self.batch_size - 1) // self.batch_size
+        total_batches = (len(records) + self.batch_size - 1) // self.batch_size
 
-        logging.info(f"Total chunks: {len(chunks)}")
+        logging.info(f"Total chunks: {len(records)}")
         logging.info(f"Batch size: {self.batch_size}")
         logging.info(f"Total batches: {total_batches}")
 
-        for i in range(0, len(chunks), self.batch_size):
-            batch_chunks = chunks[i : i + self.batch_size]
+        for i in range(0, len(records), self.batch_size):
+            batch = records[i : i + self.batch_size]
             batch_num = (i // self.batch_size) + 1
+            ids = [record[0] for record in batch]
 
             logging.info(
-                f"Processing batch {batch_num}/{total_batches} ({len(batch_chunks)} chunks)"
+                f"Processing batch {batch_num}/{total_batches} ({len(batch)} chunks)"
             )
 
             try:
-                documents = [
-                    Document(
-                        page_content=chunk.text,
-                        metadata={
-                            "chunk_id": chunk.id,
-                            "source": "Darwin's Origin of Species",
-                            "category": "MAIN_BOOK_CONTENT",
-                            "section_number": i + j,
-                        },
-                    )
-                    for j, chunk in enumerate(batch_chunks)
-                ]
-
-                ids = [f"doc_{total_ingested + j}" for j in range(len(batch_chunks))]
-
-                logging.info(f"Adding {len(documents)} documents to ChromaDB")
-
-                self.vector_store.add_documents_directly(documents, ids)
+                call_with_retries(
+                    self._ingest_batch,
+                    settings.INGESTION_MAX_BATCH_ATTEMPTS,
+                    f"Batch {batch_num}",
+                    batch,
+                )
+                journal.commit(i, ids)
 
-                total_ingested += len(batch_chunks)
+                total_ingested += len(batch)
                 logging.info(f"Batch {batch_num} processed and ingested successfully")
 
             except Exception as e:
                 logging.error(f"Error processing batch {batch_num}: {str(e)}")
+                logging.error(traceback.format_exc())
+                journal.fail(i, ids, e)
+
+        return total_ingested
 
-        logging.info(
-            f"Successfully ingested. Total ingestion: {total_ingested}/{len(chunks)}"
+    def _ingest_batch(self, batch: List[Record]) -> None:
+        ids = [record[0] for record in batch]
+        texts = [record[1] for record in batch]
+        metadatas = [record[2] for record in batch]
+        vectors = embed_missing(self.embeddings, batch)
+        self.vector_store.add_embeddings_directly(texts, vectors, metadatas, ids)
+        self.lexical_index.add(ids, texts, metadatas)
+
+    def ingest_text_chunks(
+        self, chunks: Iterable[Chunk], path: str, title: str = None
+    ) -> int:
+        """
+        Ingests chunks already produced from a text file, e.g. by a separate chunking process.
+
+        Args:
+            chunks (Iterable[Chunk]): Chunks of the file, in document order.
+            path (str): Path of the text file, which identifies its manifest.
+            title (str, optional): Source name stored in the chunk metadata.
+
+        Returns:
+            int: Total number of embeddings ingested.
+        """
+        return self._ingest(
+            self._text_records(chunks, source=path, title=title),
+            self._manifest(path),
         )
+
+    def ingest_json_chunks(
+        self, chunks: Iterable[Chunk], path: str, metadata_fields: dict = None
+    ) -> int:
+        """
+        Ingests chunks already produced from a JSON file, e.g. by a separate chunking process.
+
+        Args:
+            chunks (Iterable[Chunk]): Chunks of the file, with source and source_type metadata.
+            path (str): Path of the JSON file, which identifies its manifest.
+            metadata_fields (dict, optional): Extra metadata set on every chunk.
+
+        Returns:
+            int: Total number of embeddings ingested.
+        """
+        return self._ingest(
+            self._json_records(chunks, metadata_fields), self._manifest(path)
+        )
+
+    def process_and_ingest_text(self, text: str) -> int:
+        """
+        Processes a simple text, generates chunks, creates embeddings, and ingests them directly
+        into the vector store in a single flow. Only chunks that changed since the last run
+        of the same file are embedded.
+
+        Args:
+            text (str): Path of the text file to be processed.
+
+        Returns:
+            int: Total number of embeddings ingested.
+        """
+        logging.info("Starting text processing and direct ingestion")
+
+        if self.pipelined or self.single_pass:
+            chunks = self.document_processor.iter_text_chunks(
+                text, with_vectors=self.single_pass
+            )
+        else:
+            chunks = self.document_processor.chunk_text(text)
+            logging.info(f"Generated {len(chunks)} chunks from the text")
+
+        total_ingested = self.ingest_text_chunks(chunks, text)
+        logging.info(f"Successfully ingested. Total ingestion: {total_ingested}")
         return total_ingested
 
     def process_and_ingest_json(
@@ -103,79 +405,21 @@ class IngestorService:
                 logging.error(f"File not found: {json_file_path}")
                 return 0
 
-            processor = DocumentProcessor()
-            chunks = processor.chunk_json(json_file_path)
-            logging.info(f"Generated Chunks: {len(chunks)}")
-
-            if chunks:
-                logging.debug(f"Sample chunk text: {chunks[0].text[:100]}...")
-                logging.debug(f"Sample chunk metadata: {chunks[0].metadata}")
-
-            if not chunks:
-                logging.warning("No chunks generated from the JSON.")
-                return 0
-
-            total_batches = (len(chunks) + self.batch_size - 1) // self.batch_size
-            total_ingested = 0
-
-            for i in range(0, len(chunks), self.batch_size):
-                batch_chunks = chunks[i : i + self.batch_size]
-                batch_num = (i // self.batch_size) + 1
-
-                logging.info(
-                    f"Processing batch {batch_num}/{total_batches} ({len(batch_chunks)} chunks)"
+            if self.pipelined or self.single_pass:
+                chunks = self.document_processor.iter_json_chunks(
+                    json_file_path, with_vectors=self.single_pass
                 )
+            else:
+                chunks = self.document_processor.chunk_json(json_file_path)
+                logging.info(f"Generated Chunks: {len(chunks)}")
 
-                try:
-                    texts = [chunk.text for chunk in batch_chunks]
-                    metadatas = [chunk.metadata for chunk in batch_chunks]
-
-                    logging.debug(
-                        f"First text sample in batch {batch_num}: {texts[0][:50]}..."
-                    )
-
-                    if metadata_fields:
-                        for metadata in metadatas:
-                            for field_name, field_path in metadata_fields.items():
-                                metadata[field_name] = field_path  # Simplified for now
-                        logging.debug(f"Enriched metadata sample: {metadatas[0]}")
-
-                    ids = [
-                        f"doc_{total_ingested + j}" for j in range(len(batch_chunks))
-                    ]
-
-                    logging.info(
-                        f"Adding batch {batch_num} to vector store with {len(texts)} texts"
-                    )
-
-                    self.vector_store.add_texts_directly(texts, metadatas, ids)
-
-                    count = getattr(self.vector_store, "_collection", {}).count()
-                    logging.info(f"Current document count in vector store: {count}")
-
-                    total_ingested += len(batch_chunks)
-                    logging.info(
-                        f"Batch {batch_num} processed and ingested successfully"
-                    )
-
-                except Exception as e:
-                    logging.error(f"Error processing batch {batch_num}: {str(e)}")
-                    logging.error(f"Error details: {type(e).__name__}")
-                    import traceback
-
-                    logging.error(traceback.format_exc())
-
-            if hasattr(self.vector_store, "_client") and hasattr(
-                self.vector_store._client, "persist"
-            ):
-                self.vector_store._client.persist()
-                logging.info("Vector store explicitly persisted to disk")
+                if not chunks:
+                    logging.warning("No chunks generated from the JSON.")
+                    return 0
 
-            try:
-                final_count = getattr(self.vector_store, "_collection", {}).count()
-                logging.info(f"Final document count in vector store: {final_count}")
-            except Exception as e:
-                logging.error(f"Error getting final count: {str(e)}")
+            total_ingested = self.ingest_json_chunks(
+                chunks, json_file_path, metadata_fields
+            )
 
             logging.info(f"Ingestion completed. Total: {total_ingested}")
             return total_ingested
@@ -206,23 +450,3 @@ class IngestorService:
             return value
         except (KeyError, TypeError):
             return None
-
-
-# if __name__ == "__main__":
-#     import logging
-#     from app.infrastructure.vector_store.chroma_vector_store import ChromaVectorStore
-
-
-#     def main():
-#         collection_json = "the_origin_of_species"
-#         persist_directory = "/home/luizg/projects/cadastra/clean-rag/data/vector_store"
-#         vector_store = ChromaVectorStore(
-#             collection_name=collection_json, persist_directory=persist_directory
-#         )
-#         ingestion_service = IngestorService(vector_store=vector_store)
-
-#         ingestion_service.process_and_ingest_text(
-#             "/home/luizg/projects/cadastra/clean-rag/data/the Origin of Species_book.txt"
-#         )
-
-#     main()
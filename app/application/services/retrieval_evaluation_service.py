@@ -0,0 +1,72 @@
+import time
+from typing import Dict, List
+from app.application.services.retrieval_service import RetrievalService
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class RetrievalEvaluationService:
+    """
+    Service for offline evaluation of retrieval quality over a labelled query set.
+    Queries are sent in batches through RetrievalService.batch_retrieve.
+    """
+
+    def __init__(
+        self, retrieval_service: RetrievalService = None, batch_size: int = 32
+    ):
+        """
+        Args:
+            retrieval_service (RetrievalService, optional): Service under evaluation.
+            batch_size (int): Number of queries per batched search.
+        """
+        self.retrieval_service = retrieval_service or RetrievalService()
+        self.batch_size = batch_size
+
+    def evaluate(
+        self, queries: List[str], relevant_ids: List[List[str]], k: int = 6
+    ) -> Dict[str, float]:
+        """
+        Evaluates the retrieval of each query against its relevant document ids.
+
+        Args:
+            queries (List[str]): Query texts.
+            relevant_ids (List[List[str]]): Relevant document ids of each query.
+            k (int): Number of documents retrieved per query.
+
+        Returns:
+            Dict[str, float]: hit_rate, recall, mrr (all @k) and queries_per_second.
+        """
+        hits = 0
+        recall_sum = 0.0
+        reciprocal_rank_sum = 0.0
+
+        start = time.perf_counter()
+        for i in range(0, len(queries), self.batch_size):
+            batch_queries = queries[i : i + self.batch_size]
+            batch_relevant = relevant_ids[i : i + self.batch_size]
+            results = self.retrieval_service.batch_retrieve(batch_queries, n_results=k)
+
+            for docs, relevant in zip(results, batch_relevant):
+                relevant = set(relevant)
+                retrieved = [doc.id for doc in docs]
+                found = relevant.intersection(retrieved)
+
+                hits += bool(found)
+                recall_sum += len(found) / len(relevant) if relevant else 0.0
+                rank = next(
+                    (r for r, doc_id in enumerate(retrieved, 1) if doc_id in relevant),
+                    None,
+                )
+                reciprocal_rank_sum += 1.0 / rank if rank else 0.0
+        elapsed = time.perf_counter() - start
+
+        n_queries = len(queries) or 1
+        report = {
+            "hit_rate": hits / n_queries,
+            "recall": recall_sum / n_queries,
+            "mrr": reciprocal_rank_sum / n_queries,
+            "queries_per_second": len(queries) / elapsed if elapsed else 0.0,
+        }
+        logger.info(f"Retrieval evaluation @{k}: {report}")
+        return report
@@ -0,0 +1,313 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.search.bm25_index import BM25Index
+from app.infrastructure.search.mmr import maximal_marginal_relevance
+from app.infrastructure.vector_store.blocking_executor import vector_store_executor
+from app.infrastructure.search.rank_fusion import reciprocal_rank_fusion
+from app.infrastructure.vector_store.vector_store_registry import (
+    vector_store_registry,
+)
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class RetrievalService:
+    """
+    Service that retrieves documents for a query, fusing dense vector search
+    with BM25 lexical search when hybrid search is enabled.
+    With MMR enabled, candidates are over-fetched and diversified with maximal marginal
+    relevance, dropping near-duplicates and limiting the total size of the returned context.
+    """
+
+    def __init__(
+        self,
+        vector_store: IVectorStore = None,
+        lexical_index: BM25Index = None,
+        hybrid: bool = None,
+        mmr: bool = None,
+    ):
+        """
+        Args:
+            vector_store (IVectorStore, optional): Vector store used for dense search.
+                Defaults to the shared store from the registry.
+            lexical_index (BM25Index, optional): Lexical index used for hybrid search.
+                Defaults to the registry index of the vector store's collection.
+            hybrid (bool, optional): Overrides settings.HYBRID_SEARCH_ENABLED.
+            mmr (bool, optional): Overrides settings.MMR_ENABLED.
+        """
+        self.vector_store = vector_store or vector_store_registry.get_store()
+        self.hybrid = settings.HYBRID_SEARCH_ENABLED if hybrid is None else hybrid
+        self.mmr = settings.MMR_ENABLED if mmr is None else mmr
+        self.lexical_index = lexical_index
+        if self.lexical_index is None and self.hybrid:
+            self.lexical_index = vector_store_registry.get_lexical_index(
+                self.vector_store.collection_name, self.vector_store.persist_directory
+            )
+
+    @property
+    def _use_hybrid(self) -> bool:
+        return (
+            self.hybrid
+            and self.lexical_index is not None
+            and len(self.lexical_index) > 0
+        )
+
+    def retrieve(
+        self,
+        query: str,
+        n_results: int = 6,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Document]:
+        """
+        Retrieves the documents most related to the query.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of documents to return.
+            filter (Dict[str, Any], optional): Metadata values the documents must have,
+                e.g. {"source_type": "book_content"}.
+
+        Returns:
+            List[Document]: Retrieved documents, most relevant first.
+        """
+        if not self.mmr:
+            return self._search(query, n_results, filter)
+
+        candidates = self._search(query, max(n_results, settings.MMR_FETCH_K), filter)
+        return self._diversify(query, candidates, n_results)
+
+    def _search(
+        self, query: str, n_results: int, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        if not self._use_hybrid:
+            return self.vector_store.direct_search(
+                query=query, n_results=n_results, filter=filter
+            )
+
+        fetch_k = max(n_results, settings.HYBRID_FETCH_K)
+        dense_docs = self.vector_store.direct_search(
+            query=query, n_results=fetch_k, filter=filter
+        )
+        return self._fuse(query, dense_docs, n_results, fetch_k, filter)
+
+    async def aretrieve(
+        self,
+        query: str,
+        n_results: int = 6,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Document]:
+        """
+        Async counterpart of retrieve. The dense search is awaited on the store; BM25 fusion
+        and MMR run in the vector store executor so the event loop is never blocked.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of documents to return.
+            filter (Dict[str, Any], optional): Metadata values the documents must have.
+
+        Returns:
+            List[Document]: Retrieved documents, most relevant first.
+        """
+        fetch_k = max(n_results, settings.MMR_FETCH_K) if self.mmr else n_results
+        if self._use_hybrid:
+            dense_k = max(fetch_k, settings.HYBRID_FETCH_K)
+            dense_docs = await self.vector_store.asearch(
+                query=query, n_results=dense_k, filter=filter
+            )
+            candidates = await vector_store_executor.run(
+                self._fuse, query, dense_docs, fetch_k, dense_k, filter
+            )
+        else:
+            candidates = await self.vector_store.asearch(
+                query=query, n_results=fetch_k, filter=filter
+            )
+
+        if not self.mmr:
+            return candidates
+        return await vector_store_executor.run(
+            self._diversify, query, candidates, n_results
+        )
+
+    def batch_retrieve(
+        self,
+        queries: List[str],
+        n_results: int = 6,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Document]]:
+        """
+        Retrieves documents for several queries, with a single batched dense search.
+
+        Args:
+            queries (List[str]): Query texts.
+            n_results (int): Number of documents to return per query.
+            filter (Dict[str, Any], optional): Metadata values the documents must have.
+
+        Returns:
+            List[List[Document]]: Retrieved documents per query, in the order of the queries.
+        """
+        if not self.mmr:
+            return self._batch_search(queries, n_results, filter)
+
+        results = self._batch_search(
+            queries, max(n_results, settings.MMR_FETCH_K), filter
+        )
+        return [
+            self._diversify(query, candidates, n_results)
+            for query, candidates in zip(queries, results)
+        ]
+
+    def _batch_search(
+        self,
+        queries: List[str],
+        n_results: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Document]]:
+        if not self._use_hybrid:
+            return self.vector_store.batch_search(
+                queries=queries, n_results=n_results, filter=filter
+            )
+
+        fetch_k = max(n_results, settings.HYBRID_FETCH_K)
+        dense_results = self.vector_store.batch_search(
+            queries=queries, n_results=fetch_k, filter=filter
+        )
+        return [
+            self._fuse(query, dense_docs, n_results, fetch_k, filter)
+            for query, dense_docs in zip(queries, dense_results)
+        ]
+
+    def retrieve_summary_first(
+        self, query: str, n_results: int = 6, min_summary_results: int = None
+    ) -> List[Document]:
+        """
+        Retrieves from the summary partition first and only searches the book content
+        when the summaries return fewer than min_summary_results documents.
+        Meant for overview questions, which the chapter summaries usually answer on their own.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Maximum number of documents to return.
+            min_summary_results (int, optional): Summaries needed to skip the book content.
+                Defaults to settings.SUMMARY_FIRST_MIN_RESULTS.
+
+        Returns:
+            List[Document]: Summary documents first, then book content documents.
+        """
+        if min_summary_results is None:
+            min_summary_results = settings.SUMMARY_FIRST_MIN_RESULTS
+
+        docs = self.retrieve(
+            query, n_results=n_results, filter={"source_type": "summary_content"}
+        )
+        if len(docs) >= min(min_summary_results, n_results):
+            return docs
+
+        logger.info(f"Only {len(docs)} summaries found, completing with book content")
+        return docs + self.retrieve(
+            query,
+            n_results=n_results - len(docs),
+            filter={"source_type": "book_content"},
+        )
+
+    async def aretrieve_summary_first(
+        self, query: str, n_results: int = 6, min_summary_results: int = None
+    ) -> List[Document]:
+        """
+        Async counterpart of retrieve_summary_first.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Maximum number of documents to return.
+            min_summary_results (int, optional): Summaries needed to skip the book content.
+                Defaults to settings.SUMMARY_FIRST_MIN_RESULTS.
+
+        Returns:
+            List[Document]: Summary documents first, then book content documents.
+        """
+        if min_summary_results is None:
+            min_summary_results = settings.SUMMARY_FIRST_MIN_RESULTS
+
+        docs = await self.aretrieve(
+            query, n_results=n_results, filter={"source_type": "summary_content"}
+        )
+        if len(docs) >= min(min_summary_results, n_results):
+            return docs
+
+        logger.info(f"Only {len(docs)} summaries found, completing with book content")
+        return docs + await self.aretrieve(
+            query,
+            n_results=n_results - len(docs),
+            filter={"source_type": "book_content"},
+        )
+
+    def _diversify(
+        self, query: str, candidates: List[Document], n_results: int
+    ) -> List[Document]:
+        """
+        Picks n_results of the candidates with maximal marginal relevance, skipping near-duplicates,
+        then keeps them while they fit in settings.RETRIEVAL_CONTEXT_CHAR_BUDGET.
+        The first document is always kept.
+        """
+        if len(candidates) <= 1:
+            return candidates[:n_results]
+
+        vectors = self.vector_store.get_embeddings([doc.id for doc in candidates])
+        if any(len(vector) == 0 for vector in vectors):
+            logger.warning("Missing embeddings for MMR candidates, skipping reranking")
+            return candidates[:n_results]
+
+        selected = maximal_marginal_relevance(
+            np.asarray(self.vector_store.embed_query(query), dtype=np.float32),
+            np.asarray(vectors, dtype=np.float32),
+            k=n_results,
+            lambda_mult=settings.MMR_LAMBDA,
+            duplicate_threshold=settings.MMR_DUPLICATE_THRESHOLD,
+        )
+
+        docs = []
+        total_chars = 0
+        for index in selected:
+            length = len(candidates[index].page_content)
+            if docs and total_chars + length > settings.RETRIEVAL_CONTEXT_CHAR_BUDGET:
+                continue
+            docs.append(candidates[index])
+            total_chars += length
+
+        logger.debug(
+            f"MMR kept {len(docs)} of {len(candidates)} candidates ({total_chars} chars)"
+        )
+        return docs
+
+    def _fuse(
+        self,
+        query: str,
+        dense_docs: List[Document],
+        n_results: int,
+        fetch_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Document]:
+        """
+        Fuses the dense results with the BM25 results of the query using reciprocal rank fusion.
+        """
+        lexical_hits = self.lexical_index.search(
+            query, n_results=fetch_k, filter=filter
+        )
+        logger.debug(
+            f"Hybrid search: {len(dense_docs)} dense and {len(lexical_hits)} lexical candidates"
+        )
+
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc in dense_docs], [doc_id for doc_id, _ in lexical_hits]],
+            k=settings.HYBRID_RRF_K,
+        )[:n_results]
+
+        docs_by_id = {doc.id: doc for doc in dense_docs}
+        missing_ids = [doc_id for doc_id, _ in fused if doc_id not in docs_by_id]
+        for doc in self.lexical_index.get_documents(missing_ids):
+            docs_by_id[doc.id] = doc
+
+        return [docs_by_id[doc_id] for doc_id, _ in fused if doc_id in docs_by_id]
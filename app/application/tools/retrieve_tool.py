@@ -1,44 +1,165 @@
-from langchain_core.tools import tool
-from app.infrastructure.vector_store.chroma_vector_store import ChromaVectorStore
+from typing import List, Literal, Optional
+from langchain_core.tools import StructuredTool, tool
+from app.application.services.retrieval_service import RetrievalService
+from app.infrastructure.vector_store.blocking_executor import vector_store_executor
+from app.infrastructure.vector_store.vector_store_registry import (
+    vector_store_registry,
+)
 from app.settings import settings
 from app.logs import get_logger
 
 logger = get_logger(__name__)
 
 
-@tool(response_format="content_and_artifact")
-def retriever_tool(query: str):
-    """Retrieve information related to a query."""
-    logger.info(f"Retrieving information for query: '{query}'")
-
-    vector_store = ChromaVectorStore(
-        collection_name="the_origin_of_species",
+def _get_retrieval_service():
+    """
+    Returns a retrieval service over the shared store, or None when the store is empty.
+    """
+    vector_store = vector_store_registry.get_store(
+        collection_name=settings.VECTOR_STORE_COLLECTION,
         persist_directory=settings.VECTOR_STORE_PATH,
-        use_embedding_function=True,
     )
 
-    if hasattr(vector_store, "_collection"):
-        count = vector_store._collection.count()
-        logger.info(
-            f"Vector store contains {count} documents in collection 'book_embeddings'"
-        )
+    count = vector_store.count()
+    logger.info(
+        f"Vector store contains {count} documents in collection '{settings.VECTOR_STORE_COLLECTION}'"
+    )
 
-        if count == 0:
-            logger.warning(
-                "The vector store is empty! No documents available for retrieval."
-            )
-            return "No documents available in the knowledge base.", []
+    if count == 0:
+        logger.warning(
+            "The vector store is empty! No documents available for retrieval."
+        )
+        return None
 
-    retrieved_docs = vector_store.direct_search(query=query, n_results=6)
-    logger.info(f"Retrieved {len(retrieved_docs)} documents")
+    return RetrievalService(vector_store=vector_store)
 
-    for i, doc in enumerate(retrieved_docs):
-        logger.info(f"Document {i+1} content preview: {doc.page_content[:100]}...")
-        logger.info(f"Document {i+1} metadata: {doc.metadata}")
 
-    serialized = "\n\n".join(
+def _serialize(retrieved_docs) -> str:
+    return "\n\n".join(
         (f"Source: {doc.metadata}\nContent: {doc.page_content}")
         for doc in retrieved_docs
     )
 
-    return serialized, retrieved_docs
+
+def _log_retrieved(retrieved_docs) -> None:
+    logger.info(f"Retrieved {len(retrieved_docs)} documents")
+    for i, doc in enumerate(retrieved_docs):
+        logger.info(f"Document {i + 1} content preview: {doc.page_content[:100]}...")
+        logger.info(f"Document {i + 1} metadata: {doc.metadata}")
+
+
+def _retrieve(
+    query: str,
+    source_type: Optional[Literal["book_content", "summary_content"]] = None,
+):
+    """Retrieve information related to a query. Set source_type to search only the book text (book_content) or only the chapter summaries (summary_content)."""
+    logger.info(
+        f"Retrieving information for query: '{query}' (source_type={source_type})"
+    )
+
+    retrieval_service = _get_retrieval_service()
+    if retrieval_service is None:
+        return "No documents available in the knowledge base.", []
+
+    retrieved_docs = retrieval_service.retrieve(
+        query=query,
+        n_results=settings.MMR_FINAL_K,
+        filter={"source_type": source_type} if source_type else None,
+    )
+    _log_retrieved(retrieved_docs)
+
+    return _serialize(retrieved_docs), retrieved_docs
+
+
+async def _aretrieve(
+    query: str,
+    source_type: Optional[Literal["book_content", "summary_content"]] = None,
+):
+    """Retrieve information related to a query. Set source_type to search only the book text (book_content) or only the chapter summaries (summary_content)."""
+    logger.info(
+        f"Retrieving information for query: '{query}' (source_type={source_type})"
+    )
+
+    retrieval_service = await vector_store_executor.run(_get_retrieval_service)
+    if retrieval_service is None:
+        return "No documents available in the knowledge base.", []
+
+    retrieved_docs = await retrieval_service.aretrieve(
+        query=query,
+        n_results=settings.MMR_FINAL_K,
+        filter={"source_type": source_type} if source_type else None,
+    )
+    _log_retrieved(retrieved_docs)
+
+    return _serialize(retrieved_docs), retrieved_docs
+
+
+retriever_tool = StructuredTool.from_function(
+    func=_retrieve,
+    coroutine=_aretrieve,
+    name="retriever_tool",
+    response_format="content_and_artifact",
+)
+
+
+@tool(response_format="content_and_artifact")
+def batch_retriever_tool(queries: List[str]):
+    """Retrieve information related to several queries at once. Prefer it over several retriever_tool calls."""
+    logger.info(f"Retrieving information for {len(queries)} queries: {queries}")
+
+    retrieval_service = _get_retrieval_service()
+    if retrieval_service is None:
+        return "No documents available in the knowledge base.", []
+
+    results = retrieval_service.batch_retrieve(
+        queries=queries, n_results=settings.MMR_FINAL_K
+    )
+
+    retrieved_docs = []
+    sections = []
+    for query, docs in zip(queries, results):
+        logger.info(f"Retrieved {len(docs)} documents for query: '{query}'")
+        retrieved_docs.extend(docs)
+        sections.append(f"Query: {query}\n\n{_serialize(docs)}")
+
+    return "\n\n".join(sections), retrieved_docs
+
+
+def _retrieve_overview(query: str):
+    """Retrieve chapter summaries related to a broad or overview question, falling back to the book text when few summaries match. Prefer it for questions about whole chapters or the book's main arguments."""
+    logger.info(f"Retrieving overview information for query: '{query}'")
+
+    retrieval_service = _get_retrieval_service()
+    if retrieval_service is None:
+        return "No documents available in the knowledge base.", []
+
+    retrieved_docs = retrieval_service.retrieve_summary_first(
+        query=query, n_results=settings.MMR_FINAL_K
+    )
+    _log_retrieved(retrieved_docs)
+
+    return _serialize(retrieved_docs), retrieved_docs
+
+
+async def _aretrieve_overview(query: str):
+    """Retrieve chapter summaries related to a broad or overview question, falling back to the book text when few summaries match. Prefer it for questions about whole chapters or the book's main arguments."""
+    logger.info(f"Retrieving overview information for query: '{query}'")
+
+    retrieval_service = await vector_store_executor.run(_get_retrieval_service)
+    if retrieval_service is None:
+        return "No documents available in the knowledge base.", []
+
+    retrieved_docs = await retrieval_service.aretrieve_summary_first(
+        query=query, n_results=settings.MMR_FINAL_K
+    )
+    _log_retrieved(retrieved_docs)
+
+    return _serialize(retrieved_docs), retrieved_docs
+
+
+overview_retriever_tool = StructuredTool.from_function(
+    func=_retrieve_overview,
+    coroutine=_aretrieve_overview,
+    name="overview_retriever_tool",
+    response_format="content_and_artifact",
+)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from uuid import uuid4
 
 
@@ -12,6 +12,7 @@ class Chunk:
     text: str
     id: str = None
     metadata: Dict[str, Any] = None
+    vector: Optional[List[float]] = None
 
     def __post_init__(self):
         if self.id is None:
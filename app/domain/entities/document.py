@@ -1,6 +1,8 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from uuid import uuid4
+from app.domain.entities.document_source import StringDocumentSource
+from app.domain.interfaces.i_document_source import IDocumentSource
 
 
 @dataclass
@@ -8,12 +10,16 @@ class Document:
     """
     Represents a document that can be processed into smaller chunks.
     It can represent a text file, PDF, or any other content source.
+
+    The text is either held in content or read on demand from text_source, e.g. a
+    memory-mapped file opened by the infrastructure layer; use read() to access it in both cases.
     """
 
-    content: str
+    content: Optional[str]
     source: str
     id: str = None
     metadata: Dict[str, Any] = None
+    text_source: Optional[IDocumentSource] = None
 
     def __post_init__(self):
         if self.id is None:
@@ -22,6 +28,11 @@ class Document:
         if self.metadata is None:
             self.metadata = {}
 
+        if self.text_source is None:
+            if self.content is None:
+                raise ValueError("A document needs either content or a text source")
+            self.text_source = StringDocumentSource(self.content)
+
     @classmethod
     def from_file(cls, file_path: str) -> "Document":
         """
@@ -43,6 +54,25 @@ class Document:
         except Exception as e:
             raise IOError(f"Erro ao ler o arquivo {file_path}: {str(e)}")
 
+    def read(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Returns the text between two offsets of the document source.
+
+        Args:
+            start: Start offset
+            end: End offset, or None for the end of the document
+
+        Returns:
+            str: Text of the span
+        """
+        if self.content is not None:
+            return self.content[start:end]
+        return self.text_source.read(start, end)
+
+    def close(self) -> None:
+        """Releases the resources of the text source, e.g. a mapped file."""
+        self.text_source.close()
+
     def get_summary(self, max_length: int = 100) -> str:
         """
         Returns a summary of the document (first few characters).
@@ -53,6 +83,11 @@ class Document:
         Returns:
             str: Document summary
         """
-        if len(self.content) <= max_length:
-            return self.content
-        return self.content[:max_length] + "..."
+        if self.content is not None:
+            head = self.content[: max_length + 1]
+        else:
+            # Offsets may be bytes, and a UTF-8 character takes at most 4 bytes.
+            head = self.read(0, self.text_source.align(4 * (max_length + 1)))
+        if len(head) <= max_length:
+            return head
+        return head[:max_length] + "..."
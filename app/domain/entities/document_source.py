@@ -0,0 +1,20 @@
+from typing import Optional
+from app.domain.interfaces.i_document_source import IDocumentSource
+
+
+class StringDocumentSource(IDocumentSource):
+    """
+    Document source over text already in memory. Offsets are character positions.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> str:
+        return self.text[start:end]
+
+    def rfind(self, sub: str, start: int, end: int) -> int:
+        return self.text.rfind(sub, start, end)
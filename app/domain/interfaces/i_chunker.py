@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+
+class IChunker(ABC):
+    """Interface for text chunking strategies."""
+
+    @abstractmethod
+    def split_text(self, text: str) -> List[str]:
+        """
+        Splits a text into chunks.
+
+        Args:
+            text (str): Text to be split.
+
+        Returns:
+            List[str]: Chunk texts, in order.
+        """
+        pass
+
+    def split_text_with_vectors(
+        self, text: str
+    ) -> List[Tuple[str, Optional[List[float]]]]:
+        """
+        Splits a text into chunks, with a chunk vector when the strategy computes one
+        as a by-product of chunking.
+
+        Args:
+            text (str): Text to be split.
+
+        Returns:
+            List[Tuple[str, Optional[List[float]]]]: (chunk text, vector or None) pairs, in order.
+        """
+        return [(chunk, None) for chunk in self.split_text(text)]
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 from app.domain.entities.chunk import Chunk
 
 
@@ -31,3 +31,35 @@ class IDocumentProcessor(ABC):
             List[Chunk]: List of generated chunks.
         """
         pass
+
+    @abstractmethod
+    def iter_text_chunks(
+        self, path_to_text: str, with_vectors: bool = False
+    ) -> Iterator[Chunk]:
+        """
+        Chunks a plain text document incrementally, yielding chunks as they are produced.
+
+        Args:
+            path_to_text (str): Path to the text document.
+            with_vectors (bool): Also sets each chunk vector from the embeddings used for chunking.
+
+        Returns:
+            Iterator[Chunk]: Generated chunks, in document order.
+        """
+        pass
+
+    @abstractmethod
+    def iter_json_chunks(
+        self, json_path: str, with_vectors: bool = False
+    ) -> Iterator[Chunk]:
+        """
+        Chunks a JSON file incrementally, yielding chunks as they are produced.
+
+        Args:
+            json_path (str): Path to the JSON file to be processed.
+            with_vectors (bool): Also sets each chunk vector from the embeddings used for chunking.
+
+        Returns:
+            Iterator[Chunk]: Generated chunks, in document order.
+        """
+        pass
@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class IDocumentSource(ABC):
+    """
+    Interface for the text of a document addressed by offsets.
+
+    Offsets are positions in the underlying representation: characters for in-memory text,
+    bytes for an encoded file. They are only produced and consumed by the source itself, so
+    callers slice the document without holding all of it as a string.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Returns the end offset of the document.
+        """
+        pass
+
+    @abstractmethod
+    def read(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Materializes the text between two offsets.
+
+        Args:
+            start (int): Start offset, inclusive.
+            end (int, optional): End offset, exclusive. Defaults to the end of the document.
+
+        Returns:
+            str: Text of the span.
+        """
+        pass
+
+    @abstractmethod
+    def rfind(self, sub: str, start: int, end: int) -> int:
+        """
+        Finds the last occurrence of sub entirely within [start, end).
+
+        Args:
+            sub (str): Text to search for.
+            start (int): Start offset of the search.
+            end (int): End offset of the search.
+
+        Returns:
+            int: Offset of the occurrence, or -1 when not found.
+        """
+        pass
+
+    def align(self, offset: int) -> int:
+        """
+        Moves an offset back to the nearest character boundary, clamped to the document.
+
+        Args:
+            offset (int): Any offset.
+
+        Returns:
+            int: An offset that can start or end a span.
+        """
+        return min(max(offset, 0), len(self))
+
+    def close(self) -> None:
+        """
+        Releases the resources of the source.
+        """
+        pass
+
+    def __enter__(self) -> "IDocumentSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
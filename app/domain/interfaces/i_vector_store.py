@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Dict, Optional
 from app.domain.entities.embedding import Embedding
 
 
@@ -9,19 +10,100 @@ class IVectorStore(ABC):
     """
 
     @abstractmethod
-    def direct_search(self, query: str, n_results: int = 5) -> List[Embedding]:
+    def direct_search(
+        self, query: str, n_results: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Embedding]:
         """
         Retrieves similar embeddings from the vector store.
 
         Args:
             query (str): Query text.
             n_results (int): Number of results to return.
+            filter (Dict[str, Any], optional): Metadata values the results must have,
+                e.g. {"source_type": "summary_content"}. Only matching documents are searched.
 
         Returns:
             List[Embedding]: List of retrieved embeddings.
         """
         pass
 
+    @abstractmethod
+    def batch_search(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Embedding]]:
+        """
+        Retrieves similar embeddings for several queries at once,
+        embedding all queries in a single request.
+
+        Args:
+            queries (List[str]): Query texts.
+            n_results (int): Number of results to return per query.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[List[Embedding]]: Retrieved embeddings per query, in the order of the queries.
+        """
+        pass
+
+    @abstractmethod
+    async def asearch(
+        self, query: str, n_results: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Embedding]:
+        """
+        Async counterpart of direct_search, meant to be awaited from the event loop.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of results to return.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[Embedding]: List of retrieved embeddings.
+        """
+        pass
+
+    @abstractmethod
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embeds a query with the embedding function of the vector store.
+
+        Args:
+            query (str): Query text.
+
+        Returns:
+            List[float]: Query embedding.
+        """
+        pass
+
+    @abstractmethod
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds texts with the embedding function of the vector store, without storing them.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One embedding per text, in order.
+        """
+        pass
+
+    @abstractmethod
+    def get_embeddings(self, ids: List[str]) -> List[List[float]]:
+        """
+        Returns the stored embeddings of the given documents.
+
+        Args:
+            ids (List[str]): Document IDs.
+
+        Returns:
+            List[List[float]]: One embedding per ID, in order. Unknown IDs get an empty list.
+        """
+        pass
+
     @abstractmethod
     def add_texts_directly(
         self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None
@@ -35,3 +117,78 @@ class IVectorStore(ABC):
             ids (List[str], optional): Document IDs.
         """
         pass
+
+    @abstractmethod
+    def add_embeddings_directly(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict] = None,
+        ids: List[str] = None,
+    ) -> None:
+        """
+        Adds texts whose embeddings were already computed, skipping the embedding function.
+
+        Args:
+            texts (List[str]): List of texts to be added.
+            embeddings (List[List[float]]): Embedding of each text.
+            metadatas (List[Dict], optional): Metadata associated with each text.
+            ids (List[str], optional): Document IDs.
+        """
+        pass
+
+    @abstractmethod
+    async def aadd_texts(
+        self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None
+    ) -> None:
+        """
+        Async counterpart of add_texts_directly, meant to be awaited from the event loop.
+
+        Args:
+            texts (List[str]): List of texts to be added.
+            metadatas (List[Dict], optional): Metadata associated with each text.
+            ids (List[str], optional): Document IDs.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """
+        Deletes documents from the vector store.
+
+        Args:
+            ids (List[str]): IDs of the documents to delete.
+        """
+        pass
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Groups the writes of a bulk ingestion, so the store can defer per-write bookkeeping
+        until the end of the load. Stores without such bookkeeping do nothing.
+        """
+        yield
+
+    @abstractmethod
+    def persist(self) -> None:
+        """
+        Flushes pending writes of the vector store to disk.
+        """
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Returns the number of documents stored in the vector store.
+
+        Returns:
+            int: Number of stored documents.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Releases the resources held by the vector store.
+        """
+        pass
@@ -0,0 +1,40 @@
+from app.domain.interfaces.i_chunker import IChunker
+from app.infrastructure.chunkers.recursive_token_chunker import RecursiveTokenChunker
+from app.settings import settings
+
+
+def create_chunker(strategy: str = None) -> IChunker:
+    """
+    Creates the chunker selected by settings.CHUNKER_STRATEGY.
+
+    Args:
+        strategy (str, optional): Overrides settings.CHUNKER_STRATEGY
+            ("semantic", "langchain_semantic" or "recursive").
+
+    Returns:
+        IChunker: The chunker instance.
+    """
+    strategy = (strategy or settings.CHUNKER_STRATEGY).lower()
+
+    if strategy == "semantic":
+        from app.infrastructure.chunkers.windowed_semantic_chunker import (
+            WindowedSemanticChunker,
+        )
+        from app.infrastructure.embeddings.embeddings_factory import (
+            create_chunker_embeddings,
+        )
+
+        return WindowedSemanticChunker(create_chunker_embeddings())
+    if strategy == "langchain_semantic":
+        from app.infrastructure.chunkers.semantic_text_chunker import (
+            SemanticTextChunker,
+        )
+        from app.infrastructure.embeddings.embeddings_factory import (
+            create_chunker_embeddings,
+        )
+
+        return SemanticTextChunker(create_chunker_embeddings())
+    if strategy == "recursive":
+        return RecursiveTokenChunker()
+
+    raise ValueError(f"Unsupported chunker strategy: {strategy}")
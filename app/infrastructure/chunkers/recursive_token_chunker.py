@@ -0,0 +1,117 @@
+import re
+from typing import List, Sequence, Tuple
+from app.domain.interfaces.i_chunker import IChunker
+from app.settings import settings
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_DEFAULT_SEPARATORS = ("\n\n", "\n", r"(?<=[.!?])\s+", r"(?<=[,;:])\s+", r"\s+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximates the token count of a text as its words and punctuation marks.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Number of tokens.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class RecursiveTokenChunker(IChunker):
+    """
+    CPU-only chunker. The text is split on the coarsest separator (paragraphs, lines,
+    sentences, clauses, words) and any piece still above chunk_size tokens is split again
+    with the next one; the pieces are then packed into chunks of up to chunk_size tokens,
+    each starting with the last chunk_overlap tokens of the previous chunk, or fewer when
+    the overlap and the next piece would not fit in chunk_size together.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = None,
+        chunk_overlap: int = None,
+        separators: Sequence[str] = _DEFAULT_SEPARATORS,
+    ):
+        """
+        Args:
+            chunk_size (int, optional): Maximum tokens per chunk. Defaults to settings.CHUNK_SIZE.
+            chunk_overlap (int, optional): Tokens shared by consecutive chunks.
+                Defaults to settings.CHUNK_OVERLAP.
+            separators (Sequence[str]): Separator regexes, from coarsest to finest.
+        """
+        self.chunk_size = chunk_size or settings.CHUNK_SIZE
+        self.chunk_overlap = (
+            settings.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        )
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({self.chunk_overlap}) must be smaller than chunk_size ({self.chunk_size})"
+            )
+        self.separators = [re.compile(separator) for separator in separators]
+
+    def _pieces(self, text: str, level: int) -> List[Tuple[str, int]]:
+        """
+        Returns (piece, tokens) pairs of at most chunk_size tokens, splitting recursively.
+        """
+        tokens = count_tokens(text)
+        if tokens <= self.chunk_size:
+            return [(text, tokens)] if tokens else []
+
+        if level == len(self.separators):
+            starts = [match.start() for match in _TOKEN_PATTERN.finditer(text)]
+            bounds = starts[:: self.chunk_size] + [len(text)]
+            return [
+                (
+                    text[bounds[i] : bounds[i + 1]].strip(),
+                    min(self.chunk_size, tokens - i * self.chunk_size),
+                )
+                for i in range(len(bounds) - 1)
+            ]
+
+        pieces = []
+        for part in self.separators[level].split(text):
+            part = part.strip()
+            if part:
+                pieces.extend(self._pieces(part, level + 1))
+        return pieces
+
+    @staticmethod
+    def _tail(text: str, tokens: int) -> str:
+        """
+        Returns the text from the start of its last tokens tokens.
+        """
+        starts = [match.start() for match in _TOKEN_PATTERN.finditer(text)]
+        return text[starts[-tokens] :] if 0 < tokens <= len(starts) else text
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Splits the text into chunks of at most chunk_size tokens with chunk_overlap tokens of overlap.
+
+        Args:
+            text (str): Text to be split.
+
+        Returns:
+            List[str]: Chunk texts, in order.
+        """
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for piece, tokens in self._pieces(text, 0):
+            if current and current_tokens + tokens > self.chunk_size:
+                chunk = " ".join(current)
+                chunks.append(chunk)
+                overlap = min(
+                    self.chunk_overlap, self.chunk_size - tokens, current_tokens
+                )
+                current, current_tokens = [], 0
+                if overlap > 0:
+                    current, current_tokens = [self._tail(chunk, overlap)], overlap
+            current.append(piece)
+            current_tokens += tokens
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
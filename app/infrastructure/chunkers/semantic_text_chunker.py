@@ -0,0 +1,124 @@
+import re
+from typing import List, Optional, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_experimental.text_splitter import SemanticChunker
+from app.domain.interfaces.i_chunker import IChunker
+
+
+class _RecordingEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that keeps the vectors of the last embed_documents call.
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self.vectors: List[List[float]] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.embeddings.embed_documents(texts)
+        self.vectors = vectors
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+def _pool_vectors(vectors: List[List[float]], weights: List[int]) -> List[float]:
+    """
+    Weighted mean of the vectors, L2-normalized.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    weights = np.asarray(weights, dtype=np.float32)
+    if weights.sum() <= 0:
+        weights = np.ones_like(weights)
+    pooled = weights @ matrix / weights.sum()
+    norm = np.linalg.norm(pooled)
+    return (pooled / norm if norm else pooled).tolist()
+
+
+class SemanticTextChunker(IChunker):
+    """
+    Chunker that splits where the embedding distance between consecutive sentences
+    is above a percentile threshold, using langchain's SemanticChunker.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        breakpoint_threshold_amount: float = 0.7,
+        breakpoint_threshold_type: str = "percentile",
+    ):
+        """
+        Args:
+            embeddings (Embeddings): Embedding function of the sentences.
+            breakpoint_threshold_amount (float): Threshold amount of the breakpoint type.
+            breakpoint_threshold_type (str): "percentile", "standard_deviation",
+                "interquartile" or "gradient".
+        """
+        self.semantic_chunker = SemanticChunker(
+            embeddings=embeddings,
+            breakpoint_threshold_amount=breakpoint_threshold_amount,
+            breakpoint_threshold_type=breakpoint_threshold_type,
+        )
+
+    def split_text(self, text: str) -> List[str]:
+        return self.semantic_chunker.split_text(text)
+
+    def split_text_with_vectors(
+        self, text: str
+    ) -> List[Tuple[str, Optional[List[float]]]]:
+        """
+        Splits the text with split_text and derives each chunk vector from the
+        sentence-group embeddings the chunker computed to find the breakpoints:
+        their mean weighted by sentence length, L2-normalized.
+
+        The chunks are the ones split_text returns, since they come from a SemanticChunker
+        with the same settings whose embedding calls are recorded. Chunks split without
+        embeddings (a single sentence, or two with the gradient threshold) and chunks that do
+        not map back to whole sentences are embedded directly.
+
+        Args:
+            text (str): Text to split.
+
+        Returns:
+            List[Tuple[str, List[float]]]: (chunk text, chunk vector) pairs, in order.
+        """
+        source = self.semantic_chunker
+        recorder = _RecordingEmbeddings(source.embeddings)
+        chunker = SemanticChunker(
+            embeddings=recorder,
+            buffer_size=source.buffer_size,
+            breakpoint_threshold_type=source.breakpoint_threshold_type,
+            breakpoint_threshold_amount=source.breakpoint_threshold_amount,
+            number_of_chunks=source.number_of_chunks,
+            sentence_split_regex=source.sentence_split_regex,
+            min_chunk_size=source.min_chunk_size,
+        )
+        chunks = chunker.split_text(text)
+
+        sentences = re.split(source.sentence_split_regex, text)
+        vectors: List[Optional[List[float]]] = [None] * len(chunks)
+        if len(recorder.vectors) == len(sentences):
+            # SemanticChunker embeds one sentence group per sentence, in order.
+            start = 0
+            for n, chunk in enumerate(chunks):
+                end = start + 1
+                while end < len(sentences) and len(
+                    " ".join(sentences[start:end])
+                ) < len(chunk):
+                    end += 1
+                if " ".join(sentences[start:end]) != chunk:
+                    break
+                vectors[n] = _pool_vectors(
+                    recorder.vectors[start:end],
+                    [len(sentence) for sentence in sentences[start:end]],
+                )
+                start = end
+
+        missing = [n for n, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = source.embeddings.embed_documents([chunks[n] for n in missing])
+            for n, vector in zip(missing, embedded):
+                vectors[n] = vector
+        return list(zip(chunks, vectors))
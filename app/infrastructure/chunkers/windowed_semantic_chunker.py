@@ -0,0 +1,246 @@
+import re
+from typing import List, Optional, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.domain.interfaces.i_chunker import IChunker
+from app.settings import settings
+
+_SENTENCE_SPLIT_REGEX = r"(?<=[.?!])\s+"
+
+BREAKPOINT_THRESHOLD_TYPES = ("percentile", "standard_deviation", "gradient")
+
+
+class WindowedSemanticChunker(IChunker):
+    """
+    Semantic chunker computed with NumPy.
+
+    Every sentence is embedded once. The embedding of the window around sentence i is the sum
+    of the normalized embeddings of sentences i - buffer_size .. i + buffer_size, obtained from
+    a cumulative sum, and the cosine distances between all adjacent windows are computed in one
+    matrix operation. Chunks are cut after the sentences whose distance is above the threshold,
+    then merged or split to honor the minimum and maximum chunk lengths.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        breakpoint_threshold_type: str = None,
+        breakpoint_threshold_amount: float = None,
+        buffer_size: int = None,
+        min_chunk_chars: Optional[int] = None,
+        max_chunk_chars: Optional[int] = None,
+        sentence_split_regex: str = _SENTENCE_SPLIT_REGEX,
+    ):
+        """
+        Args:
+            embeddings (Embeddings): Provider of the sentence embeddings.
+            breakpoint_threshold_type (str, optional): "percentile", "standard_deviation" or
+                "gradient". Defaults to settings.SEMANTIC_BREAKPOINT_THRESHOLD_TYPE.
+            breakpoint_threshold_amount (float, optional): Percentile (0-100) of the distances,
+                or of their gradient, or number of standard deviations above the mean distance.
+                Defaults to settings.SEMANTIC_BREAKPOINT_THRESHOLD_AMOUNT. Its default of 0.7 is
+                the 0.7th percentile, not the 70th, so almost every gap between sentences is a
+                breakpoint, as with the same value given to langchain's SemanticChunker.
+            buffer_size (int, optional): Sentences on each side included in a window.
+                Defaults to settings.SEMANTIC_BUFFER_SIZE.
+            min_chunk_chars (int, optional): Chunks shorter than this are merged with the next one.
+                Defaults to settings.SEMANTIC_MIN_CHUNK_CHARS.
+            max_chunk_chars (int, optional): Chunks longer than this are split again at their
+                largest distance. Defaults to settings.SEMANTIC_MAX_CHUNK_CHARS.
+            sentence_split_regex (str): Regex separating the sentences.
+        """
+        self.embeddings = embeddings
+        self.breakpoint_threshold_type = (
+            breakpoint_threshold_type or settings.SEMANTIC_BREAKPOINT_THRESHOLD_TYPE
+        )
+        if self.breakpoint_threshold_type not in BREAKPOINT_THRESHOLD_TYPES:
+            raise ValueError(
+                f"Unsupported breakpoint threshold type: {self.breakpoint_threshold_type}"
+            )
+        self.breakpoint_threshold_amount = (
+            settings.SEMANTIC_BREAKPOINT_THRESHOLD_AMOUNT
+            if breakpoint_threshold_amount is None
+            else breakpoint_threshold_amount
+        )
+        self.buffer_size = (
+            settings.SEMANTIC_BUFFER_SIZE if buffer_size is None else buffer_size
+        )
+        self.min_chunk_chars = (
+            settings.SEMANTIC_MIN_CHUNK_CHARS
+            if min_chunk_chars is None
+            else min_chunk_chars
+        )
+        self.max_chunk_chars = (
+            settings.SEMANTIC_MAX_CHUNK_CHARS
+            if max_chunk_chars is None
+            else max_chunk_chars
+        )
+        self.sentence_split_regex = re.compile(sentence_split_regex)
+
+    def _sentence_matrix(self, sentences: List[str]) -> np.ndarray:
+        matrix = np.asarray(
+            self.embeddings.embed_documents(sentences), dtype=np.float32
+        )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def window_distances(self, sentence_matrix: np.ndarray) -> np.ndarray:
+        """
+        Returns the cosine distance between the windows around each pair of adjacent sentences.
+
+        Args:
+            sentence_matrix (np.ndarray): Normalized sentence embeddings, one row per sentence.
+
+        Returns:
+            np.ndarray: n_sentences - 1 distances; distance i separates sentences i and i + 1.
+        """
+        n = len(sentence_matrix)
+        cumulative = np.vstack(
+            [
+                np.zeros((1, sentence_matrix.shape[1]), dtype=np.float32),
+                np.cumsum(sentence_matrix, axis=0),
+            ]
+        )
+        positions = np.arange(n)
+        lower = np.maximum(positions - self.buffer_size, 0)
+        upper = np.minimum(positions + self.buffer_size + 1, n)
+        windows = cumulative[upper] - cumulative[lower]
+        norms = np.linalg.norm(windows, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        windows /= norms
+        return 1.0 - np.einsum("ij,ij->i", windows[:-1], windows[1:])
+
+    def _threshold(self, distances: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Returns the breakpoint threshold and the array it applies to.
+        """
+        amount = self.breakpoint_threshold_amount
+        if self.breakpoint_threshold_type == "standard_deviation":
+            return float(distances.mean() + amount * distances.std()), distances
+        if self.breakpoint_threshold_type == "gradient":
+            gradient = (
+                np.gradient(distances)
+                if len(distances) > 1
+                else np.zeros_like(distances)
+            )
+            return float(np.percentile(gradient, amount)), gradient
+        return float(np.percentile(distances, amount)), distances
+
+    def _constrain(
+        self, ends: List[int], distances: np.ndarray, lengths: np.ndarray
+    ) -> List[int]:
+        """
+        Merges chunks below min_chunk_chars into the next one, then splits chunks above
+        max_chunk_chars at their largest internal distance until they fit or are one sentence.
+        """
+        # Chunk length = sentence lengths + one space between consecutive sentences.
+        offsets = np.concatenate([[0], np.cumsum(lengths + 1)])
+
+        def size(start: int, end: int) -> int:
+            return int(offsets[end + 1] - offsets[start] - 1)
+
+        if self.min_chunk_chars:
+            merged: List[int] = []
+            start = 0
+            for end in ends:
+                if size(start, end) >= self.min_chunk_chars or end == ends[-1]:
+                    merged.append(end)
+                    start = end + 1
+            if (
+                len(merged) > 1
+                and size(merged[-2] + 1, merged[-1]) < self.min_chunk_chars
+            ):
+                merged.pop(-2)
+            ends = merged
+
+        if not self.max_chunk_chars:
+            return ends
+
+        constrained: List[int] = []
+        stack = []
+        start = 0
+        for end in ends:
+            stack.append((start, end))
+            while stack:
+                first, last = stack.pop()
+                if first == last or size(first, last) <= self.max_chunk_chars:
+                    constrained.append(last)
+                    continue
+                cut = first + int(np.argmax(distances[first:last]))
+                stack.append((cut + 1, last))
+                stack.append((first, cut))
+            start = end + 1
+        return constrained
+
+    def _split(self, text: str) -> Tuple[List[str], np.ndarray, List[int]]:
+        """
+        Returns the sentences, their normalized embeddings and the index of the last
+        sentence of each chunk.
+        """
+        sentences = [
+            sentence
+            for sentence in self.sentence_split_regex.split(text)
+            if sentence.strip()
+        ]
+        if not sentences:
+            return [], np.zeros((0, 0), dtype=np.float32), []
+
+        matrix = self._sentence_matrix(sentences)
+        if len(sentences) == 1:
+            return sentences, matrix, [0]
+
+        distances = self.window_distances(matrix)
+        threshold, breakpoint_array = self._threshold(distances)
+        ends = np.flatnonzero(breakpoint_array > threshold).tolist()
+        ends.append(len(sentences) - 1)
+
+        lengths = np.fromiter((len(s) for s in sentences), dtype=np.int64)
+        return sentences, matrix, self._constrain(ends, distances, lengths)
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Splits the text at the semantic breakpoints between sentences.
+
+        Args:
+            text (str): Text to be split.
+
+        Returns:
+            List[str]: Chunk texts, in order.
+        """
+        sentences, _, ends = self._split(text)
+        chunks = []
+        start = 0
+        for end in ends:
+            chunks.append(" ".join(sentences[start : end + 1]))
+            start = end + 1
+        return chunks
+
+    def split_text_with_vectors(
+        self, text: str
+    ) -> List[Tuple[str, Optional[List[float]]]]:
+        """
+        Splits the text like split_text, with each chunk vector computed as the mean of its
+        sentence embeddings weighted by sentence length, L2-normalized.
+
+        Args:
+            text (str): Text to be split.
+
+        Returns:
+            List[Tuple[str, List[float]]]: (chunk text, chunk vector) pairs, in order.
+        """
+        sentences, matrix, ends = self._split(text)
+        lengths = np.fromiter((len(s) for s in sentences), dtype=np.float32)
+        pieces = []
+        start = 0
+        for end in ends:
+            pooled = lengths[start : end + 1] @ matrix[start : end + 1]
+            norm = np.linalg.norm(pooled)
+            pieces.append(
+                (
+                    " ".join(sentences[start : end + 1]),
+                    (pooled / norm if norm else pooled).tolist(),
+                )
+            )
+            start = end + 1
+        return pieces
@@ -0,0 +1,255 @@
+import base64
+import json
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that keeps recently embedded queries in an LRU cache.
+    Only embed_query is cached; document embeddings are delegated as they are.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        persist_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            embeddings (Embeddings): Embedding function used on cache misses.
+            model_name (str): Name of the embedding model, part of the cache key.
+            max_entries (int): Maximum number of cached queries.
+            max_bytes (int): Maximum size of the cached vectors in bytes.
+            ttl_seconds (float, optional): Time to live of an entry. None keeps entries until evicted.
+            persist_path (str, optional): File used to keep the cache across restarts.
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+
+        self._entries: "OrderedDict[str, Tuple[float, array]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_seconds = 0.0
+
+        if self.persist_path:
+            self.load()
+
+    def _make_key(self, text: str) -> str:
+        """
+        Builds the cache key from the model name and the whitespace-normalized text.
+        """
+        return f"{self.model_name}\x00{' '.join(text.split())}"
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, vector = entry
+            if self._is_expired(stored_at, time.time()):
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return vector.tolist()
+
+    def _put(self, key: str, vector: List[float], stored_at: float = None) -> None:
+        packed = array("f", vector)
+        size = len(packed) * packed.itemsize
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (stored_at or time.time(), packed)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, vector = self._entries.pop(key)
+        self._bytes -= len(vector) * vector.itemsize
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._make_key(text)
+        vector = self._get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self.miss_seconds += time.perf_counter() - start
+        self.misses += 1
+
+        self._put(key, vector)
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._make_key(text)
+        vector = self._get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+
+        start = time.perf_counter()
+        vector = await self.embeddings.aembed_query(text)
+        self.miss_seconds += time.perf_counter() - start
+        self.misses += 1
+
+        self._put(key, vector)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds several queries, sending all cache misses in a single embeddings request.
+
+        Args:
+            texts (List[str]): Query texts.
+
+        Returns:
+            List[List[float]]: One vector per query, in order.
+        """
+        keys = [self._make_key(text) for text in texts]
+        vectors: List[Optional[List[float]]] = [self._get(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        if missing:
+            start = time.perf_counter()
+            embedded = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.miss_seconds += time.perf_counter() - start
+            self.misses += len(missing)
+
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+                self._put(keys[i], vector)
+
+        return vectors
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the cache counters.
+        saved_seconds estimates the embedding latency avoided, using the mean latency of the misses.
+
+        Returns:
+            Dict[str, float]: Hit/miss counters, size of the cache and estimated savings.
+        """
+        lookups = self.hits + self.misses
+        mean_miss_seconds = self.miss_seconds / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "saved_calls": self.hits,
+            "saved_seconds": self.hits * mean_miss_seconds,
+        }
+
+    def save(self) -> None:
+        """
+        Writes the non-expired entries to persist_path, if configured.
+        """
+        if not self.persist_path:
+            return
+
+        now = time.time()
+        with self._lock:
+            entries = [
+                [key, stored_at, base64.b64encode(vector.tobytes()).decode("ascii")]
+                for key, (stored_at, vector) in self._entries.items()
+                if not self._is_expired(stored_at, now)
+            ]
+
+        directory = os.path.dirname(self.persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "entries": entries}, f)
+        os.replace(tmp_path, self.persist_path)
+        logger.info(f"Saved {len(entries)} query embeddings to {self.persist_path}")
+
+    def load(self) -> None:
+        """
+        Loads the entries previously saved to persist_path, skipping expired ones.
+        """
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading query embedding cache: {str(e)}")
+            return
+
+        if data.get("model") != self.model_name:
+            logger.info("Query embedding cache built with another model, ignoring it")
+            return
+
+        now = time.time()
+        for key, stored_at, encoded in data.get("entries", []):
+            if self._is_expired(stored_at, now):
+                continue
+            vector = array("f")
+            vector.frombytes(base64.b64decode(encoded))
+            self._put(key, vector, stored_at=stored_at)
+
+        logger.info(f"Loaded {len(self._entries)} query embeddings from cache")
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    Embeds several queries in one request, going through the query cache when there is one.
+
+    Args:
+        embeddings (Embeddings): Embedding function.
+        texts (List[str]): Query texts.
+
+    Returns:
+        List[List[float]]: One vector per query, in order.
+    """
+    if isinstance(embeddings, CachedQueryEmbeddings):
+        return embeddings.embed_queries(texts)
+    return embeddings.embed_documents(texts)
@@ -0,0 +1,327 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import openai
+from langchain_core.embeddings import Embeddings
+from app.domain.entities.chunk import Chunk
+from app.domain.entities.embedding import Embedding
+from app.domain.interfaces.i_embedding_provider import IEmbeddingProcessor
+from app.infrastructure.embeddings.token_bucket import TokenBucket
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+# Messages of the 400 errors returned for requests or inputs over the model limits.
+_TOO_LARGE_MARKERS = (
+    "context_length_exceeded",
+    "maximum context length",
+    "too many inputs",
+    "max number of inputs",
+    "tokens per request",
+)
+
+
+def _is_too_large(error: openai.BadRequestError) -> bool:
+    """
+    Tells whether a 400 error rejects the size of the request rather than its content.
+    """
+    message = f"{getattr(error, 'code', None) or ''} {error.message}".lower()
+    return any(marker in message for marker in _TOO_LARGE_MARKERS)
+
+
+def _load_encoding(model: str):
+    """
+    Returns the tiktoken encoding of the model, or None when it cannot be loaded
+    (tiktoken downloads its BPE files on first use).
+    """
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Token encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+class EmbeddingExecutor(IEmbeddingProcessor, Embeddings):
+    """
+    Embedding client for bulk ingestion.
+
+    Texts are packed into requests bounded by a token and an input budget, up to max_concurrency
+    requests are kept in flight, a token bucket keeps the tokens-per-minute under the account limit,
+    and rate limits and transient errors are retried with jittered exponential backoff.
+    Texts over the input token limit are truncated. Requests rejected as too large are split in
+    halves and retried, and a single text still rejected as too long is truncated further;
+    other 400 errors are raised at once.
+    """
+
+    def __init__(
+        self,
+        model: str = None,
+        api_key: str = None,
+        base_url: str = None,
+        max_tokens_per_request: int = None,
+        max_texts_per_request: int = None,
+        max_input_tokens: int = None,
+        max_concurrency: int = None,
+        tokens_per_minute: int = None,
+        max_retries: int = None,
+        client: Optional[openai.OpenAI] = None,
+    ):
+        """
+        Args:
+            model (str, optional): Embedding model. Defaults to settings.EMBEDDING_MODEL.
+            api_key (str, optional): API key. Defaults to settings.OPENAI_API_KEY.
+            base_url (str, optional): API base URL, e.g. a local embedding server.
+                Defaults to settings.EMBEDDING_BASE_URL.
+            max_tokens_per_request (int, optional): Token budget of one request.
+            max_texts_per_request (int, optional): Maximum inputs of one request.
+            max_input_tokens (int, optional): Token limit of one input; longer texts are truncated.
+            max_concurrency (int, optional): Requests in flight at once.
+            tokens_per_minute (int, optional): Token rate limit enforced client-side.
+            max_retries (int, optional): Retries of a request before giving up.
+            client (openai.OpenAI, optional): Preconfigured client.
+        """
+        self.model = model or settings.EMBEDDING_MODEL
+        self.max_tokens_per_request = (
+            max_tokens_per_request or settings.EMBEDDING_MAX_TOKENS_PER_REQUEST
+        )
+        self.max_texts_per_request = (
+            max_texts_per_request or settings.EMBEDDING_MAX_TEXTS_PER_REQUEST
+        )
+        self.max_input_tokens = max_input_tokens or settings.EMBEDDING_MAX_INPUT_TOKENS
+        self.max_concurrency = max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY
+        self.max_retries = (
+            settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.client = client or openai.OpenAI(
+            api_key=api_key or settings.OPENAI_API_KEY,
+            base_url=base_url or settings.EMBEDDING_BASE_URL,
+            max_retries=0,
+        )
+        self.rate_limiter = TokenBucket(
+            (tokens_per_minute or settings.EMBEDDING_TOKENS_PER_MINUTE) / 60.0
+        )
+        self._encoding = _load_encoding(self.model)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="embedding"
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "splits": 0,
+            "texts": 0,
+            "tokens": 0,
+            "throttled_seconds": 0.0,
+            "request_seconds": 0.0,
+        }
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Counts the tokens of a text with the model encoding, or estimates ~4 characters per token.
+
+        Args:
+            text (str): Text to measure.
+
+        Returns:
+            int: Number of tokens.
+        """
+        if self._encoding is None:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int = None) -> str:
+        """
+        Cuts a text to a number of tokens.
+
+        Args:
+            text (str): Text to cut.
+            max_tokens (int, optional): Tokens to keep. Defaults to max_input_tokens.
+
+        Returns:
+            str: The text, or its first max_tokens tokens.
+        """
+        max_tokens = self.max_input_tokens if max_tokens is None else max_tokens
+        if self._encoding is None:
+            return text[: 4 * max_tokens]
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._encoding.decode(tokens[:max_tokens])
+
+    def _fit(self, texts: List[str]) -> List[str]:
+        """
+        Truncates the texts over the input token limit.
+        """
+        fitted = []
+        for text in texts:
+            if self.count_tokens(text) > self.max_input_tokens:
+                logger.warning(
+                    f"Truncating a text of {len(text)} characters to "
+                    f"{self.max_input_tokens} tokens for embedding"
+                )
+                text = self.truncate(text)
+            fitted.append(text)
+        return fitted
+
+    def _pack(self, texts: List[str]) -> List[List[int]]:
+        """
+        Groups text indices into consecutive requests within the token and input budgets.
+        """
+        requests: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (
+                current_tokens + tokens > self.max_tokens_per_request
+                or len(current) >= self.max_texts_per_request
+            ):
+                requests.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            requests.append(current)
+        return requests
+
+    def _record(self, **counters) -> None:
+        with self._stats_lock:
+            for name, value in counters.items():
+                self._stats[name] += value
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """
+        Returns the delay before the next attempt: the server Retry-After when given,
+        otherwise exponential backoff with full jitter.
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(60.0, 0.5 * 2**attempt))
+
+    def _embed_request(self, texts: List[str]) -> List[List[float]]:
+        """
+        Sends one embeddings request, waiting for rate limit tokens and retrying transient errors.
+        """
+        tokens = sum(self.count_tokens(text) for text in texts)
+        for attempt in range(self.max_retries + 1):
+            throttled = self.rate_limiter.acquire(tokens)
+            start = time.perf_counter()
+            try:
+                response = self.client.embeddings.create(model=self.model, input=texts)
+                self._record(
+                    requests=1,
+                    texts=len(texts),
+                    tokens=tokens,
+                    throttled_seconds=throttled,
+                    request_seconds=time.perf_counter() - start,
+                )
+                return [
+                    item.embedding
+                    for item in sorted(response.data, key=lambda item: item.index)
+                ]
+            except openai.BadRequestError as e:
+                if not _is_too_large(e):
+                    raise
+                if len(texts) == 1:
+                    # The local token count underestimated the text.
+                    truncated = self.truncate(
+                        texts[0], self.count_tokens(texts[0]) // 2
+                    )
+                    if not truncated or truncated == texts[0]:
+                        raise
+                    logger.warning(
+                        f"Embedding input rejected as too long, truncating it to {len(truncated)} characters"
+                    )
+                    return self._embed_request([truncated])
+                self._record(splits=1)
+                middle = len(texts) // 2
+                logger.warning(
+                    f"Embedding request of {len(texts)} texts rejected, splitting it"
+                )
+                return self._embed_request(texts[:middle]) + self._embed_request(
+                    texts[middle:]
+                )
+            except _RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limiter.drain()
+                delay = self._backoff(attempt, e)
+                self._record(retries=1)
+                logger.warning(
+                    f"Embedding request failed ({type(e).__name__}), retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds the texts with packed, concurrent requests.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in order.
+        """
+        if not texts:
+            return []
+        texts = self._fit(texts)
+        requests = self._pack(texts)
+        futures = [
+            self._executor.submit(self._embed_request, [texts[i] for i in request])
+            for request in requests
+        ]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for request, future in zip(requests, futures):
+            for i, vector in zip(request, future.result()):
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_request(self._fit([text]))[0]
+
+    def embed_chunk(self, chunk: Chunk) -> Embedding:
+        return self.embed_chunks([chunk])[0]
+
+    def embed_chunks(self, chunks: List[Chunk]) -> List[Embedding]:
+        vectors = self.embed_documents([chunk.text for chunk in chunks])
+        return [
+            Embedding(vector=vector, chunk_id=chunk.id, text=chunk.text)
+            for chunk, vector in zip(chunks, vectors)
+        ]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the request counters.
+
+        Returns:
+            Dict[str, float]: Requests, retries, splits, texts, tokens and time spent.
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """
+        Waits for the requests in flight and stops the worker threads.
+        """
+        self._executor.shutdown(wait=True)
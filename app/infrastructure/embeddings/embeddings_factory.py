@@ -0,0 +1,70 @@
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from app.infrastructure.embeddings.cached_query_embeddings import (
+    CachedQueryEmbeddings,
+)
+from app.infrastructure.embeddings.embedding_executor import EmbeddingExecutor
+from app.infrastructure.embeddings.persistent_embedding_cache import (
+    with_embedding_cache,
+)
+from app.settings import settings
+
+
+def _create_openai_embeddings() -> Embeddings:
+    """
+    Creates the OpenAI embedding function.
+    """
+    return OpenAIEmbeddings(
+        model=settings.EMBEDDING_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY,
+        openai_api_base=settings.EMBEDDING_BASE_URL,
+    )
+
+
+def create_store_embeddings() -> Embeddings:
+    """
+    Creates the embedding function used by the vector stores,
+    with query embeddings cached according to the settings. Queries are kept out of the
+    persistent embedding cache, which only grows with document texts.
+
+    Returns:
+        Embeddings: OpenAI embeddings wrapped by the query cache.
+    """
+    return CachedQueryEmbeddings(
+        _create_openai_embeddings(),
+        model_name=settings.EMBEDDING_MODEL,
+        max_entries=settings.QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+        max_bytes=settings.QUERY_EMBEDDING_CACHE_MAX_BYTES,
+        ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        persist_path=settings.QUERY_EMBEDDING_CACHE_PATH,
+    )
+
+
+def create_chunker_embeddings() -> Embeddings:
+    """
+    Creates the embedding function used by the semantic chunker to find breakpoints,
+    behind the persistent embedding cache when settings.EMBEDDING_CACHE_PATH is set.
+
+    Returns:
+        Embeddings: OpenAI embeddings behind the persistent embedding cache.
+    """
+    return with_embedding_cache(
+        _create_openai_embeddings(),
+        model_name=settings.EMBEDDING_MODEL,
+        path=settings.EMBEDDING_CACHE_PATH,
+    )
+
+
+def create_ingestion_embeddings() -> Embeddings:
+    """
+    Creates the embedding executor used for bulk ingestion, configured from the settings
+    and behind the persistent embedding cache.
+
+    Returns:
+        Embeddings: Concurrent, rate-limited embedding client.
+    """
+    return with_embedding_cache(
+        EmbeddingExecutor(),
+        model_name=settings.EMBEDDING_MODEL,
+        path=settings.EMBEDDING_CACHE_PATH,
+    )
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from app.infrastructure.vector_store.blocking_executor import vector_store_executor
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+_LOOKUP_BATCH = 500
+
+
+class PersistentEmbeddingCache(Embeddings):
+    """
+    Embeddings wrapper backed by a SQLite text -> vector table.
+
+    Keys are the SHA-256 of the model name and the whitespace-normalized text, and vectors are
+    stored as float32 blobs. Every embedding function built for the same model and file shares the
+    cache, so a text embedded by the semantic chunker, the ingestion or a previous run is never
+    sent to the embeddings API again.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, path: str):
+        """
+        Args:
+            embeddings (Embeddings): Embedding function used on cache misses.
+            model_name (str): Name of the embedding model, part of the cache key.
+            path (str): SQLite database file.
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+    def _make_key(self, text: str) -> str:
+        normalized = " ".join(text.split())
+        return hashlib.sha256(
+            f"{self.model_name}\x00{normalized}".encode("utf-8")
+        ).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start : start + _LOOKUP_BATCH]
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+        return found
+
+    def _store(self, keys: List[str], vectors: List[List[float]]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [
+                    (key, array("f", vector).tobytes())
+                    for key, vector in zip(keys, vectors)
+                ],
+            )
+            self._connection.commit()
+
+    def _split_misses(self, texts: List[str]):
+        keys = [self._make_key(text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - sum(1 for key in keys if key not in found)
+        self.misses += len(missing)
+        return keys, found, missing
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Returns cached vectors and embeds each distinct missing text once.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in order.
+        """
+        if not texts:
+            return []
+        keys, found, missing = self._split_misses(texts)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            self._store(list(missing), vectors)
+            found.update(zip(missing, vectors))
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._make_key(text)
+        found = self._lookup([key])
+        if key in found:
+            self.hits += 1
+            return found[key]
+
+        self.misses += 1
+        vector = self.embeddings.embed_query(text)
+        self._store([key], [vector])
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async version of embed_documents; the SQLite reads and writes run in the
+        vector store executor, outside the event loop.
+        """
+        if not texts:
+            return []
+        keys, found, missing = await vector_store_executor.run(
+            self._split_misses, texts
+        )
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            await vector_store_executor.run(self._store, list(missing), vectors)
+            found.update(zip(missing, vectors))
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._make_key(text)
+        found = await vector_store_executor.run(self._lookup, [key])
+        if key in found:
+            self.hits += 1
+            return found[key]
+
+        self.misses += 1
+        vector = await self.embeddings.aembed_query(text)
+        await vector_store_executor.run(self._store, [key], [vector])
+        return vector
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the hit/miss counters of this instance.
+
+        Returns:
+            Dict[str, float]: Hits, misses and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """
+        Closes the SQLite connection and the wrapped embedding function, when it has a close().
+        """
+        with self._lock:
+            self._connection.close()
+        close = getattr(self.embeddings, "close", None)
+        if close is not None:
+            close()
+
+
+def with_embedding_cache(
+    embeddings: Embeddings, model_name: str, path: Optional[str]
+) -> Embeddings:
+    """
+    Wraps the embedding function with the persistent cache when a cache path is configured.
+
+    Args:
+        embeddings (Embeddings): Embedding function to wrap.
+        model_name (str): Name of the embedding model.
+        path (str, optional): SQLite database file. None disables the cache.
+
+    Returns:
+        Embeddings: The cached embedding function, or the given one unchanged.
+    """
+    if not path:
+        return embeddings
+    return PersistentEmbeddingCache(embeddings, model_name, path)
@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens refill continuously at rate_per_second up to capacity;
+    acquire blocks until the requested amount is available.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float = None):
+        """
+        Args:
+            rate_per_second (float): Refill rate.
+            capacity (float, optional): Maximum burst. Defaults to one minute of refill.
+        """
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity if capacity is not None else rate_per_second * 60
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def acquire(self, amount: float) -> float:
+        """
+        Takes amount tokens, waiting for the bucket to refill when needed.
+        Amounts above the capacity are capped so a single large request cannot block forever.
+
+        Args:
+            amount (float): Tokens to take.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                wait = (amount - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+            waited += wait
+
+    def drain(self) -> None:
+        """
+        Empties the bucket, e.g. after the server reported a rate limit.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
@@ -1,8 +1,13 @@
 from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, MessagesState, StateGraph
 from langchain.chat_models import init_chat_model
 from langgraph.prebuilt import ToolNode, tools_condition
-from app.application.tools.retrieve_tool import retriever_tool as retrieve
+from app.application.tools.retrieve_tool import (
+    batch_retriever_tool,
+    overview_retriever_tool,
+    retriever_tool as retrieve,
+)
 from langgraph.checkpoint.memory import MemorySaver
 
 
@@ -11,25 +16,62 @@ class GraphBuilder:
     Builds the state graph for AI submissions.
     """
 
-    def __init__(self, llm=None, retrieve_tool=None):
+    def __init__(
+        self,
+        llm=None,
+        retrieve_tool=None,
+        batch_retrieve_tool=None,
+        overview_retrieve_tool=None,
+    ):
         if llm is None:
             self.llm = init_chat_model("gpt-4o-mini", model_provider="openai")
         else:
             self.llm = llm
 
         self.retrieve_tool = retrieve_tool if retrieve_tool else retrieve
+        self.batch_retrieve_tool = (
+            batch_retrieve_tool if batch_retrieve_tool else batch_retriever_tool
+        )
+        self.overview_retrieve_tool = (
+            overview_retrieve_tool
+            if overview_retrieve_tool
+            else overview_retriever_tool
+        )
         self.graph_builder = StateGraph(MessagesState)
         self.memory = MemorySaver()
         self.config = {"configurable": {"thread_id": "abc1234"}}
 
+    def _tools(self):
+        return [
+            self.retrieve_tool,
+            self.batch_retrieve_tool,
+            self.overview_retrieve_tool,
+        ]
+
     def query_or_respond(self, state: MessagesState):
         """Generate tool call for retrieval or respond."""
-        llm_with_tools = self.llm.bind_tools([self.retrieve_tool])
+        llm_with_tools = self.llm.bind_tools(self._tools())
         response = llm_with_tools.invoke(state["messages"])
         return {"messages": [response]}
 
+    async def aquery_or_respond(self, state: MessagesState):
+        """Generate tool call for retrieval or respond, without blocking the event loop."""
+        llm_with_tools = self.llm.bind_tools(self._tools())
+        response = await llm_with_tools.ainvoke(state["messages"])
+        return {"messages": [response]}
+
     def generate(self, state: MessagesState):
         """Generate answer."""
+        response = self.llm.invoke(self._generation_prompt(state))
+        return {"messages": [response]}
+
+    async def agenerate(self, state: MessagesState):
+        """Generate answer, without blocking the event loop."""
+        response = await self.llm.ainvoke(self._generation_prompt(state))
+        return {"messages": [response]}
+
+    def _generation_prompt(self, state: MessagesState):
+        """Build the answer prompt from the latest tool messages and the conversation."""
         recent_tool_messages = []
         for message in reversed(state["messages"]):
             if message.type == "tool":
@@ -54,18 +96,20 @@ class GraphBuilder:
             if message.type in ("human", "system")
             or (message.type == "ai" and not message.tool_calls)
         ]
-        prompt = [SystemMessage(content=system_message_content)] + conversation_messages
-
-        response = self.llm.invoke(prompt)
-        return {"messages": [response]}
+        return [SystemMessage(content=system_message_content)] + conversation_messages
 
     def build_graph(self):
         """Build and compile the graph."""
-        tools = ToolNode([self.retrieve_tool])
+        tools = ToolNode(self._tools())
 
-        self.graph_builder.add_node(self.query_or_respond)
+        self.graph_builder.add_node(
+            "query_or_respond",
+            RunnableLambda(self.query_or_respond, afunc=self.aquery_or_respond),
+        )
         self.graph_builder.add_node(tools)
-        self.graph_builder.add_node(self.generate)
+        self.graph_builder.add_node(
+            "generate", RunnableLambda(self.generate, afunc=self.agenerate)
+        )
 
         self.graph_builder.set_entry_point("query_or_respond")
         self.graph_builder.add_conditional_edges(
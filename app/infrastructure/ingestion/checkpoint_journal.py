@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Set
+from app.infrastructure.ingestion.ingestion_manifest import source_file_stem
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of the batches of an ingestion run of one source.
+
+    Every committed or failed batch is appended as one line, flushed and fsynced before the
+    ingestion goes on, so after a crash the journal tells which chunks are already in the
+    vector store. The journal is removed once the run completes and its manifest is saved.
+    """
+
+    def __init__(self, directory: str, source: str, resume: bool = False):
+        """
+        Args:
+            directory (str): Directory of the journals of a collection.
+            source (str): Source the journal tracks.
+            resume (bool): Keeps the entries of an interrupted run, whose committed chunks
+                are then skipped. Otherwise any previous journal is discarded.
+        """
+        self.source = source
+        self.path = os.path.join(directory, f"{source_file_stem(source)}.journal.jsonl")
+        self.committed_ids: Set[str] = set()
+        self.failed_ids: Set[str] = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        if resume:
+            self.load()
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def load(self) -> None:
+        """
+        Loads the committed batches of a previous run. Its failed batches are not loaded,
+        they are retried like any chunk that is not committed. A truncated last line,
+        written during a crash, is ignored.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring a truncated entry of {self.path}")
+                    continue
+                if entry.get("event") == "committed":
+                    self.committed_ids.update(entry.get("ids", []))
+        logger.info(
+            f"Resuming '{self.source}': {len(self.committed_ids)} chunks already committed"
+        )
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def commit(self, batch_start: int, ids: List[str]) -> None:
+        """
+        Records a batch written to the vector store.
+
+        Args:
+            batch_start (int): Position of the first record of the batch in the run.
+            ids (List[str]): Chunk IDs of the batch.
+        """
+        self._append(
+            {
+                "event": "committed",
+                "start": batch_start,
+                "end": batch_start + len(ids),
+                "ids": ids,
+                "time": time.time(),
+            }
+        )
+        with self._lock:
+            self.committed_ids.update(ids)
+            self.failed_ids.difference_update(ids)
+
+    def fail(self, batch_start: int, ids: List[str], error: BaseException) -> None:
+        """
+        Records a batch that failed all its attempts.
+
+        Args:
+            batch_start (int): Position of the first record of the batch in the run.
+            ids (List[str]): Chunk IDs of the batch.
+            error (BaseException): Error of the last attempt.
+        """
+        self._append(
+            {
+                "event": "failed",
+                "start": batch_start,
+                "end": batch_start + len(ids),
+                "ids": ids,
+                "error": f"{type(error).__name__}: {error}",
+                "time": time.time(),
+            }
+        )
+        with self._lock:
+            self.failed_ids.update(set(ids) - self.committed_ids)
+
+    def missing_ids(self) -> List[str]:
+        """
+        Returns the IDs of the chunks of the batches that failed in this run and were never committed.
+
+        Returns:
+            List[str]: Missing chunk IDs.
+        """
+        with self._lock:
+            return sorted(self.failed_ids)
+
+    def close(self, remove: bool = False) -> None:
+        """
+        Closes the journal file.
+
+        Args:
+            remove (bool): Also deletes the file, once the run is recorded elsewhere.
+        """
+        with self._lock:
+            self._file.close()
+            if remove and os.path.exists(self.path):
+                os.remove(self.path)
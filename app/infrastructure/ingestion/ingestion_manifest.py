@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Set
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+def content_hash_id(text: str, source: str) -> str:
+    """
+    Builds a stable chunk ID from the whitespace-normalized text and its source,
+    so re-ingesting unchanged content produces the same IDs.
+
+    Args:
+        text (str): Chunk text.
+        source (str): Source the chunk comes from (file path, field, ...).
+
+    Returns:
+        str: Hex digest identifying the chunk.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{source}\x00{normalized}".encode("utf-8")).hexdigest()[:32]
+
+
+def source_file_stem(source: str) -> str:
+    """
+    Builds a file name stem unique to a source: its base name and a hash of the full source.
+
+    Args:
+        source (str): Source the file belongs to.
+
+    Returns:
+        str: File name without extension.
+    """
+    source_key = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    name = os.path.basename(source.rstrip("/")) or "source"
+    return f"{name}.{source_key}"
+
+
+class IngestionManifest:
+    """
+    Persisted list of the chunk IDs ingested from one source.
+    During a run every chunk ID is observed and classified as added, unchanged or duplicate;
+    IDs of the previous run that were not observed are the ones to remove.
+    """
+
+    def __init__(self, directory: str, source: str):
+        """
+        Args:
+            directory (str): Directory of the manifests of a collection.
+            source (str): Source the manifest tracks.
+        """
+        self.source = source
+        self.path = os.path.join(directory, f"{source_file_stem(source)}.json")
+
+        self.previous_ids: Set[str] = set()
+        self.current_ids: List[str] = []
+        self._seen: Set[str] = set()
+        self.added = 0
+        self.unchanged = 0
+        self.duplicates = 0
+
+        self.load()
+
+    def observe(self, doc_id: str) -> str:
+        """
+        Records a chunk ID of the current run.
+
+        Args:
+            doc_id (str): Content-hash ID of the chunk.
+
+        Returns:
+            str: "added" when the chunk must be ingested, "unchanged" when it was ingested
+                by a previous run, "duplicate" when the run already produced it.
+        """
+        if doc_id in self._seen:
+            self.duplicates += 1
+            return "duplicate"
+
+        self._seen.add(doc_id)
+        self.current_ids.append(doc_id)
+        if doc_id in self.previous_ids:
+            self.unchanged += 1
+            return "unchanged"
+
+        self.added += 1
+        return "added"
+
+    def discard(self, ids: List[str]) -> None:
+        """
+        Forgets IDs observed in this run whose ingestion failed, so the next run retries them.
+
+        Args:
+            ids (List[str]): IDs to forget.
+        """
+        discarded = set(ids) & self._seen
+        if not discarded:
+            return
+        self._seen -= discarded
+        self.current_ids = [
+            doc_id for doc_id in self.current_ids if doc_id not in discarded
+        ]
+        self.added -= len(discarded - self.previous_ids)
+
+    def removed_ids(self) -> List[str]:
+        """
+        Returns the IDs of the previous run that the current run did not produce.
+
+        Returns:
+            List[str]: IDs of vanished chunks.
+        """
+        return sorted(self.previous_ids - self._seen)
+
+    def report(self) -> Dict[str, int]:
+        """
+        Returns the added/unchanged/removed counters of the run.
+
+        Returns:
+            Dict[str, int]: Counters of the run.
+        """
+        return {
+            "added": self.added,
+            "unchanged": self.unchanged,
+            "removed": len(self.removed_ids()),
+            "duplicates": self.duplicates,
+        }
+
+    def save(self) -> None:
+        """
+        Writes the IDs of the current run, replacing the previous manifest.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "ids": self.current_ids}, f)
+        os.replace(tmp_path, self.path)
+        logger.info(
+            f"Saved ingestion manifest of '{self.source}' with {len(self.current_ids)} chunks"
+        )
+
+    def load(self) -> None:
+        """
+        Loads the IDs of the previous run, if any.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.previous_ids = set(json.load(f).get("ids", []))
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+RESULT_FIELDS = ("book_content", "summary_content")
+
+
+class BatchResultCache:
+    """
+    Content-addressed store of preprocessing batch results, one JSON file per batch.
+
+    Keys are the SHA-256 of the batch text, the prompt template, the model and its
+    temperature, so a rerun, or the resume of a failed run, only sends to the model the
+    batches whose inputs changed or whose result was never written. Files are written
+    atomically and unreadable ones are treated as misses.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Directory of the cached results.
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        batch: str, template: str, model_name: str, temperature: Optional[float]
+    ) -> str:
+        """
+        Builds the cache key of a batch.
+
+        Args:
+            batch (str): Text of the batch.
+            template (str): Prompt template the batch is formatted with.
+            model_name (str): Name of the chat model.
+            temperature (float, optional): Sampling temperature of the chat model.
+
+        Returns:
+            str: Hex digest identifying the batch result.
+        """
+        digest = hashlib.sha256()
+        for part in (model_name, repr(temperature), template, batch):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the cached result of a batch.
+
+        Args:
+            key (str): Key built by make_key.
+
+        Returns:
+            Optional[Dict[str, str]]: The book and summary content, or None on a miss.
+        """
+        result = None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("cache_key") == key and all(
+                isinstance(entry.get(field), str) for field in RESULT_FIELDS
+            ):
+                result = {field: entry[field] for field in RESULT_FIELDS}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch result {self._path(key)}: {e}")
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, str], batch_number: int = None) -> str:
+        """
+        Stores the result of a batch.
+
+        Args:
+            key (str): Key built by make_key.
+            result (Dict[str, str]): The book and summary content of the batch.
+            batch_number (int, optional): Position of the batch, kept for inspection.
+
+        Returns:
+            str: Path of the written file.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        entry = {"cache_key": key, "batch_number": batch_number}
+        entry.update({field: result[field] for field in RESULT_FIELDS})
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
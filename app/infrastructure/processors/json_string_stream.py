@@ -0,0 +1,201 @@
+import json
+import re
+from typing import Iterable, Iterator, Tuple, TextIO
+
+_READ_SIZE = 1 << 16
+_STRING_STOP = re.compile(r'["\\]')
+_NON_WHITESPACE = re.compile(r"\S")
+_SCALAR_END = re.compile(r"[\s,}\]]")
+
+
+class _JsonScanner:
+    """
+    Minimal incremental scanner over a JSON text stream, reading it in fixed-size blocks.
+    """
+
+    def __init__(self, file: TextIO, read_size: int = _READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self, needed: int = 1) -> bool:
+        """
+        Ensures at least needed unread characters are buffered. Returns False at end of file.
+        """
+        while len(self.buffer) - self.pos < needed:
+            data = self.file.read(self.read_size)
+            if not data:
+                return False
+            self.buffer = self.buffer[self.pos :] + data
+            self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        """
+        Returns the next non-whitespace character without consuming it.
+        """
+        while True:
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+
+    def expect(self, char: str) -> None:
+        if self.next_char() != char:
+            raise ValueError(
+                f"Expected '{char}' in JSON input, found '{self.buffer[self.pos]}'"
+            )
+        self.pos += 1
+
+    def iter_string(self) -> Iterator[str]:
+        """
+        Consumes a string value and yields its decoded content piece by piece.
+        """
+        self.expect('"')
+        while True:
+            if not self._fill():
+                raise ValueError("Unterminated JSON string")
+            match = _STRING_STOP.search(self.buffer, self.pos)
+            if match is None:
+                yield self.buffer[self.pos :]
+                self.pos = len(self.buffer)
+                continue
+
+            if match.start() > self.pos:
+                yield self.buffer[self.pos : match.start()]
+            self.pos = match.start()
+            if self.buffer[self.pos] == '"':
+                self.pos += 1
+                return
+            yield self._read_escape()
+
+    def _read_escape(self) -> str:
+        # A \uXXXX escape may be the first half of a surrogate pair, 12 characters in total.
+        self._fill(12)
+        escape = self.buffer[self.pos : self.pos + 2]
+        length = 2
+        if escape == "\\u":
+            length = 6
+            if self.buffer[self.pos + 6 : self.pos + 8] == "\\u" and (
+                0xD800 <= int(self.buffer[self.pos + 2 : self.pos + 6], 16) < 0xDC00
+            ):
+                length = 12
+        text = json.loads(f'"{self.buffer[self.pos : self.pos + length]}"')
+        self.pos += length
+        return text
+
+    def skip_value(self) -> None:
+        """
+        Consumes any JSON value.
+        """
+        char = self.next_char()
+        if char == '"':
+            for _ in self.iter_string():
+                pass
+        elif char in "{[":
+            self.pos += 1
+            closing = "}" if char == "{" else "]"
+            while self.next_char() != closing:
+                if char == "{":
+                    for _ in self.iter_string():
+                        pass
+                    self.expect(":")
+                self.skip_value()
+                if self.next_char() == ",":
+                    self.pos += 1
+            self.pos += 1
+        else:
+            while True:
+                match = _SCALAR_END.search(self.buffer, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    return
+
+
+def iter_json_string_fields(
+    path: str, fields: Iterable[str], read_size: int = _READ_SIZE
+) -> Iterator[Tuple[str, Iterator[str]]]:
+    """
+    Streams the top-level string fields of a JSON object without loading the file.
+
+    For each requested field found, in file order, yields the field name and an iterator over
+    pieces of its decoded value. The piece iterator must be consumed before advancing to
+    the next field.
+
+    Args:
+        path (str): Path of the JSON file, whose root must be an object.
+        fields (Iterable[str]): Names of the string fields to stream.
+        read_size (int): Characters read from the file at a time.
+
+    Returns:
+        Iterator[Tuple[str, Iterator[str]]]: (field name, value pieces) pairs.
+    """
+    fields = set(fields)
+    with open(path, "r", encoding="utf-8") as file:
+        scanner = _JsonScanner(file, read_size)
+        scanner.expect("{")
+        while scanner.next_char() != "}":
+            key = "".join(scanner.iter_string())
+            scanner.expect(":")
+            if key in fields and scanner.next_char() == '"':
+                pieces = scanner.iter_string()
+                yield key, pieces
+                for _ in pieces:
+                    pass
+            else:
+                scanner.skip_value()
+            if scanner.next_char() == ",":
+                scanner.pos += 1
+
+
+def normalize_whitespace(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    Collapses whitespace runs to single spaces across piece boundaries and strips both ends,
+    like " ".join(text.split()) over the concatenated pieces.
+
+    Args:
+        pieces (Iterable[str]): Text pieces.
+
+    Returns:
+        Iterator[str]: Normalized pieces.
+    """
+    started = False
+    pending_space = False
+    for piece in pieces:
+        if not piece:
+            continue
+        body = " ".join(piece.split())
+        if not body:
+            pending_space = True
+            continue
+        if started and (pending_space or piece[0].isspace()):
+            yield " "
+        yield body
+        started = True
+        pending_space = piece[-1].isspace()
+
+
+def iter_file_pieces(path: str, read_size: int = _READ_SIZE) -> Iterator[str]:
+    """
+    Reads a text file in pieces of read_size characters.
+
+    Args:
+        path (str): Path of the text file.
+        read_size (int): Characters per piece.
+
+    Returns:
+        Iterator[str]: Pieces of the file content.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        while True:
+            data = file.read(read_size)
+            if not data:
+                return
+            yield data
@@ -0,0 +1,86 @@
+import mmap
+import os
+from typing import Optional
+from app.domain.entities.document import Document
+from app.domain.interfaces.i_document_source import IDocumentSource
+
+
+class MmapDocumentSource(IDocumentSource):
+    """
+    Document source over a memory-mapped UTF-8 file. Offsets are byte positions.
+
+    Only the spans that are read are decoded, so the file is never held as a whole string and
+    its pages are loaded and evicted by the operating system. Like a file opened in text mode,
+    read() translates "\\r\\n" and "\\r" line endings to "\\n", and rfind() also matches "\\r\\n"
+    for the "\\n" of the searched text.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the UTF-8 text file.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # Empty files cannot be mapped.
+                self._data = b""
+        except Exception:
+            self._file.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> str:
+        text = self._data[start:end].decode("utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def rfind(self, sub: str, start: int, end: int) -> int:
+        encoded = sub.encode("utf-8")
+        found = self._data.rfind(encoded, start, end)
+        if b"\n" in encoded:
+            found = max(
+                found, self._data.rfind(encoded.replace(b"\n", b"\r\n"), start, end)
+            )
+        return found
+
+    def align(self, offset: int) -> int:
+        offset = min(max(offset, 0), len(self._data))
+        # UTF-8 continuation bytes are 0b10xxxxxx.
+        while 0 < offset < len(self._data) and self._data[offset] & 0xC0 == 0x80:
+            offset -= 1
+        return offset
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+def open_mmap_document(file_path: str) -> Document:
+    """
+    Creates a Document whose text is read on demand from the memory-mapped file,
+    instead of being read into memory. Close it with Document.close().
+
+    Args:
+        file_path (str): Path of the UTF-8 text file.
+
+    Returns:
+        Document: Document backed by a MmapDocumentSource.
+    """
+    try:
+        source = MmapDocumentSource(file_path)
+    except Exception as e:
+        raise IOError(f"Erro ao ler o arquivo {file_path}: {str(e)}")
+    return Document(
+        content=None,
+        source=file_path,
+        metadata={"file_path": file_path},
+        text_source=source,
+    )
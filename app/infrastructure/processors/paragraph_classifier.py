@@ -0,0 +1,212 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+BOOK = "book_content"
+SUMMARY = "summary_content"
+AMBIGUOUS = "ambiguous"
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+_CHAPTER_HEADING = re.compile(
+    r"^\s*(CHAPTER|BOOK|PART)\s+([IVXLCDM]+|\d+)\b\.?\s*(.*)$", re.IGNORECASE
+)
+_SUMMARY_HEADING = re.compile(
+    r"^\s*(SUMMARY|RECAPITULATION|CONCLUSION|CONTENTS|TABLE OF CONTENTS|"
+    r"DETAILED CONTENTS|SYNOPSIS|INDEX)\b",
+    re.IGNORECASE,
+)
+_SUMMARY_TITLE = re.compile(r"\b(SUMMARY|RECAPITULATION|SYNOPSIS)\b", re.IGNORECASE)
+_INLINE_SUMMARY = re.compile(
+    r"^\s*(Summary|Recapitulation)(\s+of\s+(the\s+)?[\w ]{0,40}?)?\s*\.?\s*(—|–|--|-|:)"
+)
+_SYNOPSIS_SEPARATOR = re.compile(r"\s*(?:—|–|--)\s*")
+_TOC_LINE = re.compile(
+    r"(\.{2,}\s*\d+\s*$)|(\s\d{1,4}\s*$)|(^\s*(CHAPTER|[IVXLC]+\.)\s)", re.IGNORECASE
+)
+_CASE_SAMPLE_CHARS = 600
+_SENTENCE_END = re.compile(r"[.!?:;\"'’”)\]]\s*$")
+
+
+@dataclass
+class Paragraph:
+    """
+    A paragraph of a text, by offsets, and its category.
+    """
+
+    start: int
+    end: int
+    label: str
+
+
+def split_paragraphs(text: str) -> List[Tuple[int, int]]:
+    """
+    Returns the (start, end) offsets of the blank-line separated paragraphs of a text,
+    without the surrounding whitespace.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        List[Tuple[int, int]]: Offsets of the non-blank paragraphs, in order.
+    """
+    spans = []
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, len(text)))
+
+    paragraphs = []
+    for start, end in spans:
+        stripped = text[start:end]
+        if not stripped.strip():
+            continue
+        start += len(stripped) - len(stripped.lstrip())
+        end -= len(stripped) - len(stripped.rstrip())
+        paragraphs.append((start, end))
+    return paragraphs
+
+
+class HeuristicParagraphClassifier:
+    """
+    Labels the paragraphs of a book as book content or summary content from their layout.
+
+    Chapter headings are book content; summary and contents headings, "Summary of the
+    chapter.—" paragraphs, dash-separated chapter synopses and table of contents lines are
+    summary content; long lowercase prose takes the section opened by the last heading, book
+    content after a chapter heading and summary content after a summary heading, and is
+    ambiguous before any heading. Anything else, such as short lines, captions or uppercase
+    blocks, is left ambiguous for the LLM. A text split into batches is classified as one
+    by passing each batch the section that section_after returns for the text before it.
+    """
+
+    # Part of the preprocessing cache keys, to be bumped whenever the rules change.
+    version = "heuristic-v2"
+
+    def __init__(
+        self,
+        min_prose_chars: int = 200,
+        min_lowercase_ratio: float = 0.6,
+        min_synopsis_segments: int = 3,
+        max_synopsis_segment_chars: int = 80,
+        min_toc_line_ratio: float = 0.6,
+    ):
+        """
+        Args:
+            min_prose_chars (int): Shorter paragraphs are never taken as prose.
+            min_lowercase_ratio (float): Minimum share of lowercase among the cased letters of prose.
+            min_synopsis_segments (int): Minimum dash-separated segments of a synopsis.
+            max_synopsis_segment_chars (int): Maximum mean segment length of a synopsis.
+            min_toc_line_ratio (float): Minimum share of table of contents lines,
+                ending with a page number or starting with a chapter number, of a contents block.
+        """
+        self.min_prose_chars = min_prose_chars
+        self.min_lowercase_ratio = min_lowercase_ratio
+        self.min_synopsis_segments = min_synopsis_segments
+        self.max_synopsis_segment_chars = max_synopsis_segment_chars
+        self.min_toc_line_ratio = min_toc_line_ratio
+
+    def _is_synopsis(self, text: str) -> bool:
+        separators = text.count("—") + text.count("–") + text.count("--")
+        if separators + 1 < self.min_synopsis_segments or len(text) > (
+            separators + 1
+        ) * (self.max_synopsis_segment_chars + 3):
+            return False
+        segments = [s for s in _SYNOPSIS_SEPARATOR.split(text) if s.strip()]
+        return (
+            len(segments) >= self.min_synopsis_segments
+            and sum(len(s) for s in segments) / len(segments)
+            <= self.max_synopsis_segment_chars
+        )
+
+    def _is_toc(self, lines: List[str]) -> bool:
+        if len(lines) < 3:
+            return False
+        toc_lines = sum(1 for line in lines if _TOC_LINE.search(line))
+        return toc_lines / len(lines) >= self.min_toc_line_ratio
+
+    def _is_prose(self, text: str, lines: List[str]) -> bool:
+        if len(text) < self.min_prose_chars:
+            return False
+        # The case of the first characters is representative of the paragraph.
+        sample = text[:_CASE_SAMPLE_CHARS]
+        lowercase = sum(map(str.islower, sample))
+        cased = lowercase + sum(map(str.isupper, sample))
+        if not cased:
+            return False
+        return lowercase / cased >= self.min_lowercase_ratio and (
+            _SENTENCE_END.search(text) is not None or len(text) / len(lines) >= 40
+        )
+
+    def _label(self, text: str, section: Optional[str]) -> Tuple[str, Optional[str]]:
+        """
+        Returns the label of a paragraph and the section open after it.
+        """
+        lines = [line for line in text.splitlines() if line.strip()]
+
+        heading = _CHAPTER_HEADING.match(lines[0])
+        if heading and len(lines[0]) <= 120:
+            title = heading.group(3)
+            rest = " ".join(lines[1:])
+            if _SUMMARY_TITLE.search(title):
+                return SUMMARY, SUMMARY
+            if not rest:
+                return BOOK, BOOK
+            if self._is_synopsis(rest) or self._is_toc(lines):
+                return SUMMARY, BOOK
+            return AMBIGUOUS, BOOK
+
+        if len(text) <= 100 and _SUMMARY_HEADING.match(text):
+            return SUMMARY, SUMMARY
+        if _INLINE_SUMMARY.match(text):
+            return SUMMARY, section
+        if self._is_toc(lines) or self._is_synopsis(text):
+            return SUMMARY, section
+        if self._is_prose(text, lines):
+            return section or AMBIGUOUS, section
+        return AMBIGUOUS, section
+
+    @staticmethod
+    def _is_heading(text: str) -> bool:
+        """
+        Tells whether a paragraph opens a section, i.e. takes a heading branch of _label.
+        """
+        first_line = text.splitlines()[0]
+        return bool(
+            (len(first_line) <= 120 and _CHAPTER_HEADING.match(first_line))
+            or (len(text) <= 100 and _SUMMARY_HEADING.match(text))
+        )
+
+    def section_after(self, text: str, section: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the section open at the end of a text, i.e. the one opened by its last heading.
+
+        Args:
+            text (str): Text to scan.
+            section (str, optional): Section open at the start of the text.
+
+        Returns:
+            Optional[str]: BOOK, SUMMARY, or None before any heading.
+        """
+        for start, end in reversed(split_paragraphs(text)):
+            if self._is_heading(text[start:end]):
+                return self._label(text[start:end], section)[1]
+        return section
+
+    def classify(self, text: str, section: Optional[str] = None) -> List[Paragraph]:
+        """
+        Labels each paragraph of a text as BOOK, SUMMARY or AMBIGUOUS.
+
+        Args:
+            text (str): Text to classify.
+            section (str, optional): Section open at the start of the text,
+                as returned by section_after for the text before it.
+
+        Returns:
+            List[Paragraph]: The paragraphs, in order.
+        """
+        paragraphs = []
+        for start, end in split_paragraphs(text):
+            label, section = self._label(text[start:end], section)
+            paragraphs.append(Paragraph(start, end, label))
+        return paragraphs
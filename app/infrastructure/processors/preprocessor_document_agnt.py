@@ -1,83 +1,131 @@
-from typing import List, Optional, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Iterable, List, Optional, Dict, Set, TextIO, Tuple
 from langchain_openai import ChatOpenAI
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, END
 import json
 import os
+import tempfile
 from pathlib import Path
 from datetime import datetime
 from pydantic import BaseModel
 
 from app.domain.entities.chunk import Chunk
+from app.domain.interfaces.i_document_source import IDocumentSource
+from app.infrastructure.processors.batch_result_cache import BatchResultCache
+from app.infrastructure.processors.json_string_stream import iter_file_pieces
+from app.infrastructure.processors.mmap_document_source import MmapDocumentSource
+from app.infrastructure.processors.paragraph_classifier import (
+    AMBIGUOUS,
+    BOOK,
+    SUMMARY,
+    HeuristicParagraphClassifier,
+    Paragraph,
+)
+from app.retry import call_with_retries
 from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
 
 
 class DocumentProcessorState(BaseModel):
-    document_text: str
+    # Only handles live in the graph state, which LangGraph copies and validates at every
+    # step: the text is read span by span from document_path and the batch results are
+    # read back from the batch cache by key, so the state size does not grow with the text.
+    document_path: str
     document_name: str = "document"
-    batches: List[str] = []
-    current_batch_idx: int = 0
-    book_content: str = ""
-    summary_content: str = ""
-    batch_results: List[Dict[str, str]] = []
+    batch_spans: List[Tuple[int, int]] = []
+    batch_keys: List[str] = []
+    cached_batches: int = 0
     output_dir: str = "processed_documents"
     error: Optional[str] = None
 
 
-def split_into_batches(state: DocumentProcessorState) -> DocumentProcessorState:
-    """Split the document into manageable batches."""
-    batch_size = 120000
-    overlap = 1000
-    text = state.document_text
+def open_document_source(state: DocumentProcessorState) -> IDocumentSource:
+    """Memory-map the document file. Its offsets, and so the batch sizes, are in bytes."""
+    return MmapDocumentSource(state.document_path)
 
-    os.makedirs(state.output_dir, exist_ok=True)
 
-    if len(text) <= batch_size:
-        state.batches = [text]
-        return state
+def batch_cache(state: DocumentProcessorState) -> BatchResultCache:
+    """Open the cache of the batch results of the document."""
+    return BatchResultCache(
+        os.path.join(state.output_dir, "batches", state.document_name)
+    )
+
+
+def output_paths(output_dir: str, document_name: str) -> Tuple[str, str, str]:
+    """Return the paths of the JSON, book text and summary text outputs of a document."""
+    return (
+        os.path.join(output_dir, f"{document_name}.json"),
+        os.path.join(output_dir, f"{document_name}_book.txt"),
+        os.path.join(output_dir, f"{document_name}_summary.txt"),
+    )
+
+
+def split_into_spans(
+    source: IDocumentSource, batch_size: int = None, overlap: int = None
+) -> List[Tuple[int, int]]:
+    """
+    Split a document into overlapping batches, as (start, end) offsets of the source.
+
+    Batches end at the last paragraph break, or else the last sentence end, found in
+    their second half. Only the boundary search touches the text, no batch is copied.
+
+    Args:
+        source: Source of the document text
+        batch_size: Maximum batch length, in source offsets: bytes for files,
+            characters for in-memory text. Defaults to settings.PREPROCESSING_BATCH_BYTES
+        overlap: Length shared by consecutive batches, in source offsets.
+            Defaults to settings.PREPROCESSING_BATCH_OVERLAP_BYTES
+
+    Returns:
+        List of (start, end) offsets, in order
+    """
+    batch_size = batch_size or settings.PREPROCESSING_BATCH_BYTES
+    overlap = settings.PREPROCESSING_BATCH_OVERLAP_BYTES if overlap is None else overlap
+    length = len(source)
 
-    batches = []
+    if length <= batch_size:
+        return [(0, length)]
+
+    spans = []
     start = 0
 
-    while start < len(text):
-        if start + batch_size >= len(text):
-            batches.append(text[start:])
+    while start < length:
+        if start + batch_size >= length:
+            spans.append((start, length))
             break
 
-        end = start + batch_size
-        paragraph_break = text.rfind("\n\n", start, end)
+        end = source.align(start + batch_size)
+        paragraph_break = source.rfind("\n\n", start, end)
         if paragraph_break != -1 and paragraph_break > start + batch_size // 2:
             end = paragraph_break
         else:
-            sentence_break = text.rfind(". ", start, end)
+            sentence_break = source.rfind(". ", start, end)
             if sentence_break != -1 and sentence_break > start + batch_size // 2:
                 end = sentence_break + 1
 
-        batches.append(text[start:end])
-        start = end - overlap
+        spans.append((start, end))
+        start = source.align(end - overlap)
 
-    state.batches = batches
-    return state
+    return spans
 
 
-def process_batch(state: DocumentProcessorState) -> DocumentProcessorState:
-    """Process the current batch using LLM."""
-    if state.current_batch_idx >= len(state.batches):
-        return state
+def split_into_batches(state: DocumentProcessorState) -> DocumentProcessorState:
+    """Split the document into manageable batches."""
+    os.makedirs(state.output_dir, exist_ok=True)
 
-    model = ChatOpenAI(
-        model_name=settings.CHAT_MODEL,
-        temperature=0,
-        openai_api_key=settings.OPENAI_API_KEY,
-    )
+    with open_document_source(state) as source:
+        state.batch_spans = split_into_spans(source)
+    return state
 
-    batch_dir = os.path.join(state.output_dir, "batches", state.document_name)
-    os.makedirs(batch_dir, exist_ok=True)
 
-    prompt_template = PromptTemplate(
-        input_variables=["document_text", "batch_number", "total_batches"],
-        template="""
+PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=["document_text", "batch_number", "total_batches"],
+    template="""
         You are preprocessing a document, in this case a book.
         This is batch {batch_number} of {total_batches}.
 
@@ -96,133 +144,290 @@ def process_batch(state: DocumentProcessorState) -> DocumentProcessorState:
         Document text:
         {document_text}
         """,
-    )
+)
+
+
+def parse_batch_response(content: str, batch: str) -> Dict[str, str]:
+    """Extract the categories from a model response, keeping the batch as book content when no JSON is found."""
+    try:
+        result = json.loads(content)
+    except json.JSONDecodeError:
+        start_idx = content.find("{")
+        end_idx = content.rfind("}") + 1
+
+        if start_idx < 0 or end_idx <= start_idx:
+            return {"book_content": batch, "summary_content": ""}
+        try:
+            result = json.loads(content[start_idx:end_idx])
+        except json.JSONDecodeError as e:
+            logger.warning(f"JSON parsing error within extract: {e}")
+            return {"book_content": batch, "summary_content": ""}
+
+    return {
+        "book_content": result.get("book_content", ""),
+        "summary_content": result.get("summary_content", ""),
+    }
 
-    batch = state.batches[state.current_batch_idx]
-    formatted_prompt = prompt_template.format(
+
+def run_batch(
+    model: BaseChatModel, batch: str, batch_number: int, total_batches: int
+) -> Dict[str, str]:
+    """Process one batch using the LLM."""
+    formatted_prompt = PROMPT_TEMPLATE.format(
         document_text=batch,
-        batch_number=state.current_batch_idx + 1,
-        total_batches=len(state.batches),
+        batch_number=batch_number,
+        total_batches=total_batches,
     )
+    response = model.invoke([HumanMessage(content=formatted_prompt)])
+    return parse_batch_response(response.content, batch)
 
-    try:
-        response = model.invoke([HumanMessage(content=formatted_prompt)])
 
-        batch_result = {}
+SPAN_PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=["paragraphs", "batch_number", "total_batches"],
+    template="""
+        You are preprocessing a document, in this case a book.
+        This is batch {batch_number} of {total_batches}. Most of it was already classified,
+        the numbered paragraphs below could not be.
+
+        Classify each paragraph into one of two categories:
+        1. book_content: The main content of the book
+        2. summary_content: Chapter summaries, overviews and tables of contents
+
+        Return a JSON object, WITHOUT THE PATTERNS ```json```, listing the summary_content paragraphs
+        as [first, last] ranges of paragraph numbers, both included. Every other paragraph is book_content:
+        {{"summary_spans": [[0, 2], [5, 5]]}}
+
+        DO NOT copy the paragraph texts in the answer.
+
+        Paragraphs:
+        {paragraphs}
+        """,
+)
+
+
+def parse_span_response(content: str, count: int) -> Set[int]:
+    """Extract the numbers of the summary paragraphs from a model response, none when no JSON is found."""
+    start_idx = content.find("{")
+    end_idx = content.rfind("}") + 1
+    if start_idx < 0 or end_idx <= start_idx:
+        logger.warning(
+            "No JSON in the span response, keeping the paragraphs as book content"
+        )
+        return set()
+    try:
+        result = json.loads(content[start_idx:end_idx])
+    except json.JSONDecodeError as e:
+        logger.warning(f"JSON parsing error within extract: {e}")
+        return set()
+
+    spans = result.get("summary_spans", []) if isinstance(result, dict) else []
+    indices = set()
+    for span in spans if isinstance(spans, list) else []:
         try:
-            result = json.loads(response.content)
-            batch_result = {
-                "book_content": result.get("book_content", ""),
-                "summary_content": result.get("summary_content", ""),
-            }
-        except json.JSONDecodeError:
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
+            first, last = int(span[0]), int(span[-1])
+        except (TypeError, ValueError, IndexError):
+            continue
+        indices.update(range(max(first, 0), min(last, count - 1) + 1))
+    return indices
+
+
+def run_span_batch(
+    model: BaseChatModel,
+    batch: str,
+    paragraphs: List[Paragraph],
+    batch_number: int,
+    total_batches: int,
+) -> Set[int]:
+    """Ask the LLM which of the given paragraphs of a batch are summary content."""
+    formatted_prompt = SPAN_PROMPT_TEMPLATE.format(
+        paragraphs="\n\n".join(
+            f"[{i}] {batch[p.start : p.end]}" for i, p in enumerate(paragraphs)
+        ),
+        batch_number=batch_number,
+        total_batches=total_batches,
+    )
+    response = model.invoke([HumanMessage(content=formatted_prompt)])
+    return parse_span_response(response.content, len(paragraphs))
+
+
+def run_heuristic_batch(
+    model: BaseChatModel,
+    classifier: HeuristicParagraphClassifier,
+    batch: str,
+    batch_number: int,
+    total_batches: int,
+    section: Optional[str] = None,
+) -> Dict[str, str]:
+    """Classify the paragraphs of one batch locally, sending only the ambiguous ones to the LLM."""
+    paragraphs = classifier.classify(batch, section)
+    ambiguous = [p for p in paragraphs if p.label == AMBIGUOUS]
+    if ambiguous:
+        summary = run_span_batch(model, batch, ambiguous, batch_number, total_batches)
+        for i, paragraph in enumerate(ambiguous):
+            paragraph.label = SUMMARY if i in summary else BOOK
+    logger.info(
+        f"Batch {batch_number}/{total_batches}: {len(paragraphs)} paragraphs, "
+        f"{len(ambiguous)} sent to the model"
+    )
 
-            if start_idx >= 0 and end_idx > start_idx:
-                try:
-                    json_str = content[start_idx:end_idx]
-                    result = json.loads(json_str)
-                    batch_result = {
-                        "book_content": result.get("book_content", ""),
-                        "summary_content": result.get("summary_content", ""),
-                    }
-                except json.JSONDecodeError as e:
-                    print(f"JSON parsing error within extract: {e}")
-                    batch_result = {"book_content": batch, "summary_content": ""}
-            else:
-                batch_result = {"book_content": batch, "summary_content": ""}
-
-        state.batch_results.append(batch_result)
-        state.book_content += batch_result["book_content"]
-        state.summary_content += batch_result["summary_content"]
-
-        # Save intermediate batch result to JSON file
-        batch_file = os.path.join(
-            batch_dir, f"batch_{state.current_batch_idx + 1:03d}.json"
+    return {
+        label: "".join(
+            batch[p.start : p.end] + "\n\n" for p in paragraphs if p.label == label
         )
-        with open(batch_file, "w", encoding="utf-8") as f:
-            json.dump(batch_result, f, ensure_ascii=False, indent=2)
-            print(
-                f"Saved batch {state.current_batch_idx + 1}/{len(state.batches)} to {batch_file}"
-            )
+        for label in (BOOK, SUMMARY)
+    }
 
-    except Exception as e:
-        state.error = f"Error processing batch {state.current_batch_idx}: {str(e)}"
 
-    state.current_batch_idx += 1
-    return state
+def model_identity(model: BaseChatModel) -> Tuple[str, Optional[float]]:
+    """Return the name and temperature of a chat model, which are part of the batch cache keys."""
+    name = (
+        getattr(model, "model_name", None)
+        or getattr(model, "model", None)
+        or type(model).__name__
+    )
+    return str(name), getattr(model, "temperature", None)
 
 
 def check_completion(state: DocumentProcessorState) -> str:
-    """Check if all batches have been processed."""
+    """Route to save_results unless a batch failed."""
     if state.error:
         return "handle_error"
-    elif state.current_batch_idx >= len(state.batches):
-        return "save_results"  # Go to save_results node when done
-    else:
-        return "continue"
+    return "save_results"
 
 
 def handle_error(state: DocumentProcessorState) -> DocumentProcessorState:
     """Handle any errors that occurred during processing."""
-    print(f"Error during processing: {state.error}")
+    logger.error(f"Error during processing: {state.error}")
     return state
 
 
+def _write_json_string(out: TextIO, pieces: Iterable[str]) -> None:
+    """Write the pieces as one JSON string, escaping them one at a time."""
+    out.write('"')
+    for piece in pieces:
+        out.write(json.dumps(piece, ensure_ascii=False)[1:-1])
+    out.write('"')
+
+
 def save_results(state: DocumentProcessorState) -> DocumentProcessorState:
-    """Save the final results as JSON for later chunking."""
+    """
+    Save the final results as JSON for later chunking.
+
+    The batch results are streamed from the batch cache into the book and summary text
+    files, and the JSON is written from them piece by piece, so the content is never
+    joined in memory.
+    """
+    cache = batch_cache(state)
+    json_path, book_path, summary_path = output_paths(
+        state.output_dir, state.document_name
+    )
 
     # Create the complete JSON that will be used for chunking
-    final_json = {
-        "book_content": state.book_content,
-        "summary_content": state.summary_content,
-        "metadata": {
-            "document_name": state.document_name,
-            "processed_date": datetime.now().isoformat(),
-            "total_batches": len(state.batches),
-            "error": state.error,
-        },
+    metadata = {
+        "document_name": state.document_name,
+        "processed_date": datetime.now().isoformat(),
+        "total_batches": len(state.batch_spans),
+        "cached_batches": state.cached_batches,
+        "error": state.error,
     }
 
-    # Save the final JSON to a file
-    json_path = os.path.join(state.output_dir, f"{state.document_name}.json")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(final_json, f, ensure_ascii=False, indent=2)
-
-    # Also save individual text files for convenience
-    book_path = os.path.join(state.output_dir, f"{state.document_name}_book.txt")
-    with open(book_path, "w", encoding="utf-8") as f:
-        f.write(state.book_content)
-
-    summary_path = os.path.join(state.output_dir, f"{state.document_name}_summary.txt")
-    with open(summary_path, "w", encoding="utf-8") as f:
-        f.write(state.summary_content)
+    with open(json_path, "w", encoding="utf-8") as out:
+        out.write('{\n  "book_content": ')
+        with (
+            open(book_path, "w", encoding="utf-8") as book,
+            open(summary_path, "w", encoding="utf-8") as summary,
+        ):
+            out.write('"')
+            for key in state.batch_keys:
+                batch_result = cache.get(key)
+                if batch_result is None:
+                    raise ValueError(f"Missing cached batch result {key}")
+                book.write(batch_result["book_content"])
+                summary.write(batch_result["summary_content"])
+                out.write(
+                    json.dumps(batch_result["book_content"], ensure_ascii=False)[1:-1]
+                )
+            out.write('"')
+
+        out.write(',\n  "summary_content": ')
+        _write_json_string(out, iter_file_pieces(summary_path))
+        out.write(',\n  "metadata": ')
+        out.write(
+            json.dumps(metadata, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        )
+        out.write("\n}")
 
     return state
 
 
 class DocumentPreProcessorAgent:
+    """
+    Splits a book into its main content and its chapter summaries with an LLM.
+
+    The batches are fanned out to a bounded thread pool, each one retried on failure, and
+    their results are reassembled in document order, so the wall-clock time depends on
+    the concurrency rather than on the number of batches. With the heuristic classifier,
+    the paragraphs are labeled locally and the LLM only classifies the ambiguous ones,
+    answering with paragraph ranges instead of rewriting the text. Batch results are cached under
+    processed_documents/batches/<document_name>/ by content, so a rerun or the resume of
+    a failed run only processes the batches without a result.
+    """
+
     def __init__(
-        self, model_name: Optional[str] = None, output_dir: str = "processed_documents"
+        self,
+        model_name: Optional[str] = None,
+        output_dir: str = "processed_documents",
+        chat_model: Optional[BaseChatModel] = None,
+        max_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+        classifier: Optional[str] = None,
     ):
+        """
+        Args:
+            model_name: Chat model used when chat_model is not given. Defaults to settings.CHAT_MODEL.
+            output_dir: Directory of the processed documents.
+            chat_model: Chat model of the batches, e.g. a local fake model in tests.
+            max_concurrency: Batches processed at the same time.
+                Defaults to settings.PREPROCESSING_MAX_CONCURRENCY; 1 processes them sequentially.
+            max_attempts: Calls per batch before the document fails.
+                Defaults to settings.PREPROCESSING_MAX_ATTEMPTS.
+            use_cache: Reuses the cached batch results. Defaults to settings.PREPROCESSING_CACHE_ENABLED.
+            classifier: "heuristic" to send only the ambiguous paragraphs to the LLM, or "llm"
+                to send it whole batches. Defaults to settings.PREPROCESSING_CLASSIFIER.
+        """
+        self.model_name = model_name or settings.CHAT_MODEL
+        self.chat_model = chat_model
+        self.max_concurrency = max(
+            1, max_concurrency or settings.PREPROCESSING_MAX_CONCURRENCY
+        )
+        self.max_attempts = max_attempts or settings.PREPROCESSING_MAX_ATTEMPTS
+        self.use_cache = (
+            settings.PREPROCESSING_CACHE_ENABLED if use_cache is None else use_cache
+        )
+        classifier = classifier or settings.PREPROCESSING_CLASSIFIER
+        if classifier == "heuristic":
+            self.classifier = HeuristicParagraphClassifier()
+        elif classifier == "llm":
+            self.classifier = None
+        else:
+            raise ValueError(f"Unsupported preprocessing classifier: {classifier}")
+
         # Define the processing workflow
         workflow = StateGraph(DocumentProcessorState)
 
         # Add nodes
         workflow.add_node("split_batches", split_into_batches)
-        workflow.add_node("process_batch", process_batch)
+        workflow.add_node("process_batches", self.process_batches)
         workflow.add_node("save_results", save_results)  # Add the save_results node
         workflow.add_node("handle_error", handle_error)
 
         # Define the edges
-        workflow.add_edge("split_batches", "process_batch")
+        workflow.add_edge("split_batches", "process_batches")
         workflow.add_conditional_edges(
-            "process_batch",
+            "process_batches",
             check_completion,
             {
-                "continue": "process_batch",
                 "handle_error": "handle_error",
                 "save_results": "save_results",
             },
@@ -237,6 +442,135 @@ class DocumentPreProcessorAgent:
         self.graph = workflow.compile()
         self.output_dir = output_dir
 
+    def _model(self) -> BaseChatModel:
+        if self.chat_model is None:
+            self.chat_model = ChatOpenAI(
+                model_name=self.model_name,
+                temperature=0,
+                openai_api_key=settings.OPENAI_API_KEY,
+            )
+        return self.chat_model
+
+    def _process_span(
+        self,
+        model: BaseChatModel,
+        source: IDocumentSource,
+        span: Tuple[int, int],
+        batch_idx: int,
+        total_batches: int,
+        cache: BatchResultCache,
+        section: Optional[str] = None,
+    ) -> str:
+        """
+        Process one batch, read from the source only when a worker picks it up.
+        With the heuristic classifier, section is the one open at the start of the batch.
+        Returns the cache key of its result.
+        """
+        batch = source.read(*span)
+        if self.classifier is None:
+            template = PROMPT_TEMPLATE.template
+            func, args = run_batch, (model, batch, batch_idx + 1, total_batches)
+        else:
+            template = (
+                f"{self.classifier.version}\n{section}\n{SPAN_PROMPT_TEMPLATE.template}"
+            )
+            func = run_heuristic_batch
+            args = (
+                model,
+                self.classifier,
+                batch,
+                batch_idx + 1,
+                total_batches,
+                section,
+            )
+
+        model_name, temperature = model_identity(model)
+        key = cache.make_key(batch, template, model_name, temperature)
+        if self.use_cache and cache.get(key) is not None:
+            logger.info(f"Reusing cached batch {batch_idx + 1}/{total_batches}")
+            return key
+
+        batch_result = call_with_retries(
+            func, self.max_attempts, f"Batch {batch_idx + 1}/{total_batches}", *args
+        )
+
+        # Cache the batch result as soon as it is available, for reruns and resumes
+        batch_file = cache.put(key, batch_result, batch_number=batch_idx + 1)
+        logger.info(f"Saved batch {batch_idx + 1}/{total_batches} to {batch_file}")
+        return key
+
+    def _opening_sections(
+        self, source: IDocumentSource, spans: List[Tuple[int, int]]
+    ) -> List[Optional[str]]:
+        """
+        Return the section open at the start of each batch, carried over from the headings
+        of the text before it, so the concurrent batches are labeled as in a single pass.
+        """
+        sections: List[Optional[str]] = [None]
+        for (start, _), (next_start, _) in zip(spans, spans[1:]):
+            sections.append(
+                self.classifier.section_after(
+                    source.read(start, next_start), sections[-1]
+                )
+            )
+        return sections
+
+    def process_batches(self, state: DocumentProcessorState) -> DocumentProcessorState:
+        """Process all batches concurrently and record the keys of their results in document order."""
+        cache = batch_cache(state)
+
+        model = self._model()
+        total_batches = len(state.batch_spans)
+        keys: List[Optional[str]] = [None] * total_batches
+        errors: Dict[int, str] = {}
+        with (
+            open_document_source(state) as source,
+            ThreadPoolExecutor(
+                max_workers=min(self.max_concurrency, total_batches),
+                thread_name_prefix="preprocess",
+            ) as pool,
+        ):
+            sections = (
+                [None] * total_batches
+                if self.classifier is None
+                else self._opening_sections(source, state.batch_spans)
+            )
+            futures = {
+                pool.submit(
+                    self._process_span,
+                    model,
+                    source,
+                    span,
+                    batch_idx,
+                    total_batches,
+                    cache,
+                    sections[batch_idx],
+                ): batch_idx
+                for batch_idx, span in enumerate(state.batch_spans)
+            }
+            for future in as_completed(futures):
+                batch_idx = futures[future]
+                try:
+                    keys[batch_idx] = future.result()
+                except Exception as e:
+                    errors[batch_idx] = str(e)
+
+        state.cached_batches = cache.hits
+        logger.info(
+            f"Processed {total_batches - len(errors)}/{total_batches} batches of "
+            f"'{state.document_name}', {cache.hits} from the cache"
+        )
+        if errors:
+            first = min(errors)
+            state.error = (
+                f"Error processing batch {first + 1}: {errors[first]} "
+                f"({len(errors)}/{total_batches} batches failed)"
+            )
+            return state
+
+        state.batch_keys = keys
+        return state
+
     def preprocess_document(
         self, document_text: str, document_name: str = "document"
     ) -> Tuple[List[Chunk], List[Chunk], str]:
@@ -250,20 +584,56 @@ class DocumentPreProcessorAgent:
         Returns:
             Tuple of (book_content_chunks, summary_chunks, json_path)
         """
-        # Initialize the state
-        initial_state = DocumentProcessorState(
-            document_text=document_text,
-            document_name=document_name,
-            output_dir=self.output_dir,
+        # Spool the text to a file, so the graph only carries its path
+        os.makedirs(self.output_dir, exist_ok=True)
+        fd, spool_path = tempfile.mkstemp(
+            prefix=f"{document_name}.", suffix=".spool.txt", dir=self.output_dir
         )
+        try:
+            with open(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(document_text)
+            return self._run(spool_path, document_name)
+        finally:
+            os.remove(spool_path)
+
+    def run_graph(self, document_path: str, document_name: str) -> Dict[str, Any]:
+        """
+        Run the workflow on a document file, leaving the results in the output files.
 
-        # Run the workflow
-        final_state = self.graph.invoke(initial_state)
+        Args:
+            document_path: Path to the text file to process
+            document_name: Name of the document (used for file naming)
+
+        Returns:
+            The final state of the graph
+        """
+        return self.graph.invoke(
+            DocumentProcessorState(
+                document_path=document_path,
+                document_name=document_name,
+                output_dir=self.output_dir,
+            )
+        )
+
+    def _run(
+        self, document_path: str, document_name: str
+    ) -> Tuple[List[Chunk], List[Chunk], str]:
+        final_state = self.run_graph(document_path, document_name)
+        json_path, book_path, summary_path = output_paths(
+            self.output_dir, document_name
+        )
+
+        # Load the results once, from the text files written by save_results
+        book_content = summary_content = ""
+        if not final_state.get("error"):
+            with open(book_path, "r", encoding="utf-8") as f:
+                book_content = f.read()
+            with open(summary_path, "r", encoding="utf-8") as f:
+                summary_content = f.read()
 
-        # Create chunks from the results - access dictionary values properly
         book_chunks = [
             Chunk(
-                text=final_state["book_content"],
+                text=book_content,
                 metadata={
                     "source_type": "book_content",
                     "document_name": document_name,
@@ -273,14 +643,11 @@ class DocumentPreProcessorAgent:
 
         summary_chunks = [
             Chunk(
-                text=final_state["summary_content"],
+                text=summary_content,
                 metadata={"source_type": "summary", "document_name": document_name},
             )
         ]
 
-        # Path to the JSON file
-        json_path = os.path.join(self.output_dir, f"{document_name}.json")
-
         return book_chunks, summary_chunks, json_path
 
     def preprocess_file(self, file_path: str) -> Tuple[List[Chunk], List[Chunk], str]:
@@ -294,32 +661,9 @@ class DocumentPreProcessorAgent:
             Tuple of (book_content_chunks, summary_chunks, json_path)
         """
         try:
-            document_name = Path(file_path).stem
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                document_text = f.read()
-
-            return self.preprocess_document(document_text, document_name)
+            # The file is memory-mapped by the graph nodes, never read as a whole.
+            return self._run(file_path, Path(file_path).stem)
 
         except Exception as e:
-            print(f"Error processing file: {str(e)}")
+            logger.error(f"Error processing file: {str(e)}")
             return [], [], ""
-
-
-# if __name__ == "__main__":
-
-# file_path = "data/the Origin of Species.txt"
-# output_dir = "processed_documents"
-
-# processor = DocumentPreProcessorAgent(output_dir=output_dir)
-# book_chunks, summary_chunks, json_path = processor.preprocess_file(file_path)
-
-# print("\nProcessing complete!")
-# print(
-#     f"Book content length: {len(book_chunks[0].text) if book_chunks else 0} characters"
-# )
-# print(
-#     f"Summary content length: {len(summary_chunks[0].text) if summary_chunks else 0} characters"
-# )
-# print(f"JSON file saved to: {json_path}")
-# print("This JSON file can now be used for chunking.")
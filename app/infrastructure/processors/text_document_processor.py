@@ -1,9 +1,14 @@
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List
+from app.domain.interfaces.i_chunker import IChunker
 from app.domain.interfaces.i_document_processor import IDocumentProcessor
 from app.domain.entities.chunk import Chunk
-from langchain_experimental.text_splitter import SemanticChunker
 from langchain_community.document_loaders import TextLoader, JSONLoader
-from langchain_openai.embeddings import OpenAIEmbeddings
+from app.infrastructure.chunkers.chunker_factory import create_chunker
+from app.infrastructure.processors.json_string_stream import (
+    iter_file_pieces,
+    iter_json_string_fields,
+    normalize_whitespace,
+)
 from app.settings import settings
 from app.logs import get_logger
 import json
@@ -13,17 +18,16 @@ logger = get_logger(__name__)
 
 class DocumentProcessor(IDocumentProcessor):
     """
-    Document processor that chunks text using a semantic chunker.
+    Document processor that chunks text with the chunker strategy selected in the settings.
     """
 
-    def __init__(self):
-        self.semantic_chunker = SemanticChunker(
-            embeddings=OpenAIEmbeddings(
-                model=settings.EMBEDDING_MODEL, openai_api_key=settings.OPENAI_API_KEY
-            ),
-            breakpoint_threshold_amount=0.7,
-            breakpoint_threshold_type="percentile",
-        )
+    def __init__(self, chunker: IChunker = None):
+        """
+        Args:
+            chunker (IChunker, optional): Chunking strategy.
+                Defaults to the one selected by settings.CHUNKER_STRATEGY.
+        """
+        self.chunker = chunker or create_chunker()
         self.text_loader = TextLoader
         self.json_loader = JSONLoader
 
@@ -36,7 +40,7 @@ class DocumentProcessor(IDocumentProcessor):
     def chunk_text(self, path_to_text: str) -> List[Chunk]:
         """
         Chunks a simple text document.
-        It uses the TextLoader from langchain to load the text and SemanticChunker to split it into chunks.
+        It uses the TextLoader from langchain to load the text and the chunker to split it into chunks.
 
         Args:
             path_to_text (str): The path to the text document to be chunked.
@@ -50,12 +54,112 @@ class DocumentProcessor(IDocumentProcessor):
         concatenated_text = " ".join(_document_texts)
         logger.info(f"first pagra of the text: {concatenated_text[:100]}...")
 
-        text_chunks = self.semantic_chunker.split_text(concatenated_text)
+        text_chunks = self.chunker.split_text(concatenated_text)
 
         chunks = [Chunk(text=text, metadata={}) for text in text_chunks]
 
         return chunks
 
+    def iter_text_chunks(
+        self, path_to_text: str, with_vectors: bool = False
+    ) -> Iterator[Chunk]:
+        """
+        Chunks a simple text document window by window, yielding chunks as soon as
+        each window is split so that embedding can start before the whole book is chunked.
+        The file is read and whitespace-normalized incrementally.
+
+        Args:
+            path_to_text (str): The path to the text document to be chunked.
+            with_vectors (bool): Sets each chunk vector from the embeddings computed by the
+                chunker, when it computes any, so the chunks need no second embedding pass.
+
+        Returns:
+            Iterator[Chunk]: Chunks of the text, in document order.
+        """
+        yield from self._iter_windowed_chunks(
+            normalize_whitespace(iter_file_pieces(path_to_text)),
+            metadata={},
+            with_vectors=with_vectors,
+        )
+
+    def iter_json_chunks(
+        self, json_path: str, with_vectors: bool = False
+    ) -> Iterator[Chunk]:
+        """
+        Chunks the book_content and summary_content fields of a JSON file window by window,
+        yielding chunks with the same metadata as chunk_json. The fields are streamed from the
+        file and whitespace-normalized incrementally, so memory stays flat on large files.
+
+        Args:
+            json_path (str): Path to the JSON file.
+            with_vectors (bool): Sets each chunk vector from the embeddings computed by the chunker.
+
+        Returns:
+            Iterator[Chunk]: Chunks of each field, in the order of the fields in the file.
+        """
+        logger.info(f"Streaming chunks from JSON: {json_path}")
+        for source_type, pieces in iter_json_string_fields(
+            json_path, ("book_content", "summary_content")
+        ):
+            yield from self._iter_windowed_chunks(
+                normalize_whitespace(pieces),
+                metadata={"source_type": source_type, "source": json_path},
+                with_vectors=with_vectors,
+            )
+
+    def _iter_windowed_chunks(
+        self,
+        pieces: Iterable[str],
+        metadata: Dict[str, Any],
+        window_chars: int = None,
+        with_vectors: bool = False,
+    ) -> Iterator[Chunk]:
+        """
+        Splits the text, given as consecutive pieces, in windows of about window_chars
+        characters, cut at spaces. The last chunk of each window is carried into the next
+        window, so chunk boundaries are decided by the chunker rather than by the window edges.
+        """
+        window_chars = window_chars or settings.INGESTION_WINDOW_CHARS
+        pieces = iter(pieces)
+        buffer = ""
+        exhausted = False
+        carry = ""
+        while True:
+            parts = [buffer]
+            size = len(buffer)
+            while size <= window_chars and not exhausted:
+                piece = next(pieces, None)
+                if piece is None:
+                    exhausted = True
+                else:
+                    parts.append(piece)
+                    size += len(piece)
+            buffer = "".join(parts)
+            if not buffer.strip() and not carry:
+                return
+
+            end = min(len(buffer), window_chars)
+            if end < len(buffer):
+                space = buffer.rfind(" ", 0, end)
+                if space > 0:
+                    end = space
+            window = f"{carry} {buffer[:end].strip()}".strip()
+            buffer = buffer[end:]
+            more = bool(buffer.strip())
+
+            if with_vectors:
+                splits = self.chunker.split_text_with_vectors(window)
+            else:
+                splits = [(text, None) for text in self.chunker.split_text(window)]
+            carry = ""
+            if more and splits and len(splits[-1][0]) < window_chars:
+                carry = splits.pop()[0]
+
+            for text, vector in splits:
+                yield Chunk(text=text, metadata=dict(metadata), vector=vector)
+            if not more:
+                return
+
     def chunk_json(self, json_path: str) -> List[Chunk]:
         """
         Chunks a JSON file by extracting specific fields and splitting their content into chunks.
@@ -78,7 +182,7 @@ class DocumentProcessor(IDocumentProcessor):
             logger.info("Extracting book content...")
             book_text = self._clean_text(json_data["book_content"])
             logger.info(f"Book text size: {len(book_text)} characters")
-            book_chunks = self.semantic_chunker.split_text(book_text)
+            book_chunks = self.chunker.split_text(book_text)
             logger.info(f"Chunks generated from book: {len(book_chunks)}")
             for chunk_text in book_chunks:
                 chunks.append(
@@ -92,7 +196,7 @@ class DocumentProcessor(IDocumentProcessor):
             logger.info("Extracting summary content...")
             summary_text = self._clean_text(json_data["summary_content"])
             logger.info(f"Summary text size: {len(summary_text)} characters")
-            summary_chunks = self.semantic_chunker.split_text(summary_text)
+            summary_chunks = self.chunker.split_text(summary_text)
             logger.info(f"Chunks generated from summary: {len(summary_chunks)}")
             for chunk_text in summary_chunks:
                 chunks.append(
@@ -107,11 +211,3 @@ class DocumentProcessor(IDocumentProcessor):
 
         logger.info(f"Total chunks generated: {len(chunks)}")
         return chunks
-
-
-# if __name__ == "__main__":
-#     processor = DocumentProcessor()
-#     text = "data/the Origin of Species.txt"
-#     chunks = processor.chunk_text(text)
-#     for chunk in chunks:
-#         print(chunk)
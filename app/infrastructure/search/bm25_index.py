@@ -0,0 +1,348 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from app.infrastructure.vector_store.metadata_filter import matches_filter
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers herself him
+    himself his how i if in into is it its itself just me more most my myself no
+    nor not now of off on once only or other our ours ourselves out over own same
+    she should so some such than that the their theirs them themselves then there
+    these they this those through to too under until up very was we were what when
+    where which while who whom why will with would you your yours yourself
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases, strips accents and splits the text into alphanumeric terms, without stopwords.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        List[str]: Terms of the text.
+    """
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text)
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    Lexical BM25 index over the ingested chunks.
+
+    Terms are interned to integer ids. Each document keeps a forward list of (term id, frequency)
+    pairs, and the inverted index is a CSR layout of integer postings rebuilt from it on demand.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            path (str): File prefix of the index (.npz and .json are appended).
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 length normalization.
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._vocabulary: Dict[str, int] = {}
+        self._doc_ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._doc_terms: List[np.ndarray] = []
+        self._doc_tfs: List[np.ndarray] = []
+        self._id_to_doc: Dict[str, int] = {}
+
+        self._postings: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._length_norm = np.empty(0, dtype=np.float32)
+        self._idf = np.empty(0, dtype=np.float32)
+        self._filter_masks: Dict[Tuple, np.ndarray] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        self.load()
+
+    def _intern(self, term: str) -> int:
+        term_id = self._vocabulary.get(term)
+        if term_id is None:
+            term_id = len(self._vocabulary)
+            self._vocabulary[term] = term_id
+        return term_id
+
+    def add(
+        self, ids: List[str], texts: List[str], metadatas: List[Dict] = None
+    ) -> None:
+        """
+        Indexes the texts, replacing documents that already have the same id.
+
+        Args:
+            ids (List[str]): Document IDs, the same used in the vector store.
+            texts (List[str]): Texts to index.
+            metadatas (List[Dict], optional): Metadata of each text.
+        """
+        if metadatas is None:
+            metadatas = [{} for _ in texts]
+
+        with self._lock:
+            self.remove([doc_id for doc_id in ids if doc_id in self._id_to_doc])
+
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                term_ids = np.fromiter(
+                    (self._intern(term) for term in tokenize(text)), dtype=np.int32
+                )
+                terms, tfs = np.unique(term_ids, return_counts=True)
+
+                self._id_to_doc[doc_id] = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._texts.append(text)
+                self._metadatas.append(metadata or {})
+                self._doc_terms.append(terms.astype(np.int32))
+                self._doc_tfs.append(tfs.astype(np.int32))
+
+            self._postings = None
+            self._filter_masks = {}
+            self._dirty = True
+
+    def remove(self, ids: List[str]) -> None:
+        """
+        Removes documents from the index.
+
+        Args:
+            ids (List[str]): IDs of the documents to remove.
+        """
+        with self._lock:
+            removed = {
+                self._id_to_doc[doc_id] for doc_id in ids if doc_id in self._id_to_doc
+            }
+            if not removed:
+                return
+
+            keep = [doc for doc in range(len(self._doc_ids)) if doc not in removed]
+            self._doc_ids = [self._doc_ids[doc] for doc in keep]
+            self._texts = [self._texts[doc] for doc in keep]
+            self._metadatas = [self._metadatas[doc] for doc in keep]
+            self._doc_terms = [self._doc_terms[doc] for doc in keep]
+            self._doc_tfs = [self._doc_tfs[doc] for doc in keep]
+            self._id_to_doc = {doc_id: doc for doc, doc_id in enumerate(self._doc_ids)}
+            self._postings = None
+            self._filter_masks = {}
+            self._dirty = True
+
+    def _build_postings(self) -> None:
+        """
+        Builds the term-ordered CSR postings, document lengths and idf from the forward index.
+        """
+        n_docs = len(self._doc_ids)
+        n_terms = len(self._vocabulary)
+        lengths = np.fromiter(
+            (len(t) for t in self._doc_terms), dtype=np.int64, count=n_docs
+        )
+
+        if n_docs:
+            terms = np.concatenate(self._doc_terms)
+            tfs = np.concatenate(self._doc_tfs)
+        else:
+            terms = np.empty(0, dtype=np.int32)
+            tfs = np.empty(0, dtype=np.int32)
+        docs = np.repeat(np.arange(n_docs, dtype=np.int32), lengths)
+
+        order = np.argsort(terms, kind="stable")
+        document_frequency = np.bincount(terms, minlength=n_terms)
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=offsets[1:])
+
+        self._postings = (offsets, docs[order], tfs[order])
+        doc_lengths = np.fromiter(
+            (tf.sum() for tf in self._doc_tfs), dtype=np.float32, count=n_docs
+        )
+        mean_length = doc_lengths.mean() if n_docs and doc_lengths.mean() > 0 else 1.0
+        self._length_norm = self.k1 * (
+            1.0 - self.b + self.b * doc_lengths / mean_length
+        )
+        self._idf = np.log(
+            1.0 + (n_docs - document_frequency + 0.5) / (document_frequency + 0.5)
+        ).astype(np.float32)
+
+    def _filter_mask(self, filter: Dict[str, Any]) -> np.ndarray:
+        """
+        Returns the boolean mask of the documents matching the filter, cached until the next write.
+        """
+        key = tuple(sorted(filter.items()))
+        mask = self._filter_masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (matches_filter(metadata, filter) for metadata in self._metadatas),
+                dtype=bool,
+                count=len(self._metadatas),
+            )
+            self._filter_masks[key] = mask
+        return mask
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Scores the documents against the query with BM25.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of results to return.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[Tuple[str, float]]: (document id, score) pairs, best first.
+        """
+        with self._lock:
+            if self._postings is None:
+                self._build_postings()
+            offsets, post_docs, post_tfs = self._postings
+            length_norm, idf, doc_ids = self._length_norm, self._idf, self._doc_ids
+            mask = self._filter_mask(filter) if filter else None
+            term_ids = {
+                self._vocabulary[term]
+                for term in tokenize(query)
+                if term in self._vocabulary
+            }
+
+        if not doc_ids or not term_ids or n_results <= 0:
+            return []
+
+        scores = np.zeros(len(doc_ids), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = offsets[term_id], offsets[term_id + 1]
+            docs = post_docs[start:end]
+            tfs = post_tfs[start:end]
+            scores[docs] += (
+                idf[term_id] * tfs * (self.k1 + 1.0) / (tfs + length_norm[docs])
+            )
+
+        if mask is not None:
+            scores[~mask] = 0.0
+        matched = np.flatnonzero(scores)
+        k = min(n_results, len(matched))
+        if k == 0:
+            return []
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(doc_ids[doc], float(scores[doc])) for doc in top]
+
+    def get_documents(self, ids: List[str]) -> List[Document]:
+        """
+        Returns the indexed documents with the given ids, skipping unknown ones.
+
+        Args:
+            ids (List[str]): Document IDs.
+
+        Returns:
+            List[Document]: Documents in the order of the ids.
+        """
+        with self._lock:
+            return [
+                Document(
+                    id=doc_id,
+                    page_content=self._texts[self._id_to_doc[doc_id]],
+                    metadata=self._metadatas[self._id_to_doc[doc_id]],
+                )
+                for doc_id in ids
+                if doc_id in self._id_to_doc
+            ]
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._id_to_doc
+
+    def save(self) -> None:
+        """
+        Writes the forward index as integer arrays (.npz) and the vocabulary and documents (.json).
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            lengths = np.fromiter((len(t) for t in self._doc_terms), dtype=np.int64)
+            doc_offsets = np.zeros(len(self._doc_terms) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=doc_offsets[1:])
+            empty = np.empty(0, dtype=np.int32)
+            np.savez(
+                f"{self.path}.npz",
+                doc_offsets=doc_offsets,
+                terms=np.concatenate(self._doc_terms) if self._doc_terms else empty,
+                tfs=np.concatenate(self._doc_tfs) if self._doc_tfs else empty,
+            )
+
+            vocabulary = sorted(self._vocabulary, key=self._vocabulary.get)
+            with open(f"{self.path}.json", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "k1": self.k1,
+                        "b": self.b,
+                        "vocabulary": vocabulary,
+                        "ids": self._doc_ids,
+                        "texts": self._texts,
+                        "metadatas": self._metadatas,
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+            self._dirty = False
+        logger.info(
+            f"Saved BM25 index with {len(self._doc_ids)} documents to {self.path}"
+        )
+
+    def load(self) -> None:
+        """
+        Loads a previously saved index, if present.
+        """
+        if not (
+            os.path.exists(f"{self.path}.npz") and os.path.exists(f"{self.path}.json")
+        ):
+            return
+
+        with open(f"{self.path}.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        arrays = np.load(f"{self.path}.npz")
+        doc_offsets = arrays["doc_offsets"]
+
+        with self._lock:
+            self._vocabulary = {term: i for i, term in enumerate(data["vocabulary"])}
+            self._doc_ids = data["ids"]
+            self._texts = data["texts"]
+            self._metadatas = data["metadatas"]
+            if self._doc_ids:
+                self._doc_terms = np.split(arrays["terms"], doc_offsets[1:-1])
+                self._doc_tfs = np.split(arrays["tfs"], doc_offsets[1:-1])
+            self._id_to_doc = {doc_id: doc for doc, doc_id in enumerate(self._doc_ids)}
+            self._postings = None
+            self._filter_masks = {}
+        logger.info(f"Loaded BM25 index with {len(self._doc_ids)} documents")
@@ -0,0 +1,60 @@
+from typing import List
+import numpy as np
+
+
+def maximal_marginal_relevance(
+    query_vector: np.ndarray,
+    candidate_vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+    duplicate_threshold: float = 1.0,
+) -> List[int]:
+    """
+    Selects up to k candidates balancing relevance to the query and novelty with respect to the
+    candidates already selected (maximal marginal relevance).
+
+    The query similarities and the pairwise candidate similarity matrix are computed once;
+    each selection step only updates the running maximum similarity to the selected set.
+    Candidates whose similarity to a selected one reaches duplicate_threshold are dropped.
+
+    Args:
+        query_vector (np.ndarray): Query embedding.
+        candidate_vectors (np.ndarray): Candidate embeddings, one per row, in retrieval order.
+        k (int): Maximum number of candidates to select.
+        lambda_mult (float): Weight of relevance; 1.0 ignores diversity, 0.0 ignores relevance.
+        duplicate_threshold (float): Cosine similarity above which a candidate counts as a duplicate.
+
+    Returns:
+        List[int]: Indices of the selected candidates, in selection order.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if k <= 0 or candidates.ndim != 2 or len(candidates) == 0:
+        return []
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    candidates = candidates / norms
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+
+    max_similarity = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected: List[int] = []
+
+    while len(selected) < k and available.any():
+        if selected:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, pairwise[best], out=max_similarity)
+        available &= max_similarity < duplicate_threshold
+
+    return selected
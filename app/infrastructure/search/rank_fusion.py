@@ -0,0 +1,23 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuses several rankings of document ids with reciprocal rank fusion.
+    Each id scores sum(1 / (k + rank)) over the rankings it appears in.
+
+    Args:
+        rankings (List[List[str]]): Rankings of document ids, best first.
+        k (int): Smoothing constant; higher values flatten the contribution of top ranks.
+
+    Returns:
+        List[Tuple[str, float]]: (document id, fused score) pairs, best first.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
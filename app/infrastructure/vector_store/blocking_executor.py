@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pool that runs blocking vector store calls (disk, SQLite, NumPy)
+    outside the event loop. The pool is created on first use and can be shut down and reused.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "vector-store"):
+        """
+        Args:
+            max_workers (int): Maximum number of blocking calls running at once.
+            thread_name_prefix (str): Prefix of the worker thread names.
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Runs a blocking function in the pool and awaits its result.
+
+        Args:
+            func (Callable): Blocking function.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Any: Return value of the function.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        """
+        Waits for the running calls and stops the worker threads.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logger.info("Vector store executor shut down")
+
+
+vector_store_executor = BlockingExecutor(settings.VECTOR_STORE_EXECUTOR_WORKERS)
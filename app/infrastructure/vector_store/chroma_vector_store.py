@@ -1,17 +1,42 @@
-from typing import List, Dict
+import threading
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+from typing import Any, Iterator, List, Dict, Optional
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.documents import Document
 from app.domain.entities.embedding import Embedding
 from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.embeddings.cached_query_embeddings import embed_queries
+from app.infrastructure.embeddings.embeddings_factory import create_store_embeddings
+from app.infrastructure.vector_store.blocking_executor import vector_store_executor
+from app.infrastructure.vector_store.metadata_filter import to_chroma_where
 from app.settings import settings
 from app.logs import get_logger
 
 logger = get_logger(__name__)
 
 
+def _hnsw_metadata() -> Optional[Dict[str, Any]]:
+    """
+    HNSW parameters set on collections created by this store. A larger batch size and sync
+    threshold make Chroma update and persist the HNSW index less often during bulk loads.
+    """
+    metadata = {}
+    if settings.CHROMA_HNSW_BATCH_SIZE:
+        metadata["hnsw:batch_size"] = settings.CHROMA_HNSW_BATCH_SIZE
+    if settings.CHROMA_HNSW_SYNC_THRESHOLD:
+        metadata["hnsw:sync_threshold"] = settings.CHROMA_HNSW_SYNC_THRESHOLD
+    return metadata or None
+
+
 class ChromaVectorStore(IVectorStore):
     """
     Vector store implementation using ChromaDB via LangChain.
+
+    Writes of precomputed embeddings are upserted in slices of the largest batch the Chroma
+    client accepts. Inside bulk_load() the document count is only invalidated and reported
+    once, when the load ends.
     """
 
     def __init__(
@@ -25,14 +50,17 @@ class ChromaVectorStore(IVectorStore):
         logger.info(
             f"Inicializando ChromaDB com coleção '{collection_name}' em '{persist_directory}'"
         )
-        self.embedding_function = OpenAIEmbeddings(
-            model=settings.EMBEDDING_MODEL, openai_api_key=settings.OPENAI_API_KEY
-        )
+        self.embedding_function = create_store_embeddings()
         self.vector_store = Chroma(
             collection_name=self.collection_name,
             embedding_function=self.embedding_function,
             persist_directory=self.persist_directory,
+            collection_metadata=_hnsw_metadata(),
         )
+        self._cached_count: Optional[int] = None
+        self._count_lock = threading.Lock()
+        self._max_batch_size: Optional[int] = None
+        self._bulk_loading = False
 
     def add_texts_directly(
         self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None
@@ -52,6 +80,8 @@ class ChromaVectorStore(IVectorStore):
         except Exception as e:
             logger.error(f"Error Adding: {str(e)}")
             raise
+        finally:
+            self.invalidate_count()
 
     def add_documents_directly(self, documents, ids: List[str] = None) -> None:
         """
@@ -67,7 +97,271 @@ class ChromaVectorStore(IVectorStore):
         except Exception as e:
             logger.error(f"Error Adding: {str(e)}")
             raise
+        finally:
+            self.invalidate_count()
 
-    def direct_search(self, query: str, n_results: int = 5) -> List[Embedding]:
-        results = self.vector_store.similarity_search(query, k=n_results)
+    def direct_search(
+        self, query: str, n_results: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Embedding]:
+        results = self.vector_store.similarity_search(
+            query, k=n_results, filter=to_chroma_where(filter)
+        )
         return results
+
+    def batch_search(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Embedding]]:
+        """
+        Searches several queries with one embeddings request and one Chroma query.
+        The filter is applied by Chroma as a where clause before the nearest neighbour search.
+
+        Args:
+            queries (List[str]): Query texts.
+            n_results (int): Number of results per query.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[List[Document]]: Retrieved documents per query, most similar first.
+        """
+        if not queries:
+            return []
+
+        query_embeddings = embed_queries(self.embedding_function, queries)
+        return self._query_embeddings(query_embeddings, n_results, filter)
+
+    async def asearch(
+        self, query: str, n_results: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Embedding]:
+        """
+        Embeds the query with the async OpenAI client and runs the Chroma query in the
+        vector store executor, keeping the event loop free.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of results to return.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[Document]: Retrieved documents, most similar first.
+        """
+        query_embedding = await self.embedding_function.aembed_query(query)
+        results = await vector_store_executor.run(
+            self._query_embeddings, [query_embedding], n_results, filter
+        )
+        return results[0]
+
+    def _query_embeddings(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Document]]:
+        results = self.vector_store._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=to_chroma_where(filter),
+            include=["documents", "metadatas"],
+        )
+        return [
+            [
+                Document(id=doc_id, page_content=text, metadata=metadata or {})
+                for doc_id, text, metadata in zip(ids, texts, metadatas)
+            ]
+            for ids, texts, metadatas in zip(
+                results["ids"], results["documents"], results["metadatas"]
+            )
+        ]
+
+    def add_embeddings_directly(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict] = None,
+        ids: List[str] = None,
+    ) -> None:
+        """
+        Upserts texts with precomputed embeddings into ChromaDB.
+
+        Args:
+            texts (List[str]): Text list to be added.
+            embeddings (List[List[float]]): Embedding of each text.
+            metadatas (List[Dict], optional): Metadata for each text.
+            ids (List[str], optional): Document IDs for each text.
+        """
+        if not texts:
+            return
+        self._upsert_embeddings(texts, embeddings, metadatas, ids)
+        logger.info(f"Added {len(texts)} embedded texts to ChromaDB.")
+
+    async def aadd_texts(
+        self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None
+    ) -> None:
+        """
+        Embeds the texts with the async OpenAI client and upserts them in the vector store executor.
+
+        Args:
+            texts (List[str]): Text list to be added.
+            metadatas (List[Dict], optional): Metadata for each text.
+            ids (List[str], optional): Document IDs for each text.
+        """
+        if not texts:
+            return
+        embeddings = await self.embedding_function.aembed_documents(texts)
+        await vector_store_executor.run(
+            self._upsert_embeddings, texts, embeddings, metadatas, ids
+        )
+        logger.info(f"Added {len(texts)} texts to ChromaDB.")
+
+    def max_batch_size(self) -> int:
+        """
+        Returns the largest number of rows the Chroma client accepts in one write.
+
+        Returns:
+            int: Maximum batch size.
+        """
+        if self._max_batch_size is None:
+            self._max_batch_size = self.vector_store._client.get_max_batch_size()
+        return self._max_batch_size
+
+    def _upsert_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict] = None,
+        ids: List[str] = None,
+    ) -> None:
+        """
+        Upserts precomputed embeddings in slices of max_batch_size rows. Chroma rejects
+        empty metadata dicts, so rows without metadata are written in separate calls.
+        """
+        if ids is None:
+            ids = [str(uuid4()) for _ in texts]
+        if metadatas is None:
+            metadatas = [{} for _ in texts]
+
+        try:
+            with_metadata = [i for i, metadata in enumerate(metadatas) if metadata]
+            without_metadata = [
+                i for i, metadata in enumerate(metadatas) if not metadata
+            ]
+            batch_size = self.max_batch_size()
+            for rows, include_metadata in (
+                (with_metadata, True),
+                (without_metadata, False),
+            ):
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start : start + batch_size]
+                    self.vector_store._collection.upsert(
+                        ids=[ids[i] for i in batch],
+                        embeddings=[embeddings[i] for i in batch],
+                        documents=[texts[i] for i in batch],
+                        metadatas=(
+                            [metadatas[i] for i in batch] if include_metadata else None
+                        ),
+                    )
+        finally:
+            if not self._bulk_loading:
+                self.invalidate_count()
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Defers the count invalidation of every write to the end of the load,
+        then reports the document count once.
+        """
+        if self._bulk_loading:
+            yield
+            return
+
+        self._bulk_loading = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._bulk_loading = False
+            self.invalidate_count()
+            logger.info(
+                f"Bulk load into '{self.collection_name}' finished in "
+                f"{time.perf_counter() - start:.2f}s, {self.count()} documents in the collection"
+            )
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.embedding_function.embed_query(query)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_function.embed_documents(texts)
+
+    def get_embeddings(self, ids: List[str]) -> List[List[float]]:
+        """
+        Fetches the stored embeddings of the given documents from ChromaDB.
+
+        Args:
+            ids (List[str]): Document IDs.
+
+        Returns:
+            List[List[float]]: One embedding per ID, in order. Unknown IDs get an empty list.
+        """
+        if not ids:
+            return []
+        results = self.vector_store._collection.get(ids=ids, include=["embeddings"])
+        by_id = {
+            doc_id: list(embedding)
+            for doc_id, embedding in zip(results["ids"], results["embeddings"])
+        }
+        return [by_id.get(doc_id, []) for doc_id in ids]
+
+    def delete(self, ids: List[str]) -> None:
+        """
+        Deletes documents from ChromaDB.
+
+        Args:
+            ids (List[str]): IDs of the documents to delete.
+        """
+        if not ids:
+            return
+        try:
+            self.vector_store.delete(ids=ids)
+        finally:
+            self.invalidate_count()
+
+    def persist(self) -> None:
+        """
+        ChromaDB persists every write on its own, so there is nothing to flush.
+        """
+        pass
+
+    def count(self) -> int:
+        """
+        Returns the number of documents in the collection.
+        The value is cached and only queried again after a write invalidates it.
+
+        Returns:
+            int: Number of documents in the collection.
+        """
+        with self._count_lock:
+            if self._cached_count is None:
+                self._cached_count = self.vector_store._collection.count()
+            return self._cached_count
+
+    def invalidate_count(self) -> None:
+        """
+        Drops the cached document count so the next count() queries ChromaDB.
+        """
+        with self._count_lock:
+            self._cached_count = None
+
+    def close(self) -> None:
+        """
+        Stops the underlying Chroma system and releases its file handles.
+        The query embedding cache is saved first when persistence is configured.
+        """
+        self.invalidate_count()
+        logger.info(f"Query embedding cache stats: {self.embedding_function.stats()}")
+        self.embedding_function.save()
+        client = getattr(self.vector_store, "_client", None)
+        if client is not None and hasattr(client, "clear_system_cache"):
+            client.clear_system_cache()
+        logger.info(f"ChromaDB collection '{self.collection_name}' closed")
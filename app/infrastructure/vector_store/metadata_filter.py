@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Checks a metadata dict against an equality filter.
+
+    Args:
+        metadata (Dict[str, Any]): Metadata of a document.
+        filter (Dict[str, Any], optional): Required metadata values. None or empty matches everything.
+
+    Returns:
+        bool: True when every filter key has the required value.
+    """
+    if not filter:
+        return True
+    return all(metadata.get(key) == value for key, value in filter.items())
+
+
+def to_chroma_where(filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Translates an equality filter to a Chroma where clause.
+    Chroma only accepts one condition per clause, so several keys are combined with $and.
+
+    Args:
+        filter (Dict[str, Any], optional): Required metadata values.
+
+    Returns:
+        Dict[str, Any]: Chroma where clause, or None when there is no filter.
+    """
+    if not filter:
+        return None
+    if len(filter) == 1:
+        return dict(filter)
+    return {"$and": [{key: value} for key, value in filter.items()]}
@@ -0,0 +1,524 @@
+import json
+import os
+import threading
+from uuid import uuid4
+from typing import Any, Dict, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.domain.entities.embedding import Embedding
+from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.embeddings.cached_query_embeddings import (
+    CachedQueryEmbeddings,
+    embed_queries,
+)
+from app.infrastructure.embeddings.embeddings_factory import create_store_embeddings
+from app.infrastructure.vector_store.blocking_executor import vector_store_executor
+from app.infrastructure.vector_store.metadata_filter import matches_filter
+from app.infrastructure.vector_store.quantized_embedding_storage import (
+    QuantizedEmbeddingStorage,
+)
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalizes each row so that a dot product is the cosine similarity.
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyVectorStore(IVectorStore):
+    """
+    In-process vector store backed by a contiguous float32 NumPy matrix.
+    Rows are L2-normalized, so cosine top-k is a single matrix-vector product.
+    With quantization enabled the matrix is saved as float16/int8 and served from a memory map.
+    Rows are partitioned by the metadata keys in settings.VECTOR_STORE_PARTITION_KEYS,
+    so a filter on those keys only scores the rows of the matching partitions.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        persist_directory: str,
+        embedding_function: Optional[Embeddings] = None,
+        quantization: Optional[str] = None,
+    ):
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function or create_store_embeddings()
+        self.quantization = quantization or settings.VECTOR_STORE_QUANTIZATION
+        self.rescore = settings.VECTOR_STORE_QUANTIZED_RESCORE
+        self.partition_keys = list(settings.VECTOR_STORE_PARTITION_KEYS)
+
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        # Over-allocated rows whose leading part is _matrix, so appends are amortized O(1).
+        self._buffer: Optional[np.ndarray] = None
+        self._storage: Optional[QuantizedEmbeddingStorage] = None
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._partitions: Optional[Dict[str, Dict[Any, np.ndarray]]] = None
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        self.load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}.npy")
+
+    @property
+    def _records_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}.json")
+
+    def add_texts_directly(
+        self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None
+    ) -> None:
+        """
+        Embeds the texts and adds them to the matrix.
+        Existing IDs are overwritten.
+
+        Args:
+            texts (List[str]): Text list to be added.
+            metadatas (List[Dict], optional): Metadata for each text.
+            ids (List[str], optional): Document IDs for each text.
+        """
+        if not texts:
+            return
+        vectors = self.embedding_function.embed_documents(texts)
+        self._add(texts, vectors, metadatas, ids)
+        logger.info(f"Added {len(texts)} texts to the in-memory store.")
+
+    def add_embeddings_directly(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict] = None,
+        ids: List[str] = None,
+    ) -> None:
+        """
+        Adds texts with precomputed embeddings to the matrix.
+        Existing IDs are overwritten.
+
+        Args:
+            texts (List[str]): Text list to be added.
+            embeddings (List[List[float]]): Embedding of each text.
+            metadatas (List[Dict], optional): Metadata for each text.
+            ids (List[str], optional): Document IDs for each text.
+        """
+        if not texts:
+            return
+        self._add(texts, embeddings, metadatas, ids)
+        logger.info(f"Added {len(texts)} embedded texts to the in-memory store.")
+
+    async def aadd_texts(
+        self, texts: List[str], metadatas: List[Dict] = None, ids: List[str] = None
+    ) -> None:
+        """
+        Embeds the texts asynchronously and adds them to the matrix in the vector store executor.
+
+        Args:
+            texts (List[str]): Text list to be added.
+            metadatas (List[Dict], optional): Metadata for each text.
+            ids (List[str], optional): Document IDs for each text.
+        """
+        if not texts:
+            return
+        vectors = await self.embedding_function.aembed_documents(texts)
+        await vector_store_executor.run(self._add, texts, vectors, metadatas, ids)
+        logger.info(f"Added {len(texts)} texts to the in-memory store.")
+
+    def add_documents_directly(
+        self, documents: List[Document], ids: List[str] = None
+    ) -> None:
+        """
+        Adds LangChain documents to the matrix.
+
+        Args:
+            documents (List[Document]): Documents to be added.
+            ids (List[str], optional): Document IDs for each document.
+        """
+        self.add_texts_directly(
+            texts=[doc.page_content for doc in documents],
+            metadatas=[doc.metadata for doc in documents],
+            ids=ids,
+        )
+
+    def _add(
+        self,
+        texts: List[str],
+        vectors: List[List[float]],
+        metadatas: List[Dict] = None,
+        ids: List[str] = None,
+    ) -> None:
+        if metadatas is None:
+            metadatas = [{} for _ in texts]
+        if ids is None:
+            ids = [str(uuid4()) for _ in texts]
+
+        new_vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+        # Within a batch, the last write of an ID wins.
+        last = {doc_id: i for i, doc_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids = [ids[i] for i in keep]
+            texts = [texts[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            new_vectors = new_vectors[keep]
+
+        with self._lock:
+            self.delete([doc_id for doc_id in ids if doc_id in self._id_to_row])
+            self._materialize()
+            self._append_rows(new_vectors)
+
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                self._id_to_row[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._texts.append(text)
+                self._metadatas.append(metadata or {})
+            self._partitions = None
+            self._dirty = True
+
+    def _append_rows(self, vectors: np.ndarray) -> None:
+        """
+        Appends rows to the matrix, doubling the capacity of its buffer when it is full
+        instead of copying the whole matrix on every write.
+        """
+        rows = len(self._ids)
+        needed = rows + len(vectors)
+        buffer = self._buffer
+        if (
+            buffer is None
+            or self._matrix.base is not buffer
+            or buffer.shape[0] < needed
+            or buffer.shape[1] != vectors.shape[1]
+        ):
+            capacity = max(needed, 2 * rows, 1024)
+            buffer = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            if rows:
+                buffer[:rows] = self._matrix
+            self._buffer = buffer
+        buffer[rows:needed] = vectors
+        self._matrix = buffer[:needed]
+
+    def delete(self, ids: List[str]) -> None:
+        """
+        Removes documents from the matrix.
+
+        Args:
+            ids (List[str]): IDs of the documents to delete.
+        """
+        with self._lock:
+            rows = [
+                self._id_to_row[doc_id] for doc_id in ids if doc_id in self._id_to_row
+            ]
+            if not rows:
+                return
+
+            self._materialize()
+            keep = np.ones(len(self._ids), dtype=bool)
+            keep[rows] = False
+            self._matrix = np.ascontiguousarray(self._matrix[keep])
+            self._buffer = None
+            self._ids = [doc_id for doc_id, k in zip(self._ids, keep) if k]
+            self._texts = [text for text, k in zip(self._texts, keep) if k]
+            self._metadatas = [meta for meta, k in zip(self._metadatas, keep) if k]
+            self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._partitions = None
+            self._dirty = True
+
+    def _materialize(self) -> None:
+        """
+        Loads the memory-mapped quantized vectors into a dense float32 matrix before a write.
+        """
+        if self._storage is not None:
+            self._matrix = self._storage.to_float32()
+            self._storage = None
+
+    def direct_search(
+        self, query: str, n_results: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Embedding]:
+        """
+        Returns the n_results documents with the highest cosine similarity to the query.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of results to return.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[Document]: Retrieved documents, most similar first.
+        """
+        query_vector = self.embedding_function.embed_query(query)
+        return self._search_vectors([query_vector], n_results, filter)[0]
+
+    def batch_search(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Embedding]]:
+        """
+        Searches several queries with one embeddings request and one matrix product.
+
+        Args:
+            queries (List[str]): Query texts.
+            n_results (int): Number of results per query.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[List[Document]]: Retrieved documents per query, most similar first.
+        """
+        if not queries:
+            return []
+        query_vectors = embed_queries(self.embedding_function, queries)
+        return self._search_vectors(query_vectors, n_results, filter)
+
+    async def asearch(
+        self, query: str, n_results: int = 5, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Embedding]:
+        """
+        Embeds the query asynchronously and scores the matrix in the vector store executor.
+
+        Args:
+            query (str): Query text.
+            n_results (int): Number of results to return.
+            filter (Dict[str, Any], optional): Metadata values the results must have.
+
+        Returns:
+            List[Document]: Retrieved documents, most similar first.
+        """
+        query_vector = await self.embedding_function.aembed_query(query)
+        results = await vector_store_executor.run(
+            self._search_vectors, [query_vector], n_results, filter
+        )
+        return results[0]
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.embedding_function.embed_query(query)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_function.embed_documents(texts)
+
+    def get_embeddings(self, ids: List[str]) -> List[List[float]]:
+        """
+        Returns the normalized stored vectors of the given documents.
+
+        Args:
+            ids (List[str]): Document IDs.
+
+        Returns:
+            List[List[float]]: One vector per ID, in order. Unknown IDs get an empty list.
+        """
+        with self._lock:
+            rows = [self._id_to_row.get(doc_id) for doc_id in ids]
+            known = [row for row in rows if row is not None]
+            if self._storage is not None:
+                vectors = self._storage.get_rows(np.asarray(known, dtype=np.int64))
+            else:
+                vectors = self._matrix[known]
+
+        found = iter(vectors.tolist())
+        return [next(found) if row is not None else [] for row in rows]
+
+    def _get_partitions(self) -> Dict[str, Dict[Any, np.ndarray]]:
+        """
+        Returns the sorted row indices of each value of the partition keys, building them after a write.
+        """
+        with self._lock:
+            if self._partitions is None:
+                partitions: Dict[str, Dict[Any, List[int]]] = {
+                    key: {} for key in self.partition_keys
+                }
+                for row, metadata in enumerate(self._metadatas):
+                    for key in self.partition_keys:
+                        value = metadata.get(key)
+                        if value is not None:
+                            partitions[key].setdefault(value, []).append(row)
+                self._partitions = {
+                    key: {
+                        value: np.asarray(rows, dtype=np.int64)
+                        for value, rows in values.items()
+                    }
+                    for key, values in partitions.items()
+                }
+            return self._partitions
+
+    def _filter_rows(
+        self, filter: Optional[Dict[str, Any]], metadatas: List[Dict]
+    ) -> Optional[np.ndarray]:
+        """
+        Resolves a metadata filter to the sorted rows it allows, or None when every row is allowed.
+        Partitioned keys are intersected from the partitions; other keys are checked row by row
+        over what is left.
+        """
+        if not filter:
+            return None
+
+        partitions = self._get_partitions()
+        rows = None
+        for key, value in filter.items():
+            if key not in partitions:
+                continue
+            partition_rows = partitions[key].get(value, np.empty(0, dtype=np.int64))
+            rows = (
+                partition_rows
+                if rows is None
+                else np.intersect1d(rows, partition_rows, assume_unique=True)
+            )
+
+        remaining = {k: v for k, v in filter.items() if k not in partitions}
+        if remaining:
+            candidates = range(len(metadatas)) if rows is None else rows
+            rows = np.fromiter(
+                (r for r in candidates if matches_filter(metadatas[r], remaining)),
+                dtype=np.int64,
+            )
+        return rows
+
+    def _search_vectors(
+        self,
+        query_vectors: List[List[float]],
+        n_results: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Document]]:
+        with self._lock:
+            matrix, storage, ids, texts, metadatas = (
+                self._matrix,
+                self._storage,
+                self._ids,
+                self._texts,
+                self._metadatas,
+            )
+            rows = self._filter_rows(filter, metadatas)
+
+        n_candidates = len(ids) if rows is None else len(rows)
+        if n_candidates == 0 or n_results <= 0:
+            return [[] for _ in query_vectors]
+
+        queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        k = min(n_results, n_candidates)
+        if storage is not None:
+            top_rows = [
+                top
+                for top, _ in storage.search_batch(
+                    queries, k, rescore=self.rescore, rows=rows
+                )
+            ]
+        else:
+            candidates = matrix if rows is None else matrix[rows]
+            scores = queries @ candidates.T
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            top_rows = np.take_along_axis(top, np.argsort(-top_scores, axis=1), axis=1)
+            if rows is not None:
+                top_rows = rows[top_rows]
+
+        return [
+            [
+                Document(id=ids[row], page_content=texts[row], metadata=metadatas[row])
+                for row in top
+            ]
+            for top in top_rows
+        ]
+
+    def count(self) -> int:
+        """
+        Returns the number of rows in the matrix.
+
+        Returns:
+            int: Number of stored documents.
+        """
+        return len(self._ids)
+
+    def persist(self) -> None:
+        """
+        Saves the matrix and its records to the persist directory when they changed.
+        """
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        """
+        Writes the matrix and the ids, texts and metadata as .json.
+        The matrix goes to .npy, or to quantized memory-mapped files when quantization is set;
+        in that case the store then searches the memory map and drops the dense copy.
+        """
+        os.makedirs(self.persist_directory, exist_ok=True)
+        with self._lock:
+            if self.quantization:
+                self._materialize()
+                self._storage = QuantizedEmbeddingStorage.write(
+                    self.persist_directory,
+                    self.collection_name,
+                    self._matrix,
+                    dtype=self.quantization,
+                    keep_float32=self.rescore,
+                )
+                self._matrix = np.empty((0, 0), dtype=np.float32)
+                self._buffer = None
+            else:
+                self._materialize()
+                np.save(self._vectors_path, self._matrix)
+            with open(self._records_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "ids": self._ids,
+                        "texts": self._texts,
+                        "metadatas": self._metadatas,
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+            self._dirty = False
+        logger.info(f"Saved {len(self._ids)} vectors to {self.persist_directory}")
+
+    def load(self) -> None:
+        """
+        Loads a previously saved matrix from the persist directory, if present.
+        """
+        quantized = self.quantization and QuantizedEmbeddingStorage.exists(
+            self.persist_directory, self.collection_name
+        )
+        if not os.path.exists(self._records_path) or not (
+            quantized or os.path.exists(self._vectors_path)
+        ):
+            return
+
+        with open(self._records_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        with self._lock:
+            if quantized:
+                self._storage = QuantizedEmbeddingStorage(
+                    self.persist_directory, self.collection_name
+                )
+            else:
+                self._matrix = np.ascontiguousarray(
+                    np.load(self._vectors_path), dtype=np.float32
+                )
+            self._ids = records["ids"]
+            self._texts = records["texts"]
+            self._metadatas = records["metadatas"]
+            self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._partitions = None
+        logger.info(f"Loaded {len(self._ids)} vectors from {self.persist_directory}")
+
+    def close(self) -> None:
+        """
+        Saves pending changes and the query embedding cache.
+        """
+        self.persist()
+        if isinstance(self.embedding_function, CachedQueryEmbeddings):
+            logger.info(
+                f"Query embedding cache stats: {self.embedding_function.stats()}"
+            )
+            self.embedding_function.save()
@@ -0,0 +1,320 @@
+import json
+import os
+import re
+import uuid
+from typing import List, Optional, Tuple
+import numpy as np
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_DTYPES = ("float16", "int8")
+
+
+def _file_path(
+    directory: str, name: str, suffix: str, generation: Optional[str] = None
+) -> str:
+    if generation:
+        return os.path.join(directory, f"{name}.{generation}.{suffix}")
+    return os.path.join(directory, f"{name}.{suffix}")
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    """
+    Saves an .npy file through a temporary file and an atomic rename,
+    so readers that still map the previous file keep a valid copy.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+class QuantizedEmbeddingStorage:
+    """
+    Embedding matrix stored as float16 or scalar-quantized int8 codes in memory-mapped .npy files.
+    int8 codes use a per-dimension scale and offset: vector ~= code * scale + offset.
+    Processes opening the same files share the page-cached copy instead of holding their own.
+
+    Every write goes to a new generation of array files named after a fresh generation id;
+    meta.json is replaced last and names the generation to load, so a crash partway through
+    a write leaves the previous generation readable instead of mixing old and new arrays.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+
+        with open(_file_path(directory, name, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.generation: Optional[str] = self.meta.get("generation")
+        self.dtype = self.meta["dtype"]
+        self.codes = np.load(self._path("codes.npy"), mmap_mode="r")
+        self.scale: Optional[np.ndarray] = None
+        self.offset: Optional[np.ndarray] = None
+        self.float32: Optional[np.ndarray] = None
+
+        if self.dtype == "int8":
+            self.scale = np.load(self._path("scale.npy"))
+            self.offset = np.load(self._path("offset.npy"))
+        if self.meta.get("float32"):
+            self.float32 = np.load(self._path("f32.npy"), mmap_mode="r")
+        self._check_shapes()
+
+    def _path(self, suffix: str) -> str:
+        return _file_path(self.directory, self.name, suffix, self.generation)
+
+    @staticmethod
+    def exists(directory: str, name: str) -> bool:
+        return os.path.exists(_file_path(directory, name, "meta.json"))
+
+    def _check_shapes(self) -> None:
+        """
+        Raises ValueError when the loaded arrays do not match the row count and dimension in meta.json.
+        """
+        count, dim = self.meta["count"], self.meta["dim"]
+        expected = {"codes": (count, dim)}
+        shapes = {"codes": self.codes.shape}
+        if self.scale is not None:
+            expected.update(scale=(dim,), offset=(dim,))
+            shapes.update(scale=self.scale.shape, offset=self.offset.shape)
+        if self.float32 is not None:
+            expected["f32"] = (count, dim)
+            shapes["f32"] = self.float32.shape
+        for array_name, shape in shapes.items():
+            if tuple(shape) != expected[array_name]:
+                raise ValueError(
+                    f"Quantized {array_name} array of {self.name} has shape {tuple(shape)}, "
+                    f"expected {expected[array_name]} from meta.json"
+                )
+
+    @classmethod
+    def write(
+        cls,
+        directory: str,
+        name: str,
+        vectors: np.ndarray,
+        dtype: str = "int8",
+        keep_float32: bool = True,
+    ) -> "QuantizedEmbeddingStorage":
+        """
+        Quantizes the vectors and writes them to the directory.
+
+        Args:
+            directory (str): Directory of the files.
+            name (str): Prefix of the files.
+            vectors (np.ndarray): float32 matrix with one vector per row.
+            dtype (str): "float16" or "int8".
+            keep_float32 (bool): Also writes the float32 matrix, used to re-score the top candidates.
+
+        Returns:
+            QuantizedEmbeddingStorage: Storage opened over the written files.
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported quantization dtype: {dtype}")
+
+        os.makedirs(directory, exist_ok=True)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        generation = uuid.uuid4().hex
+
+        if dtype == "float16":
+            codes = vectors.astype(np.float16)
+        else:
+            minimum = (
+                vectors.min(axis=0) if len(vectors) else np.zeros(vectors.shape[1])
+            )
+            maximum = (
+                vectors.max(axis=0) if len(vectors) else np.zeros(vectors.shape[1])
+            )
+            scale = ((maximum - minimum) / 255.0).astype(np.float32)
+            scale[scale == 0] = 1.0
+            offset = (minimum + 128.0 * scale).astype(np.float32)
+            codes = np.clip(np.rint((vectors - offset) / scale), -128, 127).astype(
+                np.int8
+            )
+            _save_array(_file_path(directory, name, "scale.npy", generation), scale)
+            _save_array(_file_path(directory, name, "offset.npy", generation), offset)
+
+        _save_array(_file_path(directory, name, "codes.npy", generation), codes)
+        if keep_float32:
+            _save_array(_file_path(directory, name, "f32.npy", generation), vectors)
+
+        meta = {
+            "generation": generation,
+            "dtype": dtype,
+            "count": int(vectors.shape[0]),
+            "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "float32": keep_float32,
+        }
+        meta_path = _file_path(directory, name, "meta.json")
+        tmp_meta = f"{meta_path}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+        cls._remove_stale_arrays(directory, name, generation)
+
+        logger.info(
+            f"Wrote {meta['count']} {dtype} vectors ({codes.nbytes} bytes) to {directory}"
+        )
+        return cls(directory, name)
+
+    @staticmethod
+    def _remove_stale_arrays(directory: str, name: str, generation: str) -> None:
+        """
+        Deletes the array files of every other generation: the replaced one, the legacy
+        unversioned files and leftovers of interrupted writes.
+        Readers that still map them keep their copy until they close it.
+        """
+        pattern = re.compile(
+            rf"{re.escape(name)}\.(?:([0-9a-f]{{32}})\.)?(?:codes|scale|offset|f32)\.npy(?:\.tmp)?"
+        )
+        for file_name in os.listdir(directory):
+            match = pattern.fullmatch(file_name)
+            if not match or match.group(1) == generation:
+                continue
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove replaced file {file_name}: {e}")
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def _scores(
+        self,
+        query_matrix: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        block_size: int = 8192,
+    ) -> np.ndarray:
+        """
+        Scores the stored vectors (all of them, or only the given rows) against each query
+        straight from the memory map.
+        Rows are converted block by block so the temporary float32 copy stays bounded.
+        """
+        if self.dtype == "int8":
+            scaled_queries = query_matrix * self.scale
+            bias = query_matrix @ self.offset
+        else:
+            scaled_queries = query_matrix
+            bias = np.zeros(len(query_matrix), dtype=np.float32)
+
+        n_rows = len(self) if rows is None else len(rows)
+        scores = np.empty((len(query_matrix), n_rows), dtype=np.float32)
+        for start in range(0, n_rows, block_size):
+            if rows is None:
+                block = self.codes[start : start + block_size].astype(np.float32)
+            else:
+                block = self.codes[rows[start : start + block_size]].astype(np.float32)
+            scores[:, start : start + block_size] = (
+                scaled_queries @ block.T + bias[:, None]
+            )
+        return scores
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        rescore: bool = True,
+        rescore_factor: int = 4,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the rows with the highest dot product with the query.
+
+        Args:
+            query_vector (np.ndarray): Query vector, expected to be L2-normalized.
+            k (int): Number of rows to return.
+            rescore (bool): Re-scores the top k * rescore_factor candidates with the float32 vectors, when stored.
+            rescore_factor (int): Over-fetch factor for re-scoring.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Row indices and their scores, best first.
+        """
+        return self.search_batch(
+            np.asarray(query_vector, dtype=np.float32)[None, :],
+            k,
+            rescore=rescore,
+            rescore_factor=rescore_factor,
+        )[0]
+
+    def search_batch(
+        self,
+        query_matrix: np.ndarray,
+        k: int,
+        rescore: bool = True,
+        rescore_factor: int = 4,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Searches several queries with one pass over the memory map.
+
+        Args:
+            query_matrix (np.ndarray): One L2-normalized query vector per row.
+            k (int): Number of rows to return per query.
+            rescore (bool): Re-scores the top candidates with the float32 vectors, when stored.
+            rescore_factor (int): Over-fetch factor for re-scoring.
+            rows (np.ndarray, optional): Sorted row indices the search is restricted to.
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: Row indices and scores per query, best first.
+        """
+        query_matrix = np.asarray(query_matrix, dtype=np.float32)
+        n_rows = len(self) if rows is None else len(rows)
+        if n_rows == 0 or k <= 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in range(len(query_matrix))]
+
+        scores = self._scores(query_matrix, rows=rows)
+        rescore = rescore and self.float32 is not None
+        n_candidates = min(n_rows, k * rescore_factor if rescore else k)
+        candidates = np.argpartition(-scores, n_candidates - 1, axis=1)[
+            :, :n_candidates
+        ]
+
+        results = []
+        for query_vector, query_scores, positions in zip(
+            query_matrix, scores, candidates
+        ):
+            candidate_rows = positions if rows is None else rows[positions]
+            if rescore:
+                order = np.argsort(candidate_rows)
+                positions, candidate_rows = positions[order], candidate_rows[order]
+                scores_subset = self.float32[candidate_rows] @ query_vector
+            else:
+                scores_subset = query_scores[positions]
+
+            order = np.argsort(-scores_subset)[:k]
+            results.append((candidate_rows[order], scores_subset[order]))
+        return results
+
+    def get_rows(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Decodes the given rows as float32, from the stored float32 copy when available.
+
+        Args:
+            rows (np.ndarray): Row indices.
+
+        Returns:
+            np.ndarray: float32 vectors, one per row.
+        """
+        if self.float32 is not None:
+            return np.asarray(self.float32[rows], dtype=np.float32)
+        codes = self.codes[rows].astype(np.float32)
+        if self.dtype == "int8":
+            return codes * self.scale + self.offset
+        return codes
+
+    def to_float32(self) -> np.ndarray:
+        """
+        Materializes the matrix as float32, from the stored float32 copy when available.
+
+        Returns:
+            np.ndarray: float32 matrix with one vector per row.
+        """
+        if self.float32 is not None:
+            return np.array(self.float32, dtype=np.float32)
+        if self.dtype == "int8":
+            return self.codes.astype(np.float32) * self.scale + self.offset
+        return self.codes.astype(np.float32)
@@ -0,0 +1,34 @@
+from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.vector_store.chroma_vector_store import ChromaVectorStore
+from app.infrastructure.vector_store.numpy_vector_store import NumpyVectorStore
+from app.settings import settings
+
+
+def create_vector_store(
+    collection_name: str, persist_directory: str, store_type: str = None
+) -> IVectorStore:
+    """
+    Creates the vector store backend selected by settings.VECTOR_STORE_TYPE.
+
+    Args:
+        collection_name (str): Name of the collection.
+        persist_directory (str): Directory where the store keeps its files.
+        store_type (str, optional): Overrides settings.VECTOR_STORE_TYPE ("chroma" or "in_memory").
+
+    Returns:
+        IVectorStore: The vector store instance.
+    """
+    store_type = (store_type or settings.VECTOR_STORE_TYPE).lower()
+
+    if store_type == "chroma":
+        return ChromaVectorStore(
+            collection_name=collection_name,
+            persist_directory=persist_directory,
+            use_embedding_function=True,
+        )
+    if store_type == "in_memory":
+        return NumpyVectorStore(
+            collection_name=collection_name, persist_directory=persist_directory
+        )
+
+    raise ValueError(f"Unsupported vector store type: {store_type}")
@@ -0,0 +1,139 @@
+import os
+import threading
+from typing import Dict, Tuple
+from app.domain.interfaces.i_vector_store import IVectorStore
+from app.infrastructure.search.bm25_index import BM25Index
+from app.infrastructure.vector_store.blocking_executor import vector_store_executor
+from app.infrastructure.vector_store.vector_store_factory import create_vector_store
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class VectorStoreRegistry:
+    """
+    Process-wide registry of vector store handles.
+    Each store is opened once per (collection name, persist directory) and reused afterwards.
+    The BM25 lexical index of a collection is kept alongside its store.
+    """
+
+    def __init__(self):
+        self._stores: Dict[Tuple[str, str], IVectorStore] = {}
+        self._lexical_indexes: Dict[Tuple[str, str], BM25Index] = {}
+        self._lock = threading.Lock()
+
+    def get_store(
+        self,
+        collection_name: str = None,
+        persist_directory: str = None,
+    ) -> IVectorStore:
+        """
+        Returns the store for the given collection, opening it on first use.
+
+        Args:
+            collection_name (str, optional): Name of the collection. Defaults to settings.VECTOR_STORE_COLLECTION.
+            persist_directory (str, optional): Directory of the store. Defaults to settings.VECTOR_STORE_PATH.
+
+        Returns:
+            IVectorStore: Shared vector store instance.
+        """
+        key = (
+            collection_name or settings.VECTOR_STORE_COLLECTION,
+            persist_directory or settings.VECTOR_STORE_PATH,
+        )
+        store = self._stores.get(key)
+        if store is not None:
+            return store
+
+        with self._lock:
+            store = self._stores.get(key)
+            if store is None:
+                logger.info(f"Opening vector store for collection '{key[0]}'")
+                store = create_vector_store(
+                    collection_name=key[0], persist_directory=key[1]
+                )
+                self._stores[key] = store
+            return store
+
+    def get_lexical_index(
+        self,
+        collection_name: str = None,
+        persist_directory: str = None,
+    ) -> BM25Index:
+        """
+        Returns the BM25 index of the given collection, loading it on first use.
+        The index files live next to the vector store, as <collection>_bm25.npz/.json.
+
+        Args:
+            collection_name (str, optional): Name of the collection. Defaults to settings.VECTOR_STORE_COLLECTION.
+            persist_directory (str, optional): Directory of the store. Defaults to settings.VECTOR_STORE_PATH.
+
+        Returns:
+            BM25Index: Shared lexical index instance.
+        """
+        key = (
+            collection_name or settings.VECTOR_STORE_COLLECTION,
+            persist_directory or settings.VECTOR_STORE_PATH,
+        )
+        index = self._lexical_indexes.get(key)
+        if index is not None:
+            return index
+
+        with self._lock:
+            index = self._lexical_indexes.get(key)
+            if index is None:
+                index = BM25Index(path=os.path.join(key[1], f"{key[0]}_bm25"))
+                self._lexical_indexes[key] = index
+            return index
+
+    def warm_up(
+        self,
+        collection_name: str = None,
+        persist_directory: str = None,
+    ) -> IVectorStore:
+        """
+        Opens the store ahead of the first request and loads its document count.
+
+        Args:
+            collection_name (str, optional): Name of the collection.
+            persist_directory (str, optional): Directory of the store.
+
+        Returns:
+            IVectorStore: The warmed vector store.
+        """
+        store = self.get_store(collection_name, persist_directory)
+        count = store.count()
+        logger.info(f"Vector store warmed up with {count} documents")
+        if settings.HYBRID_SEARCH_ENABLED:
+            index = self.get_lexical_index(collection_name, persist_directory)
+            logger.info(f"Lexical index warmed up with {len(index)} documents")
+        return store
+
+    def close(self) -> None:
+        """
+        Closes every registered store, saves the lexical indexes and empties the registry.
+        The executor of the async store methods is shut down first so no call is left running.
+        """
+        vector_store_executor.shutdown()
+
+        with self._lock:
+            stores = list(self._stores.values())
+            lexical_indexes = list(self._lexical_indexes.values())
+            self._stores.clear()
+            self._lexical_indexes.clear()
+
+        for index in lexical_indexes:
+            try:
+                index.save()
+            except Exception as e:
+                logger.error(f"Error saving lexical index: {str(e)}")
+
+        for store in stores:
+            try:
+                store.close()
+            except Exception as e:
+                logger.error(f"Error closing vector store: {str(e)}")
+
+
+vector_store_registry = VectorStoreRegistry()
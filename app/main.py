@@ -1,16 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 
+from app.infrastructure.vector_store.vector_store_registry import (
+    vector_store_registry,
+)
 from app.presentation.api.endpoints.ai_submission_endpoint import (
     router as ai_submission_router,
 )
 
 API_PREFIX = "/api/v1"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Abre o banco vetorial na inicialização e o fecha no desligamento da API.
+    """
+    vector_store_registry.warm_up()
+    yield
+    vector_store_registry.close()
+
+
 app = FastAPI(
     title="Clean RAG Bot API",
     description="API para processar submissões de mensagens de IA.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -44,7 +44,7 @@ async def process_submission(request: SubmissionRequest):
                     "thread_id"
                 ] = "default_thread"
 
-        responses = submission_service.process_message(request.input_message)
+        responses = await submission_service.aprocess_message(request.input_message)
 
         ai_content = ""
         retrieved_docs = []
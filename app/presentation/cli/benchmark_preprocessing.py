@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+from app.infrastructure.processors.preprocessor_document_agnt import (
+    DocumentPreProcessorAgent,
+)
+from app.settings import settings
+
+
+_PARAGRAPH = (
+    "Natural selection acts only by the preservation and accumulation of small "
+    "inherited modifications, each profitable to the preserved being. "
+)
+_SYNOPSIS = (
+    "Causes of Variability — Effects of Habit — Correlated Variation — Inheritance — "
+    "Character of Domestic Varieties"
+)
+
+
+class EchoSplitterChatModel(BaseChatModel):
+    """
+    Local chat model that answers a whole-batch preprocessing prompt with the batch as book
+    content, and a paragraph classification prompt with no summary paragraphs, after an
+    optional simulated latency. Counts the characters it receives and returns.
+    """
+
+    model_name: str = "echo-splitter"
+    latency: float = 0.0
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _input_chars: int = PrivateAttr(default=0)
+    _output_chars: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo-splitter"
+
+    @property
+    def input_chars(self) -> int:
+        return self._input_chars
+
+    @property
+    def output_chars(self) -> int:
+        return self._output_chars
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages[-1].content
+        if "summary_spans" in prompt:
+            content = json.dumps({"summary_spans": []})
+        else:
+            batch = prompt.split("Document text:\n", 1)[-1].strip()
+            content = json.dumps({"book_content": batch, "summary_content": ""})
+        with self._lock:
+            self._input_chars += len(prompt)
+            self._output_chars += len(content)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))]
+        )
+
+
+def write_synthetic_document(path: str, batches: int) -> int:
+    """
+    Writes a book of about the given number of preprocessing batches, made of chapters with
+    a heading, a synopsis, unique prose paragraphs, a caption and a closing summary.
+
+    Args:
+        path (str): Path of the text file.
+        batches (int): Number of batches of settings.PREPROCESSING_BATCH_BYTES bytes.
+
+    Returns:
+        int: Size of the document, in bytes.
+    """
+    target = batches * settings.PREPROCESSING_BATCH_BYTES
+    written = 0
+    chapter = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            chapter += 1
+            paragraphs = [
+                f"CHAPTER {chapter}. ON THE SUBJECT OF CHAPTER {chapter}.",
+                _SYNOPSIS,
+            ]
+            paragraphs += [
+                f"Paragraph {chapter}.{i}. " + _PARAGRAPH * 8 for i in range(8)
+            ]
+            paragraphs.append(f"Fig. {chapter}.")
+            paragraphs.append(f"Summary of Chapter {chapter}.—" + _PARAGRAPH * 4)
+            text = "\n\n".join(paragraphs) + "\n\n"
+            f.write(text)
+            written += len(text.encode("utf-8"))
+    return written
+
+
+def run(
+    sizes: List[int],
+    concurrency: int = None,
+    latency: float = 0.0,
+    classifier: str = None,
+) -> List[Dict[str, Any]]:
+    """
+    Preprocesses synthetic documents of increasing size with the local echo model and
+    measures the time and the peak Python memory per batch, which stay flat when the graph
+    state does not grow with the document, and the characters exchanged with the model.
+
+    Args:
+        sizes (List[int]): Document sizes, in batches.
+        concurrency (int, optional): Batches processed at the same time.
+            Defaults to settings.PREPROCESSING_MAX_CONCURRENCY.
+        latency (float): Simulated model latency per batch, in seconds.
+        classifier (str, optional): "heuristic" or "llm".
+            Defaults to settings.PREPROCESSING_CLASSIFIER.
+
+    Returns:
+        List[Dict[str, Any]]: One row of measurements per size.
+    """
+    rows = []
+    print(
+        f"{'batches':>8} {'bytes':>12} {'seconds':>9} {'ms/batch':>9} {'peak MB':>8} "
+        f"{'model in KB':>12} {'model out KB':>13}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.txt")
+            size_bytes = write_synthetic_document(path, size)
+            model = EchoSplitterChatModel(latency=latency)
+            agent = DocumentPreProcessorAgent(
+                output_dir=os.path.join(directory, "processed"),
+                chat_model=model,
+                max_concurrency=concurrency,
+                use_cache=False,
+                classifier=classifier,
+            )
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            final_state = agent.run_graph(path, "book")
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        if final_state.get("error"):
+            raise RuntimeError(final_state["error"])
+        batches = len(final_state["batch_spans"])
+        row = {
+            "batches": batches,
+            "bytes": size_bytes,
+            "seconds": round(elapsed, 3),
+            "ms_per_batch": round(1000 * elapsed / batches, 2),
+            "peak_mb": round(peak / 1_000_000, 2),
+            "model_input_kb": round(model.input_chars / 1000, 1),
+            "model_output_kb": round(model.output_chars / 1000, 1),
+        }
+        rows.append(row)
+        print(
+            f"{row['batches']:>8} {row['bytes']:>12} {row['seconds']:>9} "
+            f"{row['ms_per_batch']:>9} {row['peak_mb']:>8} "
+            f"{row['model_input_kb']:>12} {row['model_output_kb']:>13}"
+        )
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measures the per-batch overhead of the preprocessing graph with a local fake model."
+    )
+    parser.add_argument(
+        "--batches",
+        type=int,
+        nargs="+",
+        default=[8, 16, 32, 64],
+        help="Document sizes to run, in batches",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Batches processed at the same time (default: settings.PREPROCESSING_MAX_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Simulated model latency per batch, in seconds",
+    )
+    parser.add_argument(
+        "--classifier",
+        default=None,
+        choices=["heuristic", "llm"],
+        help="Paragraph classification (default: settings.PREPROCESSING_CLASSIFIER)",
+    )
+    args = parser.parse_args(argv)
+
+    run(
+        args.batches,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        classifier=args.classifier,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
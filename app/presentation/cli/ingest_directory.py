@@ -0,0 +1,256 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+from app.domain.entities.chunk import Chunk
+from app.infrastructure.chunkers.chunker_factory import create_chunker
+from app.infrastructure.processors.text_document_processor import DocumentProcessor
+from app.settings import settings
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_EXTENSIONS = (".txt", ".json")
+
+_processor: DocumentProcessor = None
+
+
+def discover_files(directory: str, pattern: str = "**/*") -> List[str]:
+    """
+    Lists the supported files under the directory.
+
+    Args:
+        directory (str): Root directory.
+        pattern (str): Glob pattern relative to the directory.
+
+    Returns:
+        List[str]: Paths of the .txt and .json files, sorted.
+    """
+    paths = glob.glob(os.path.join(directory, pattern), recursive=True)
+    return sorted(
+        path
+        for path in paths
+        if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+
+def _init_worker(strategy: str) -> None:
+    global _processor
+    _processor = DocumentProcessor(create_chunker(strategy))
+
+
+def _chunk_file(path: str) -> Dict[str, Any]:
+    """
+    Cleans and chunks one file in a worker process.
+    JSON fields are streamed from the file rather than loaded whole with json.load.
+    """
+    start = time.perf_counter()
+    if path.lower().endswith(".json"):
+        chunks = list(_processor.iter_json_chunks(path))
+    else:
+        chunks = _processor.chunk_text(path)
+    return {
+        "path": path,
+        "chunks": chunks,
+        "bytes": os.path.getsize(path),
+        "chunk_seconds": time.perf_counter() - start,
+    }
+
+
+def _title(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _ingest(ingestor, path: str, chunks: List[Chunk]) -> int:
+    if path.lower().endswith(".json"):
+        return ingestor.ingest_json_chunks(chunks, path)
+    return ingestor.ingest_text_chunks(chunks, path, title=_title(path))
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return amount / seconds if seconds else 0.0
+
+
+def run(
+    directory: str,
+    pattern: str = "**/*",
+    workers: int = None,
+    strategy: str = None,
+    dry_run: bool = False,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Chunks the files of a directory in a process pool and ingests them from this process,
+    the single writer of the vector store, as they are chunked.
+
+    Args:
+        directory (str): Directory of the documents.
+        pattern (str): Glob pattern of the files, relative to the directory.
+        workers (int, optional): Chunking processes. Defaults to the number of CPUs.
+        strategy (str, optional): Chunker strategy. Defaults to settings.CHUNKER_STRATEGY.
+        dry_run (bool): Only chunks the files, without embedding nor writing anything.
+            The semantic strategies need embeddings, so the recursive chunker is used instead
+            of the default strategy, and an explicit semantic strategy is refused.
+        resume (bool): Skips the chunks committed by an interrupted run, according to the
+            checkpoint journals.
+
+    Returns:
+        Dict[str, Any]: Per-file and aggregate counters.
+
+    Raises:
+        ValueError: If a dry run is asked for with a strategy other than "recursive".
+    """
+    if dry_run and strategy not in (None, "recursive"):
+        raise ValueError(
+            f"Dry runs only support the recursive chunker, not '{strategy}'"
+        )
+    strategy = strategy or settings.CHUNKER_STRATEGY
+    if dry_run and strategy != "recursive":
+        logger.warning(
+            f"Dry run: using the recursive chunker instead of the default '{strategy}'"
+        )
+        strategy = "recursive"
+
+    paths = discover_files(directory, pattern)
+    workers = workers or os.cpu_count() or 1
+    logger.info(
+        f"Ingesting {len(paths)} files from {directory} with {workers} chunking processes"
+    )
+
+    ingestor = None
+    if not dry_run:
+        from app.application.services.ingestion_service import IngestorService
+
+        ingestor = IngestorService(resume=resume)
+
+    files = []
+    failed = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(strategy,)
+    ) as pool:
+        futures = {pool.submit(_chunk_file, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Chunking failed for {path}: {str(e)}")
+                failed.append(path)
+                continue
+
+            ingested = 0
+            missing = 0
+            ingest_seconds = 0.0
+            if ingestor is not None:
+                ingest_start = time.perf_counter()
+                try:
+                    ingested = _ingest(ingestor, path, result["chunks"])
+                    missing = len(ingestor.last_report["missing_ids"])
+                except Exception as e:
+                    logger.error(f"Ingestion failed for {path}: {str(e)}")
+                    failed.append(path)
+                    continue
+                ingest_seconds = time.perf_counter() - ingest_start
+
+            files.append(
+                {
+                    "path": path,
+                    "chunker": strategy,
+                    "bytes": result["bytes"],
+                    "chunks": len(result["chunks"]),
+                    "ingested": ingested,
+                    "missing": missing,
+                    "chunk_seconds": round(result["chunk_seconds"], 3),
+                    "ingest_seconds": round(ingest_seconds, 3),
+                    "chunks_per_second": round(
+                        _rate(len(result["chunks"]), result["chunk_seconds"]), 1
+                    ),
+                }
+            )
+            print(
+                f"{path}: {files[-1]['chunks']} chunks ({strategy} chunker) "
+                f"in {files[-1]['chunk_seconds']}s "
+                f"({files[-1]['chunks_per_second']} chunks/s), "
+                f"{ingested} ingested in {files[-1]['ingest_seconds']}s, {missing} missing"
+            )
+    elapsed = time.perf_counter() - start
+
+    if ingestor is not None:
+        ingestor.close()
+        from app.infrastructure.vector_store.vector_store_registry import (
+            vector_store_registry,
+        )
+
+        vector_store_registry.close()
+
+    total_bytes = sum(item["bytes"] for item in files)
+    total_chunks = sum(item["chunks"] for item in files)
+    report = {
+        "files": files,
+        "failed": failed,
+        "total_files": len(files),
+        "total_chunks": total_chunks,
+        "total_ingested": sum(item["ingested"] for item in files),
+        "total_missing": sum(item["missing"] for item in files),
+        "wall_seconds": round(elapsed, 3),
+        "chunks_per_second": round(_rate(total_chunks, elapsed), 1),
+        "mb_per_second": round(_rate(total_bytes / 1_000_000, elapsed), 3),
+    }
+    print(
+        f"Total: {report['total_files']} files, {total_chunks} chunks, "
+        f"{report['total_ingested']} ingested in {report['wall_seconds']}s "
+        f"({report['chunks_per_second']} chunks/s, {report['mb_per_second']} MB/s), "
+        f"{report['total_missing']} chunks missing, {len(failed)} files failed"
+    )
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Chunks and ingests every .txt and .json file of a directory."
+    )
+    parser.add_argument("directory", help="Directory of the documents")
+    parser.add_argument(
+        "--pattern", default="**/*", help="Glob pattern relative to the directory"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Chunking processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--chunker",
+        default=None,
+        choices=["semantic", "langchain_semantic", "recursive"],
+        help="Chunker strategy (default: settings.CHUNKER_STRATEGY)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only chunk the files, without embedding nor writing to the vector store",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the chunks committed by an interrupted run",
+    )
+    args = parser.parse_args(argv)
+    if args.dry_run and args.chunker not in (None, "recursive"):
+        parser.error(
+            f"--dry-run only supports the recursive chunker, not '{args.chunker}'"
+        )
+
+    report = run(
+        args.directory,
+        pattern=args.pattern,
+        workers=args.workers,
+        strategy=args.chunker,
+        dry_run=args.dry_run,
+        resume=args.resume,
+    )
+    return 1 if report["failed"] or report["total_missing"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
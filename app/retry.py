@@ -0,0 +1,35 @@
+import time
+from typing import Callable
+from app.logs import get_logger
+
+logger = get_logger(__name__)
+
+
+def call_with_retries(func: Callable, max_attempts: int, description: str, *args):
+    """
+    Calls func, retrying failures with exponential backoff up to max_attempts calls in total.
+
+    Args:
+        func (Callable): Function to call.
+        max_attempts (int): Maximum number of calls.
+        description (str): What the call does, for the logs.
+        *args: Arguments of func.
+
+    Returns:
+        Any: The result of func.
+
+    Raises:
+        Exception: The error of the last attempt.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return func(*args)
+        except Exception as e:
+            if attempt == max_attempts:
+                raise
+            delay = min(30.0, 0.5 * 2 ** (attempt - 1))
+            logger.warning(
+                f"{description} failed (attempt {attempt}/{max_attempts}): {str(e)}, "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
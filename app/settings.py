@@ -1,5 +1,5 @@
 from functools import cache
-from typing import Optional
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -21,16 +21,72 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
 
     EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_BASE_URL: Optional[str] = None
+    EMBEDDING_MAX_TOKENS_PER_REQUEST: int = 100_000
+    EMBEDDING_MAX_TEXTS_PER_REQUEST: int = 2048
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8191
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1_000_000
+    EMBEDDING_MAX_RETRIES: int = 6
+    EMBEDDING_CACHE_PATH: Optional[str] = os.path.join(
+        BASE_DIR, "data/embedding_cache.sqlite3"
+    )
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_EMBEDDING_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: Optional[float] = 24 * 60 * 60
+    QUERY_EMBEDDING_CACHE_PATH: Optional[str] = None
     LLM_MODEL: str = "gpt-4o"
 
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
-
-    VECTOR_STORE_TYPE: str = "in_memory"
+    CHUNKER_STRATEGY: str = "semantic"
+    SEMANTIC_BREAKPOINT_THRESHOLD_TYPE: str = "percentile"
+    SEMANTIC_BREAKPOINT_THRESHOLD_AMOUNT: float = 0.7
+    SEMANTIC_BUFFER_SIZE: int = 1
+    SEMANTIC_MIN_CHUNK_CHARS: Optional[int] = None
+    SEMANTIC_MAX_CHUNK_CHARS: Optional[int] = None
+
+    INGESTION_PIPELINED: bool = True
+    INGESTION_WINDOW_CHARS: int = 100_000
+    INGESTION_SINGLE_PASS: bool = False
+    INGESTION_RESUME: bool = False
+    INGESTION_MAX_BATCH_ATTEMPTS: int = 3
+    INGESTION_EMBED_WORKERS: int = 4
+    INGESTION_QUEUE_SIZE: int = 8
+    INGESTION_WRITE_BATCH_SIZE: int = 2000
+
+    VECTOR_STORE_TYPE: str = "chroma"
     VECTOR_STORE_PATH: str = os.path.join(BASE_DIR, "data/vector_store")
+    VECTOR_STORE_COLLECTION: str = "the_origin_of_species"
+    VECTOR_STORE_QUANTIZATION: Optional[str] = None
+    VECTOR_STORE_QUANTIZED_RESCORE: bool = True
+    VECTOR_STORE_PARTITION_KEYS: List[str] = ["source_type", "source"]
+    CHROMA_HNSW_BATCH_SIZE: Optional[int] = 1000
+    CHROMA_HNSW_SYNC_THRESHOLD: Optional[int] = 10000
+    VECTOR_STORE_EXECUTOR_WORKERS: int = 8
+
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_FETCH_K: int = 20
+    HYBRID_RRF_K: int = 60
+
+    SUMMARY_FIRST_MIN_RESULTS: int = 3
+
+    MMR_ENABLED: bool = True
+    MMR_LAMBDA: float = 0.7
+    MMR_FETCH_K: int = 20
+    MMR_FINAL_K: int = 6
+    MMR_DUPLICATE_THRESHOLD: float = 0.95
+    RETRIEVAL_CONTEXT_CHAR_BUDGET: int = 6000
 
     CHAT_MODEL: str = "gpt-4o-mini"
 
+    PREPROCESSING_BATCH_BYTES: int = 120_000
+    PREPROCESSING_BATCH_OVERLAP_BYTES: int = 1000
+    PREPROCESSING_MAX_CONCURRENCY: int = 4
+    PREPROCESSING_MAX_ATTEMPTS: int = 3
+    PREPROCESSING_CACHE_ENABLED: bool = True
+    PREPROCESSING_CLASSIFIER: str = "llm"
+
     model_config = SettingsConfigDict(
         env_file=[".env"], env_file_encoding="utf-8", extra="ignore"
     )
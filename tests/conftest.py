@@ -0,0 +1,42 @@
+import hashlib
+import os
+from typing import List
+import pytest
+from langchain_core.embeddings import Embeddings
+from tests.fake_openai_server import FakeEmbeddingsServer
+
+# OpenAI clients are built, never called, by the components under test.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+
+class CountingEmbeddings(Embeddings):
+    """
+    Deterministic local embeddings that record every text they embed.
+    """
+
+    def __init__(self, dimension: int = 8):
+        self.dimension = dimension
+        self.embedded: List[str] = []
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 + 0.01 for byte in digest[: self.dimension]]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+@pytest.fixture
+def embeddings() -> CountingEmbeddings:
+    return CountingEmbeddings()
+
+
+@pytest.fixture
+def embeddings_server():
+    with FakeEmbeddingsServer() as server:
+        yield server
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+class FakeEmbeddingsServer:
+    """
+    Local OpenAI-compatible embeddings endpoint. Records the inputs of every request and
+    answers them with deterministic vectors, or with the queued error responses first.
+    """
+
+    def __init__(self, dimension: int = 4):
+        self.dimension = dimension
+        self.requests: List[List[str]] = []
+        self.errors: List[Tuple[int, Dict[str, str], Dict]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def fail_next(
+        self, status: int, message: str, code: str = None, headers: Dict = None
+    ) -> None:
+        """
+        Queues an error response for the next request.
+        """
+        error = {"message": message, "type": "invalid_request_error", "code": code}
+        self.errors.append((status, headers or {}, {"error": error}))
+
+    def vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 for byte in digest[: self.dimension]]
+
+    def _respond(self, inputs: List[str]) -> Tuple[int, Dict[str, str], Dict]:
+        with self._lock:
+            self.requests.append(inputs)
+            if self.errors:
+                return self.errors.pop(0)
+        data = [
+            {"object": "embedding", "index": i, "embedding": self.vector(text)}
+            for i, text in enumerate(inputs)
+        ]
+        usage = {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+        return (
+            200,
+            {},
+            {"object": "list", "data": data, "model": "fake", "usage": usage},
+        )
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+                inputs = body["input"]
+                status, headers, payload = server._respond(
+                    [inputs] if isinstance(inputs, str) else inputs
+                )
+                content = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+    def __enter__(self) -> "FakeEmbeddingsServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,100 @@
+import time
+import openai
+import pytest
+from app.infrastructure.embeddings.embedding_executor import EmbeddingExecutor
+
+
+@pytest.fixture
+def make_executor(embeddings_server):
+    executors = []
+
+    def make(**kwargs):
+        kwargs.setdefault("max_retries", 2)
+        executor = EmbeddingExecutor(
+            model="fake",
+            api_key="test-key",
+            base_url=embeddings_server.base_url,
+            **kwargs,
+        )
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.close()
+
+
+def test_too_many_inputs_splits_the_request(embeddings_server, make_executor):
+    executor = make_executor()
+    texts = [f"text {i}" for i in range(4)]
+    embeddings_server.fail_next(400, "Too many inputs. The max number of inputs is 2.")
+
+    vectors = executor.embed_documents(texts)
+
+    assert vectors == [embeddings_server.vector(text) for text in texts]
+    assert embeddings_server.requests == [texts, texts[:2], texts[2:]]
+    assert executor.stats()["splits"] == 1
+
+
+def test_other_bad_requests_are_raised(embeddings_server, make_executor):
+    executor = make_executor()
+    embeddings_server.fail_next(400, "'$.input' is invalid.", code="invalid_input")
+
+    with pytest.raises(openai.BadRequestError):
+        executor.embed_documents(["text 0", "text 1"])
+    assert len(embeddings_server.requests) == 1
+
+
+def test_texts_over_the_input_limit_are_truncated(embeddings_server, make_executor):
+    executor = make_executor(max_input_tokens=10)
+    executor._encoding = None
+
+    executor.embed_documents(["x" * 400, "short text"])
+
+    assert embeddings_server.requests == [["x" * 40, "short text"]]
+
+
+def test_single_rejected_input_is_truncated(embeddings_server, make_executor):
+    executor = make_executor()
+    executor._encoding = None
+    text = "word " * 100
+    embeddings_server.fail_next(
+        400,
+        "This model's maximum context length is 8192 tokens.",
+        code="context_length_exceeded",
+    )
+
+    vectors = executor.embed_documents([text])
+
+    sent = embeddings_server.requests[1][0]
+    assert len(embeddings_server.requests) == 2
+    assert text.startswith(sent) and len(sent) < len(text)
+    assert vectors == [embeddings_server.vector(sent)]
+
+
+def test_texts_are_packed_by_token_and_input_budgets(embeddings_server, make_executor):
+    executor = make_executor(max_tokens_per_request=25, max_texts_per_request=3)
+    executor._encoding = None
+    # 40 characters are estimated at 11 tokens.
+    texts = [f"{i:02d}" + "x" * 38 for i in range(5)]
+
+    vectors = executor.embed_documents(texts)
+
+    assert vectors == [embeddings_server.vector(text) for text in texts]
+    assert sorted(embeddings_server.requests) == [texts[0:2], texts[2:4], texts[4:]]
+
+
+def test_rate_limits_wait_for_retry_after(embeddings_server, make_executor):
+    executor = make_executor()
+    embeddings_server.fail_next(
+        429, "Rate limit reached", headers={"retry-after": "0.3"}
+    )
+
+    start = time.perf_counter()
+    vectors = executor.embed_documents(["text 0"])
+    elapsed = time.perf_counter() - start
+
+    assert vectors == [embeddings_server.vector("text 0")]
+    assert len(embeddings_server.requests) == 2
+    assert elapsed >= 0.3
+    assert executor.stats()["retries"] == 1
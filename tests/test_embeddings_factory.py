@@ -0,0 +1,23 @@
+from app.infrastructure.embeddings import embeddings_factory
+from app.infrastructure.embeddings.persistent_embedding_cache import (
+    PersistentEmbeddingCache,
+)
+
+
+def test_persistent_cache_only_wraps_document_embeddings(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        embeddings_factory.settings,
+        "EMBEDDING_CACHE_PATH",
+        str(tmp_path / "embedding_cache.sqlite3"),
+    )
+
+    store_embeddings = embeddings_factory.create_store_embeddings()
+    chunker_embeddings = embeddings_factory.create_chunker_embeddings()
+    ingestion_embeddings = embeddings_factory.create_ingestion_embeddings()
+    try:
+        assert not isinstance(store_embeddings.embeddings, PersistentEmbeddingCache)
+        assert isinstance(chunker_embeddings, PersistentEmbeddingCache)
+        assert isinstance(ingestion_embeddings, PersistentEmbeddingCache)
+    finally:
+        chunker_embeddings.close()
+        ingestion_embeddings.close()
@@ -0,0 +1,75 @@
+import json
+import pytest
+from app.application.services import ingestion_service
+from app.presentation.cli import ingest_directory
+
+TEXT = "Natural selection preserves favourable variations. " * 40
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(TEXT, encoding="utf-8")
+    return tmp_path
+
+
+def test_dry_run_refuses_an_explicit_semantic_chunker(directory):
+    with pytest.raises(SystemExit):
+        ingest_directory.main([str(directory), "--dry-run", "--chunker", "semantic"])
+    with pytest.raises(ValueError):
+        ingest_directory.run(str(directory), dry_run=True, strategy="semantic")
+
+
+def test_dry_run_reports_the_recursive_chunker(directory, monkeypatch, capsys):
+    monkeypatch.setattr(ingest_directory.settings, "CHUNKER_STRATEGY", "semantic")
+
+    report = ingest_directory.run(str(directory), workers=1, dry_run=True)
+
+    assert [item["chunker"] for item in report["files"]] == ["recursive"] * 2
+    assert "(recursive chunker)" in capsys.readouterr().out
+
+
+def test_failed_ingestions_are_only_counted_as_failed(directory, monkeypatch):
+    class FailingIngestor:
+        def __init__(self, resume=False):
+            pass
+
+        def ingest_text_chunks(self, chunks, path, title=None):
+            if path.endswith("a.txt"):
+                raise RuntimeError("store unavailable")
+            self.last_report = {"missing_ids": []}
+            return len(chunks)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ingestion_service, "IngestorService", FailingIngestor)
+
+    report = ingest_directory.run(str(directory), workers=1, strategy="recursive")
+
+    assert report["failed"] == [str(directory / "a.txt")]
+    assert [item["path"] for item in report["files"]] == [str(directory / "b.txt")]
+    assert report["total_files"] == 1
+
+
+def test_json_files_are_chunked_from_the_stream(tmp_path, monkeypatch):
+    path = tmp_path / "book.json"
+    path.write_text(
+        json.dumps({"title": "Origin", "book_content": TEXT, "summary_content": TEXT}),
+        encoding="utf-8",
+    )
+
+    def load_whole_file(*args, **kwargs):
+        raise AssertionError("JSON files should not be loaded whole")
+
+    monkeypatch.setattr(
+        ingest_directory.DocumentProcessor, "chunk_json", load_whole_file
+    )
+    monkeypatch.setattr(ingest_directory, "_processor", None)
+    ingest_directory._init_worker("recursive")
+
+    result = ingest_directory._chunk_file(str(path))
+
+    source_types = [chunk.metadata["source_type"] for chunk in result["chunks"]]
+    assert "book_content" in source_types and "summary_content" in source_types
+    assert source_types == sorted(source_types)
@@ -0,0 +1,124 @@
+from typing import List
+import pytest
+from app.application.services import ingestion_service
+from app.application.services.ingestion_service import IngestorService
+from app.domain.entities.chunk import Chunk
+from app.infrastructure.search.bm25_index import BM25Index
+from app.infrastructure.vector_store.numpy_vector_store import NumpyVectorStore
+from tests.conftest import CountingEmbeddings
+
+
+class Crash(BaseException):
+    """Stands for the process dying: not caught by the batch retries."""
+
+
+class CrashingEmbeddings(CountingEmbeddings):
+    def __init__(self, crash_after: int):
+        super().__init__()
+        self.crash_after = crash_after
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.calls > self.crash_after:
+            raise Crash()
+        return super().embed_documents(texts)
+
+
+def make_chunks() -> List[Chunk]:
+    return [
+        Chunk(text=f"Paragraph {i} about the variation of species.") for i in range(6)
+    ]
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_resume_after_crash_mid_source(tmp_path, embeddings, pipelined):
+    store = NumpyVectorStore("resume", str(tmp_path), embedding_function=embeddings)
+    index_path = str(tmp_path / "bm25")
+    source = str(tmp_path / "book.txt")
+
+    crashing = IngestorService(
+        vector_store=store,
+        batch_size=2,
+        lexical_index=BM25Index(index_path),
+        pipelined=False,
+        embeddings=CrashingEmbeddings(crash_after=2),
+        resume=True,
+    )
+    with pytest.raises(Crash):
+        crashing.ingest_text_chunks(make_chunks(), source)
+    assert store.count() == 4
+
+    # The lexical index was never saved, as after a real crash.
+    lexical_index = BM25Index(index_path)
+    assert len(lexical_index) == 0
+    service = IngestorService(
+        vector_store=store,
+        batch_size=2,
+        lexical_index=lexical_index,
+        pipelined=pipelined,
+        embeddings=embeddings,
+        resume=True,
+    )
+    ingested = service.ingest_text_chunks(make_chunks(), source)
+
+    assert service.last_report["resumed"] == 4
+    assert ingested == 2
+    assert embeddings.embedded == [chunk.text for chunk in make_chunks()[4:]]
+    assert store.count() == 6
+    assert all(doc_id in lexical_index for doc_id in store._ids)
+
+
+def test_embeddings_are_created_on_first_use_and_closed(tmp_path, monkeypatch):
+    created = []
+
+    class ClosableEmbeddings(CountingEmbeddings):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def create():
+        created.append(ClosableEmbeddings())
+        return created[-1]
+
+    monkeypatch.setattr(ingestion_service, "create_ingestion_embeddings", create)
+    store = NumpyVectorStore(
+        "lazy", str(tmp_path), embedding_function=CountingEmbeddings()
+    )
+
+    with IngestorService(
+        vector_store=store,
+        lexical_index=BM25Index(str(tmp_path / "bm25")),
+        pipelined=False,
+    ) as service:
+        assert created == []
+        service.ingest_text_chunks(make_chunks(), str(tmp_path / "book.txt"))
+        assert len(created) == 1
+
+    assert created[0].closed
+    assert store.count() == 6
+
+
+def test_incremental_metadata_matches_a_fresh_ingestion(tmp_path, embeddings):
+    chunks = make_chunks()
+    edited = [Chunk(text="A new opening paragraph.")] + chunks[:3] + chunks[4:]
+
+    def ingest(directory, versions):
+        store = NumpyVectorStore("meta", str(directory), embedding_function=embeddings)
+        service = IngestorService(
+            vector_store=store,
+            lexical_index=BM25Index(str(directory / "bm25")),
+            pipelined=False,
+            embeddings=embeddings,
+        )
+        for version in versions:
+            service.ingest_text_chunks(version, str(tmp_path / "book.txt"))
+        return {
+            doc_id: store._metadatas[row] for doc_id, row in store._id_to_row.items()
+        }
+
+    incremental = ingest(tmp_path / "incremental", [chunks, edited])
+    fresh = ingest(tmp_path / "fresh", [edited])
+
+    assert incremental == fresh
@@ -0,0 +1,136 @@
+import io
+import json
+import random
+import pytest
+from app.infrastructure.processors.json_string_stream import (
+    _JsonScanner,
+    iter_json_string_fields,
+)
+
+ALPHABET = 'ab \n\t"\\/}]{[,:é中\U0001f600\x01'
+
+
+def random_string(rng: random.Random) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40)))
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    kind = rng.choice(
+        ["string", "string", "number", "literal"] + ["list", "dict"] * (depth < 3)
+    )
+    if kind == "string":
+        return random_string(rng)
+    if kind == "number":
+        return rng.choice([0, -12, 3.5e-7, 1e21, 42])
+    if kind == "literal":
+        return rng.choice([True, False, None])
+    if kind == "list":
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {
+        f"k{i}{random_string(rng)}": random_value(rng, depth + 1)
+        for i in range(rng.randint(0, 4))
+    }
+
+
+def random_document(rng: random.Random) -> str:
+    document = {
+        f"field{i}": random_value(rng, depth=1) for i in range(rng.randint(0, 6))
+    }
+    return json.dumps(
+        document,
+        ensure_ascii=rng.random() < 0.5,
+        indent=rng.choice([None, 0, 2]),
+        separators=rng.choice([None, (",", ":"), (" , ", " : ")]),
+    )
+
+
+def stream_fields(path, fields, read_size):
+    return {
+        name: "".join(pieces)
+        for name, pieces in iter_json_string_fields(str(path), fields, read_size)
+    }
+
+
+def test_streamed_fields_match_json_load(tmp_path):
+    rng = random.Random(0)
+    path = tmp_path / "document.json"
+    for _ in range(40):
+        text = random_document(rng)
+        path.write_text(text, encoding="utf-8")
+        document = json.loads(text)
+        expected = {k: v for k, v in document.items() if isinstance(v, str)}
+
+        for read_size in range(1, 65):
+            assert stream_fields(path, document, read_size) == expected, (
+                text,
+                read_size,
+            )
+
+
+def test_escapes_and_surrogate_pairs_across_block_boundaries(tmp_path):
+    value = 'x\\"\né\U0001f600\ud83dA/\t' * 3
+    path = tmp_path / "document.json"
+    path.write_text(
+        json.dumps({"book_content": value}, ensure_ascii=True), encoding="utf-8"
+    )
+
+    for read_size in range(1, 65):
+        assert stream_fields(path, ["book_content"], read_size) == {
+            "book_content": value
+        }
+
+
+def test_skip_value_consumes_nested_values():
+    text = '{"a": [1, {"b": "}]\\""}, [[]]], "c": -1.5e3} , "rest"'
+    scanner = _JsonScanner(io.StringIO(text), read_size=3)
+
+    scanner.skip_value()
+
+    assert scanner.next_char() == ","
+    scanner.pos += 1
+    assert "".join(scanner.iter_string()) == "rest"
+
+
+def test_nested_fields_are_not_streamed(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text(
+        json.dumps(
+            {
+                "meta": {"book_content": "nested", "list": ["book_content"]},
+                "book_content": 7,
+                "summary_content": "top level",
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    assert stream_fields(path, ["book_content", "summary_content"], 4) == {
+        "summary_content": "top level"
+    }
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"book_content": "unterminated',
+        '{"book_content": "escape \\u00',
+        '{"book_content": "done", "other": [1, 2',
+        '{"book_content": "done"',
+        "",
+    ],
+)
+def test_truncated_input_raises(tmp_path, text):
+    path = tmp_path / "document.json"
+    path.write_text(text, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        stream_fields(path, ["book_content"], 5)
+
+
+@pytest.mark.parametrize("text", ['["book_content"]', '"book_content"', "42"])
+def test_non_object_root_raises(tmp_path, text):
+    path = tmp_path / "document.json"
+    path.write_text(text, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        stream_fields(path, ["book_content"], 5)
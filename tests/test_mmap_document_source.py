@@ -0,0 +1,43 @@
+from app.infrastructure.processors.mmap_document_source import (
+    MmapDocumentSource,
+    open_mmap_document,
+)
+from app.infrastructure.processors.preprocessor_document_agnt import split_into_spans
+
+
+def test_offsets_are_utf8_bytes(tmp_path):
+    path = tmp_path / "book.txt"
+    path.write_bytes("Évolution — espèces\r\nfin".encode("utf-8"))
+
+    with MmapDocumentSource(str(path)) as source:
+        assert len(source) == path.stat().st_size
+        # Offset 1 falls inside the two bytes of "É".
+        assert source.align(1) == 0
+        assert source.read() == "Évolution — espèces\nfin"
+        assert source.rfind("\n", 0, len(source)) == len(source) - len("\nfin")
+
+
+def test_batches_are_measured_in_bytes(tmp_path):
+    path = tmp_path / "book.txt"
+    paragraph = "é" * 50
+    path.write_text("\n\n".join([paragraph] * 4), encoding="utf-8")
+
+    with MmapDocumentSource(str(path)) as source:
+        spans = split_into_spans(source, batch_size=120, overlap=0)
+        assert all(end - start <= 120 for start, end in spans)
+        assert (
+            "".join(source.read(*span) for span in spans).replace("\n", "") == "é" * 200
+        )
+
+
+def test_open_mmap_document(tmp_path):
+    path = tmp_path / "book.txt"
+    path.write_text("First line.\nSecond line.", encoding="utf-8")
+
+    document = open_mmap_document(str(path))
+    try:
+        assert document.content is None
+        assert document.read() == "First line.\nSecond line."
+        assert document.get_summary(5) == "First..."
+    finally:
+        document.close()
@@ -0,0 +1,49 @@
+import numpy as np
+from app.infrastructure.vector_store.numpy_vector_store import NumpyVectorStore
+
+
+def make_store(tmp_path, embeddings) -> NumpyVectorStore:
+    return NumpyVectorStore("store", str(tmp_path), embedding_function=embeddings)
+
+
+def test_duplicate_ids_in_a_batch_keep_the_last_write(tmp_path, embeddings):
+    store = make_store(tmp_path, embeddings)
+    vectors = embeddings.embed_documents(["first", "second"])
+
+    store.add_embeddings_directly(["first", "second"], vectors, ids=["x", "x"])
+
+    assert store.count() == 1
+    docs = store.direct_search("second", n_results=5)
+    assert [(doc.id, doc.page_content) for doc in docs] == [("x", "second")]
+    assert np.allclose(
+        store.get_embeddings(["x"])[0],
+        np.asarray(vectors[1]) / np.linalg.norm(vectors[1]),
+    )
+
+
+def test_appends_reuse_a_growing_buffer(tmp_path, embeddings):
+    store = make_store(tmp_path, embeddings)
+    buffers = set()
+    texts = [f"text {i}" for i in range(3000)]
+
+    for start in range(0, len(texts), 100):
+        batch = texts[start : start + 100]
+        store.add_embeddings_directly(
+            batch, embeddings.embed_documents(batch), ids=batch
+        )
+        assert store._matrix.base is store._buffer
+        buffers.add(id(store._buffer))
+
+    # 1024 rows, then 2048, then 4096.
+    assert len(buffers) == 3
+    assert store.count() == len(texts)
+
+    store.delete(texts[:10])
+    store.add_embeddings_directly(
+        ["text 0"], embeddings.embed_documents(["text 0"]), ids=["text 0"]
+    )
+    assert store.count() == len(texts) - 9
+    assert store.direct_search("text 0", n_results=1)[0].id == "text 0"
+    assert np.allclose(
+        np.linalg.norm(store.get_embeddings(texts[10:20]), axis=1), 1.0, atol=1e-5
+    )
@@ -0,0 +1,79 @@
+import pytest
+from app.infrastructure.processors.paragraph_classifier import (
+    AMBIGUOUS,
+    BOOK,
+    SUMMARY,
+    HeuristicParagraphClassifier,
+)
+from app.infrastructure.processors.preprocessor_document_agnt import (
+    DocumentPreProcessorAgent,
+)
+from app.presentation.cli.benchmark_preprocessing import EchoSplitterChatModel
+
+PROSE = (
+    "Natural selection acts only by the preservation and accumulation of small "
+    "inherited modifications, each profitable to the preserved being, and it may "
+    "be said to be daily and hourly scrutinising throughout the world every variation."
+)
+TEXT = "\n\n".join(
+    [
+        PROSE,
+        "CHAPTER I. VARIATION UNDER DOMESTICATION.",
+        PROSE + " First chapter.",
+        "RECAPITULATION",
+        PROSE + " Recapitulated.",
+        PROSE + " Recapitulated again.",
+        "CHAPTER II. VARIATION UNDER NATURE.",
+        PROSE + " Second chapter.",
+    ]
+)
+
+
+def test_prose_takes_the_section_of_the_last_heading():
+    paragraphs = HeuristicParagraphClassifier().classify(TEXT)
+
+    assert [p.label for p in paragraphs] == [
+        AMBIGUOUS,
+        BOOK,
+        BOOK,
+        SUMMARY,
+        SUMMARY,
+        SUMMARY,
+        BOOK,
+        BOOK,
+    ]
+
+
+@pytest.mark.parametrize("cut", ["RECAPITULATION", PROSE + " Recapitulated again."])
+def test_sections_carry_across_split_texts(cut):
+    classifier = HeuristicParagraphClassifier()
+    split = TEXT.index(cut)
+    head, tail = TEXT[:split], TEXT[split:]
+
+    section = classifier.section_after(head)
+    paragraphs = classifier.classify(head) + classifier.classify(tail, section)
+
+    assert [p.label for p in paragraphs] == [p.label for p in classifier.classify(TEXT)]
+
+
+def test_agent_carries_sections_across_batches(tmp_path, monkeypatch):
+    from app.settings import settings
+
+    path = tmp_path / "book.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    cut = TEXT.index(PROSE + " Recapitulated again.")
+    monkeypatch.setattr(settings, "PREPROCESSING_BATCH_BYTES", cut + 10)
+    monkeypatch.setattr(settings, "PREPROCESSING_BATCH_OVERLAP_BYTES", 0)
+    agent = DocumentPreProcessorAgent(
+        output_dir=str(tmp_path / "processed"),
+        chat_model=EchoSplitterChatModel(),
+        use_cache=False,
+        classifier="heuristic",
+    )
+
+    state = agent.run_graph(str(path), "book")
+
+    assert len(state["batch_spans"]) == 2
+    summary = (tmp_path / "processed" / "book_summary.txt").read_text(encoding="utf-8")
+    assert "Recapitulated again." in summary
+    assert "Second chapter." not in summary
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import pytest
+from app.infrastructure.embeddings.persistent_embedding_cache import (
+    PersistentEmbeddingCache,
+)
+
+
+def test_async_lookups_run_outside_the_event_loop(tmp_path, embeddings):
+    cache = PersistentEmbeddingCache(
+        embeddings, "test-model", str(tmp_path / "cache.sqlite3")
+    )
+    threads = []
+    lookup = cache._lookup
+
+    def recording_lookup(keys):
+        threads.append(threading.current_thread())
+        return lookup(keys)
+
+    cache._lookup = recording_lookup
+
+    async def embed():
+        first = await cache.aembed_documents(["a text", "another text", "a text"])
+        second = await cache.aembed_documents(["a text"])
+        query = await cache.aembed_query("a query")
+        return first, second, query
+
+    try:
+        first, second, query = asyncio.run(embed())
+    finally:
+        cache.close()
+
+    assert threading.main_thread() not in threads
+    assert first[0] == first[2]
+    # Cached vectors are stored as float32.
+    assert second[0] == pytest.approx(first[0], rel=1e-6)
+    assert query == embeddings.embed_query("a query")
+    assert embeddings.embedded[:2] == ["a text", "another text"]
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,180 @@
+import json
+import re
+import time
+from types import SimpleNamespace
+from typing import Dict
+import pytest
+from pydantic import PrivateAttr
+from app import retry
+from app.infrastructure.processors.batch_result_cache import BatchResultCache
+from app.infrastructure.processors.preprocessor_document_agnt import (
+    DocumentPreProcessorAgent,
+)
+from app.presentation.cli.benchmark_preprocessing import (
+    EchoSplitterChatModel,
+    write_synthetic_document,
+)
+from app.settings import settings
+
+_BATCH_NUMBER = re.compile(r"This is batch (\d+) of")
+_CHAPTER = re.compile(r"CHAPTER (\d+)\.")
+
+
+class TrackingEchoModel(EchoSplitterChatModel):
+    """
+    Echo model that records the batches in flight and fails the first calls of some batches.
+    """
+
+    _active: int = PrivateAttr(default=0)
+    _peak: int = PrivateAttr(default=0)
+    _calls: Dict[int, int] = PrivateAttr(default_factory=dict)
+    _failures: Dict[int, int] = PrivateAttr(default_factory=dict)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        batch_number = int(_BATCH_NUMBER.search(messages[-1].content).group(1))
+        with self._lock:
+            self._active += 1
+            self._peak = max(self._peak, self._active)
+            self._calls[batch_number] = self._calls.get(batch_number, 0) + 1
+            failing = self._failures.get(batch_number, 0) > 0
+            if failing:
+                self._failures[batch_number] -= 1
+        try:
+            time.sleep(0.05)
+            if failing:
+                raise RuntimeError(f"Batch {batch_number} unavailable")
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+@pytest.fixture
+def document(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PREPROCESSING_BATCH_BYTES", 20_000)
+    monkeypatch.setattr(settings, "PREPROCESSING_BATCH_OVERLAP_BYTES", 0)
+    monkeypatch.setattr(retry, "time", SimpleNamespace(sleep=lambda seconds: None))
+    path = tmp_path / "book.txt"
+    write_synthetic_document(str(path), 6)
+    return path
+
+
+def make_agent(tmp_path, model, **options) -> DocumentPreProcessorAgent:
+    options.setdefault("use_cache", False)
+    return DocumentPreProcessorAgent(
+        output_dir=str(tmp_path / "processed"),
+        chat_model=model,
+        classifier="llm",
+        **options,
+    )
+
+
+def read_book(tmp_path) -> str:
+    return (tmp_path / "processed" / "book_book.txt").read_text(encoding="utf-8")
+
+
+def cache_files(tmp_path) -> Dict[int, str]:
+    """Return the path of each cached batch result by batch number."""
+    files = {}
+    for path in (tmp_path / "processed" / "batches" / "book").glob("*.json"):
+        files[json.loads(path.read_text(encoding="utf-8"))["batch_number"]] = path
+    return files
+
+
+def test_batches_run_concurrently_and_merge_in_order(tmp_path, document):
+    model = TrackingEchoModel()
+    model._failures[3] = 1
+    agent = make_agent(tmp_path, model, max_concurrency=2, max_attempts=2)
+
+    state = agent.run_graph(str(document), "book")
+
+    assert not state.get("error")
+    total = len(state["batch_spans"])
+    assert total >= 6
+    assert model._peak == 2
+    assert model._calls == {n: 2 if n == 3 else 1 for n in range(1, total + 1)}
+    book = (tmp_path / "processed" / "book_book.txt").read_text(encoding="utf-8")
+    chapters = _CHAPTER.findall(document.read_text(encoding="utf-8"))
+    assert _CHAPTER.findall(book) == chapters
+
+
+def test_failed_batches_are_reported_by_number(tmp_path, document):
+    model = TrackingEchoModel()
+    model._failures.update({3: 10, 5: 10})
+    agent = make_agent(tmp_path, model, max_concurrency=3, max_attempts=2)
+
+    state = agent.run_graph(str(document), "book")
+
+    assert state["error"].startswith("Error processing batch 3: Batch 3 unavailable")
+    assert "(2/" in state["error"]
+    assert model._calls[3] == model._calls[5] == 2
+
+
+def test_a_rerun_reuses_every_cached_batch(tmp_path, document):
+    model = TrackingEchoModel()
+    agent = make_agent(tmp_path, model, use_cache=True)
+    first = agent.run_graph(str(document), "book")
+    book = read_book(tmp_path)
+    model._calls.clear()
+
+    second = agent.run_graph(str(document), "book")
+
+    assert not second.get("error")
+    assert model._calls == {}
+    assert second["cached_batches"] == len(first["batch_spans"])
+    assert read_book(tmp_path) == book
+
+
+def test_a_resumed_run_only_sends_the_failed_batch(tmp_path, document):
+    model = TrackingEchoModel()
+    model._failures[4] = 10
+    agent = make_agent(tmp_path, model, use_cache=True, max_attempts=2)
+    failed = agent.run_graph(str(document), "book")
+    assert failed["error"].startswith("Error processing batch 4")
+    model._calls.clear()
+    model._failures.clear()
+
+    resumed = agent.run_graph(str(document), "book")
+
+    assert not resumed.get("error")
+    assert model._calls == {4: 1}
+    assert resumed["cached_batches"] == len(resumed["batch_spans"]) - 1
+    chapters = _CHAPTER.findall(document.read_text(encoding="utf-8"))
+    assert _CHAPTER.findall(read_book(tmp_path)) == chapters
+
+
+def test_a_corrupt_cache_file_counts_as_a_miss(tmp_path, document):
+    model = TrackingEchoModel()
+    agent = make_agent(tmp_path, model, use_cache=True)
+    first = agent.run_graph(str(document), "book")
+    cache_files(tmp_path)[2].write_text('{"cache_key": ', encoding="utf-8")
+    model._calls.clear()
+
+    second = agent.run_graph(str(document), "book")
+
+    assert not second.get("error")
+    assert model._calls == {2: 1}
+    assert second["cached_batches"] == len(first["batch_spans"]) - 1
+
+
+def test_another_model_does_not_reuse_the_cached_batches(tmp_path, document):
+    make_agent(tmp_path, TrackingEchoModel(), use_cache=True).run_graph(
+        str(document), "book"
+    )
+    model = TrackingEchoModel(model_name="other-model")
+
+    state = make_agent(tmp_path, model, use_cache=True).run_graph(str(document), "book")
+
+    assert state["cached_batches"] == 0
+    assert len(model._calls) == len(state["batch_spans"])
+
+
+def test_the_cache_key_covers_the_template_model_and_temperature():
+    key = BatchResultCache.make_key("batch", "template", "model", 0)
+
+    assert BatchResultCache.make_key("batch", "template", "model", 0) == key
+    assert BatchResultCache.make_key("batch", "template 2", "model", 0) != key
+    assert BatchResultCache.make_key("batch", "template", "model 2", 0) != key
+    assert BatchResultCache.make_key("batch", "template", "model", 0.7) != key
+    assert BatchResultCache.make_key("batch", "template", "model", None) != key
+    assert BatchResultCache.make_key("batch 2", "template", "model", 0) != key
@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pytest
+from app.infrastructure.vector_store import quantized_embedding_storage
+from app.infrastructure.vector_store.numpy_vector_store import NumpyVectorStore
+from app.infrastructure.vector_store.quantized_embedding_storage import (
+    QuantizedEmbeddingStorage,
+)
+
+
+def random_vectors(seed: int, rows: int = 20, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+def test_a_crash_mid_write_keeps_the_previous_generation(tmp_path, monkeypatch):
+    old = QuantizedEmbeddingStorage.write(
+        str(tmp_path), "store", random_vectors(0), keep_float32=False
+    ).to_float32()
+
+    save_array = quantized_embedding_storage._save_array
+
+    def crash_before_codes(path, array):
+        if path.endswith("codes.npy"):
+            raise OSError("disk full")
+        save_array(path, array)
+
+    monkeypatch.setattr(quantized_embedding_storage, "_save_array", crash_before_codes)
+    with pytest.raises(OSError):
+        QuantizedEmbeddingStorage.write(
+            str(tmp_path), "store", random_vectors(1) * 10, keep_float32=False
+        )
+
+    storage = QuantizedEmbeddingStorage(str(tmp_path), "store")
+    assert np.array_equal(storage.to_float32(), old)
+
+    monkeypatch.setattr(quantized_embedding_storage, "_save_array", save_array)
+    latest = QuantizedEmbeddingStorage.write(
+        str(tmp_path), "store", random_vectors(2), keep_float32=False
+    )
+    assert all(
+        latest.generation in file_name
+        for file_name in os.listdir(tmp_path)
+        if file_name != "store.meta.json"
+    )
+
+
+def test_a_write_removes_the_replaced_generation(tmp_path):
+    first = QuantizedEmbeddingStorage.write(str(tmp_path), "store", random_vectors(0))
+    second = QuantizedEmbeddingStorage.write(str(tmp_path), "store", random_vectors(1))
+
+    assert first.generation != second.generation
+    names = sorted(os.listdir(tmp_path))
+    assert names == sorted(
+        [
+            "store.meta.json",
+            *(
+                f"store.{second.generation}.{suffix}"
+                for suffix in ("codes.npy", "scale.npy", "offset.npy", "f32.npy")
+            ),
+        ]
+    )
+    assert np.allclose(first.to_float32(), random_vectors(0))
+
+
+def test_arrays_that_do_not_match_meta_are_rejected(tmp_path):
+    storage = QuantizedEmbeddingStorage.write(str(tmp_path), "store", random_vectors(0))
+    np.save(storage._path("codes.npy"), np.zeros((3, 8), dtype=np.int8))
+
+    with pytest.raises(ValueError, match="codes"):
+        QuantizedEmbeddingStorage(str(tmp_path), "store")
+
+
+def test_a_quantized_store_reloads_its_latest_save(tmp_path, embeddings):
+    store = NumpyVectorStore(
+        "store", str(tmp_path), embedding_function=embeddings, quantization="int8"
+    )
+    for texts in (["alpha", "beta"], ["gamma"]):
+        store.add_embeddings_directly(
+            texts, embeddings.embed_documents(texts), ids=texts
+        )
+        store.save()
+
+    reloaded = NumpyVectorStore(
+        "store", str(tmp_path), embedding_function=embeddings, quantization="int8"
+    )
+    reloaded.load()
+    assert reloaded.count() == 3
+    assert reloaded.direct_search("gamma", n_results=1)[0].id == "gamma"
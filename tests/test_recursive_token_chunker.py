@@ -0,0 +1,42 @@
+from app.infrastructure.chunkers.recursive_token_chunker import (
+    _TOKEN_PATTERN,
+    RecursiveTokenChunker,
+    count_tokens,
+)
+
+
+def tokens(text):
+    return _TOKEN_PATTERN.findall(text)
+
+
+def sentence(n, words):
+    return " ".join(f"w{n}x{i}" for i in range(words - 1)) + "."
+
+
+def test_chunks_overlap_by_chunk_overlap_tokens():
+    # Sentences of 12 tokens: no two fit in a chunk of 20.
+    text = " ".join(sentence(n, 11) for n in range(6))
+    chunks = RecursiveTokenChunker(chunk_size=20, chunk_overlap=5).split_text(text)
+
+    assert len(chunks) == 6
+    assert all(count_tokens(chunk) <= 20 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert tokens(chunk)[:5] == tokens(previous)[-5:]
+
+
+def test_overlap_shrinks_to_fit_long_pieces():
+    # Sentences of 17 tokens leave room for 3 tokens of overlap.
+    text = " ".join(sentence(n, 17) for n in range(3))
+    chunks = RecursiveTokenChunker(chunk_size=20, chunk_overlap=5).split_text(text)
+
+    assert all(count_tokens(chunk) <= 20 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert tokens(chunk)[:3] == tokens(previous)[-3:]
+
+
+def test_short_text_is_one_chunk_and_no_overlap_without_setting():
+    chunker = RecursiveTokenChunker(chunk_size=20, chunk_overlap=0)
+    assert chunker.split_text("One short sentence.") == ["One short sentence."]
+
+    text = " ".join(sentence(n, 11) for n in range(3))
+    assert chunker.split_text(text) == [sentence(n, 11) for n in range(3)]
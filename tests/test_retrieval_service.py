@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from app.application.services.retrieval_service import RetrievalService
+from app.infrastructure.vector_store.numpy_vector_store import NumpyVectorStore
+from app.infrastructure.vector_store.vector_store_registry import (
+    vector_store_registry,
+)
+from app.settings import settings
+
+QUERY = "which forms survive"
+
+
+def test_hybrid_search_uses_the_lexical_index_of_the_store(tmp_path, embeddings):
+    store = NumpyVectorStore("other", str(tmp_path), embedding_function=embeddings)
+    texts = ["Pigeons descend from the rock pigeon.", "Islands hold peculiar forms."]
+    ids = ["pigeons", "islands"]
+    store.add_texts_directly(texts, [{"source_type": "book_content"}] * 2, ids)
+    index = vector_store_registry.get_lexical_index("other", str(tmp_path))
+    index.add(ids, texts, [{"source_type": "book_content"}] * 2)
+
+    service = RetrievalService(vector_store=store, hybrid=True, mmr=False)
+
+    assert service.lexical_index is index
+    docs = service.retrieve("rock pigeon", n_results=2)
+    assert {doc.id for doc in docs} == set(ids)
+
+
+def unit_orthogonal(basis, seed):
+    """Return a random unit vector orthogonal to the given orthonormal vectors."""
+    vector = np.random.default_rng(seed).normal(size=len(basis[0]))
+    for other in basis:
+        vector -= (vector @ other) * other
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def mmr_service(tmp_path, embeddings):
+    """
+    Service over four documents placed around the query vector:
+    "exact" is the query itself, "copy" a near-duplicate of it, "close" has relevance 0.9
+    and similarity 0.9 to "exact", "distinct" has relevance 0.6 and similarity 0.6 to "exact".
+    """
+    query = np.asarray(embeddings.embed_query(QUERY))
+    query /= np.linalg.norm(query)
+    u = unit_orthogonal([query], seed=1)
+    w = unit_orthogonal([query, u], seed=2)
+    vectors = {
+        "exact": query,
+        "copy": query + 0.01 * u,
+        "close": 0.9 * query + np.sqrt(1 - 0.81) * u,
+        "distinct": 0.6 * query + 0.8 * w,
+    }
+    lengths = {"exact": 50, "copy": 50, "close": 50, "distinct": 10}
+    store = NumpyVectorStore("mmr", str(tmp_path), embedding_function=embeddings)
+    store.add_embeddings_directly(
+        [doc_id[0] * lengths[doc_id] for doc_id in vectors],
+        [vector.tolist() for vector in vectors.values()],
+        ids=list(vectors),
+    )
+    return RetrievalService(vector_store=store, hybrid=False, mmr=True)
+
+
+def retrieved_ids(service, n_results=4):
+    return [doc.id for doc in service.retrieve(QUERY, n_results=n_results)]
+
+
+def test_mmr_drops_near_duplicates(mmr_service, monkeypatch):
+    monkeypatch.setattr(settings, "MMR_LAMBDA", 1.0)
+
+    assert retrieved_ids(mmr_service) == ["exact", "close", "distinct"]
+
+    monkeypatch.setattr(settings, "MMR_DUPLICATE_THRESHOLD", 1.01)
+    assert retrieved_ids(mmr_service) == ["exact", "copy", "close", "distinct"]
+
+
+def test_mmr_order_follows_the_lambda(mmr_service, monkeypatch):
+    monkeypatch.setattr(settings, "MMR_LAMBDA", 0.9)
+    assert retrieved_ids(mmr_service, 2) == ["exact", "close"]
+
+    # With more weight on diversity, the document unlike "exact" beats the closer one.
+    monkeypatch.setattr(settings, "MMR_LAMBDA", 0.3)
+    assert retrieved_ids(mmr_service, 2) == ["exact", "distinct"]
+
+
+def test_mmr_results_fit_in_the_context_budget(mmr_service, monkeypatch):
+    monkeypatch.setattr(settings, "MMR_LAMBDA", 1.0)
+    monkeypatch.setattr(settings, "RETRIEVAL_CONTEXT_CHAR_BUDGET", 70)
+
+    # "close" would exceed the budget and is skipped; the shorter "distinct" still fits.
+    assert retrieved_ids(mmr_service) == ["exact", "distinct"]
+
+    # The most relevant document is kept even when it alone exceeds the budget.
+    monkeypatch.setattr(settings, "RETRIEVAL_CONTEXT_CHAR_BUDGET", 10)
+    assert retrieved_ids(mmr_service) == ["exact"]
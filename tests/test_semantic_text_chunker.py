@@ -0,0 +1,66 @@
+import pytest
+from app.infrastructure.chunkers.semantic_text_chunker import SemanticTextChunker
+
+SENTENCES = [
+    "Natural selection preserves favourable variations.",
+    "It acts slowly over many generations!",
+    "Domestic pigeons descend from the rock pigeon.",
+    "Do varieties differ from species?",
+    "Geological records are imperfect.",
+    "Islands hold peculiar forms.",
+    "Embryos of distinct animals resemble each other.",
+    "Rudimentary organs are common.",
+]
+
+TEXTS = [
+    "A single sentence without a break",
+    " ".join(SENTENCES[:2]),
+    " ".join(SENTENCES[:3]),
+    " ".join(SENTENCES),
+    "\n\n".join(SENTENCES),
+]
+
+
+def make_chunker(embeddings, **options) -> SemanticTextChunker:
+    threshold_type = options.pop("breakpoint_threshold_type", "percentile")
+    chunker = SemanticTextChunker(
+        embeddings,
+        breakpoint_threshold_amount=options.pop("breakpoint_threshold_amount", 70),
+        breakpoint_threshold_type=threshold_type,
+    )
+    for name, value in options.items():
+        setattr(chunker.semantic_chunker, name, value)
+    return chunker
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"breakpoint_threshold_type": "gradient", "breakpoint_threshold_amount": 50},
+        {
+            "breakpoint_threshold_type": "standard_deviation",
+            "breakpoint_threshold_amount": 0.5,
+        },
+        {"min_chunk_size": 80},
+        {"number_of_chunks": 3},
+    ],
+)
+@pytest.mark.parametrize("text", TEXTS)
+def test_chunks_with_vectors_match_split_text(embeddings, text, options):
+    chunker = make_chunker(embeddings, **options)
+
+    pieces = chunker.split_text_with_vectors(text)
+
+    assert [chunk for chunk, _ in pieces] == chunker.split_text(text)
+    assert all(vector and len(vector) == embeddings.dimension for _, vector in pieces)
+
+
+def test_vectors_reuse_the_sentence_embeddings(embeddings):
+    chunker = make_chunker(embeddings)
+    text = " ".join(SENTENCES)
+
+    pieces = chunker.split_text_with_vectors(text)
+
+    assert len(pieces) > 1
+    assert len(embeddings.embedded) == len(SENTENCES)
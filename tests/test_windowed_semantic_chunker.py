@@ -0,0 +1,103 @@
+import re
+from typing import Dict, List
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_experimental.text_splitter import SemanticChunker
+from app.infrastructure.chunkers.windowed_semantic_chunker import (
+    WindowedSemanticChunker,
+)
+
+# Angles between consecutive sentence vectors: cosine distances of 1, 0.015, 0.5, 0.134, 1.
+ANGLES = np.cumsum([0, 90, 10, 60, 30, 90])
+SENTENCES = [f"Sentence {n}." for n in range(len(ANGLES))]
+TEXT = " ".join(SENTENCES)
+
+
+class AngleEmbeddings(Embeddings):
+    """
+    Embeds each text as the 2D unit vector of the angle of the sentences it contains.
+    """
+
+    def __init__(self, angles: Dict[int, float]):
+        self.angles = angles
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(2)
+        for number in re.findall(r"Sentence (\d+)", text):
+            angle = np.radians(self.angles[int(number)])
+            vector += [np.cos(angle), np.sin(angle)]
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+def make_chunker(threshold_type="percentile", amount=30, **options):
+    return WindowedSemanticChunker(
+        AngleEmbeddings(dict(enumerate(ANGLES))),
+        breakpoint_threshold_type=threshold_type,
+        breakpoint_threshold_amount=amount,
+        buffer_size=options.pop("buffer_size", 0),
+        **options,
+    )
+
+
+def chunks(*numbers: List[int]) -> List[str]:
+    return [" ".join(SENTENCES[n] for n in group) for group in numbers]
+
+
+@pytest.mark.parametrize(
+    "threshold_type, amount, expected",
+    [
+        ("percentile", 30, chunks([0], [1, 2], [3, 4], [5])),
+        ("percentile", 100, chunks(range(6))),
+        # Mean distance 0.53, standard deviation 0.416.
+        ("standard_deviation", -0.1, chunks([0], [1, 2], [3, 4], [5])),
+        ("standard_deviation", 1, chunks([0], range(1, 5), [5])),
+        ("standard_deviation", 2, chunks(range(6))),
+        # Gradient of the distances: -0.985, -0.25, 0.059, 0.25, 0.866.
+        ("gradient", 50, chunks(range(4), [4], [5])),
+        ("gradient", 10, chunks([0, 1], [2], [3], [4], [5])),
+    ],
+)
+def test_breakpoint_thresholds(threshold_type, amount, expected):
+    chunker = make_chunker(threshold_type, amount)
+
+    assert chunker.split_text(TEXT) == expected
+    reference = SemanticChunker(
+        chunker.embeddings,
+        buffer_size=0,
+        breakpoint_threshold_type=threshold_type,
+        breakpoint_threshold_amount=amount,
+    )
+    assert reference.split_text(TEXT) == expected
+
+
+def test_short_chunks_are_merged_into_the_next_one():
+    chunker = make_chunker(min_chunk_chars=20)
+
+    # The trailing short chunk is merged into the previous one.
+    assert chunker.split_text(TEXT) == chunks(range(3), range(3, 6))
+
+
+def test_long_chunks_are_split_at_their_largest_distances():
+    chunker = make_chunker(amount=100, max_chunk_chars=40)
+
+    assert chunker.split_text(TEXT) == chunks([0], [1, 2], [3, 4], [5])
+
+
+def test_the_default_amount_is_the_first_percentile(embeddings):
+    sentences = [f"Statement number {n} about variation." for n in range(12)]
+    chunker = WindowedSemanticChunker(
+        embeddings, breakpoint_threshold_type="percentile"
+    )
+
+    pieces = chunker.split_text(" ".join(sentences))
+
+    # 0.7 is the 0.7th percentile: every gap but the smallest one is a breakpoint.
+    assert chunker.breakpoint_threshold_amount == 0.7
+    assert len(pieces) == len(sentences) - 1